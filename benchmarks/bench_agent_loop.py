@@ -0,0 +1,190 @@
+"""
+Agent-loop benchmark with a scripted fake client and stub tools
+
+Drives WindowsAgent.execute_task through 10-iteration tasks with no network
+and no real tools, so the numbers are pure orchestration overhead:
+
+    per_iteration_us   loop time per iteration, excluding time inside the tools
+                       (message building, JSON serialization, console output)
+    dispatch_us        time from Claude's response arriving to the first tool starting
+    memory_kb          memory still held after a task, and peak during it
+
+Results are written as JSON; pass --compare with an earlier results file to
+flag regressions.
+
+Usage:
+    python benchmarks/bench_agent_loop.py [--tasks N] [--output PATH] [--compare PATH]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from rich.console import Console
+
+import agent as agent_module
+from agent import WindowsAgent
+from utils.llm_client import LLMClient
+from fake_anthropic import FakeClient, task_script
+
+ITERATIONS = 10
+SCENARIOS = {
+    # name: (tools called per turn, result payload chars, render console output)
+    "single_tool_quiet": (["get_process_info"], 100, False),
+    "single_tool_console": (["get_process_info"], 100, True),
+    "large_result_quiet": (["get_page_text"], 5000, False),
+    "three_tools_quiet": (["get_process_info", "list_recent_downloads", "get_page_text"], 100, False),
+}
+REGRESSION_THRESHOLD = 0.20
+
+
+class StubTools:
+    """Tool stubs that return a fixed payload and record when they were called"""
+
+    def __init__(self, payload_chars: int):
+        self.payload = "x" * payload_chars
+        self.calls = []
+        self.seconds = 0.0
+
+    def __call__(self, **tool_input):
+        start = time.perf_counter()
+        self.calls.append(start)
+        result = {"success": True, "step": tool_input.get("step"), "data": self.payload}
+        self.seconds += time.perf_counter() - start
+        return result
+
+
+def make_agent(tool_names, stub, render_console: bool) -> WindowsAgent:
+    agent_module.console = (
+        Console(file=open(os.devnull, "w"), force_terminal=True, width=120)
+        if render_console else Console(quiet=True)
+    )
+    agent = WindowsAgent(api_key="benchmark")
+    agent.require_confirmation = False
+    agent.result_cache = None
+    agent.plan_cache = None
+    agent.llm = LLMClient(requests_per_minute=0, tokens_per_minute=0)
+    for name in tool_names:
+        agent.registry.set_function(name, stub)
+    return agent
+
+
+def run_scenario(tool_names, payload_chars: int, render_console: bool, tasks: int) -> dict:
+    """Run a scenario several times and summarize"""
+    stub = StubTools(payload_chars)
+    agent = make_agent(tool_names, stub, render_console)
+
+    task_times, per_iteration, dispatch = [], [], []
+    for _ in range(tasks):
+        client = FakeClient(task_script(ITERATIONS, tool_names))
+        agent.client = client
+        stub.calls.clear()
+        stub.seconds = 0.0
+
+        start = time.perf_counter()
+        result = agent.execute_task("benchmark task")
+        elapsed = time.perf_counter() - start
+
+        if not result.get("success"):
+            raise RuntimeError(f"Benchmark task failed: {result}")
+
+        task_times.append(elapsed)
+        per_iteration.append((elapsed - stub.seconds) / ITERATIONS)
+
+        first_calls = stub.calls[::len(tool_names)]
+        dispatch.extend(call - arrived for arrived, call in zip(client.response_times, first_calls))
+
+    # Memory is traced in a separate pass: tracemalloc slows everything down
+    agent.client = FakeClient(task_script(ITERATIONS, tool_names))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    agent.execute_task("benchmark task")
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    agent.executor.shutdown()
+    return {
+        "task_ms": round(statistics.median(task_times) * 1000, 3),
+        "per_iteration_us": round(statistics.median(per_iteration) * 1e6, 1),
+        "dispatch_us": round(statistics.median(dispatch) * 1e6, 1),
+        "memory_kb": round((after - before) / 1024, 1),
+        "peak_memory_kb": round((peak - before) / 1024, 1),
+        "tasks": tasks,
+        "iterations": ITERATIONS,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, previous: dict) -> list:
+    """Metrics that got worse by more than the threshold"""
+    regressions = []
+    for name, metrics in current["scenarios"].items():
+        old = previous.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for metric in ("per_iteration_us", "dispatch_us", "peak_memory_kb"):
+            if old.get(metric) and metrics[metric] > old[metric] * (1 + REGRESSION_THRESHOLD):
+                regressions.append(f"{name}.{metric}: {old[metric]} -> {metrics[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20, help="Tasks per scenario")
+    parser.add_argument("--output", default=str(ROOT / "benchmarks" / "results" / "agent_loop.json"))
+    parser.add_argument("--compare", help="Earlier results file to check for regressions")
+    args = parser.parse_args()
+
+    # Keep the environment from changing what is measured
+    os.environ.pop("AGENT_CASSETTE", None)
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": {},
+    }
+    for name, (tool_names, payload_chars, render_console) in SCENARIOS.items():
+        results["scenarios"][name] = run_scenario(tool_names, payload_chars, render_console, args.tasks)
+
+    print(f"{'scenario':<22} {'task ms':>9} {'iter us':>9} {'dispatch us':>12} {'mem KB':>8} {'peak KB':>9}")
+    for name, m in results["scenarios"].items():
+        print(f"{name:<22} {m['task_ms']:>9} {m['per_iteration_us']:>9} {m['dispatch_us']:>12} "
+              f"{m['memory_kb']:>8} {m['peak_memory_kb']:>9}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cold-start benchmark for the CLI and API entry points
+
+Each measurement runs in a fresh interpreter so nothing is already cached
+in sys.modules. Reported per entry point:
+    lazy  - import the module and construct a WindowsAgent (tools load on first use)
+    eager - the same, then import every tool module, which is what every
+            startup paid before the lazy tool registry
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs N] [--json PATH]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+SNIPPET = """
+import sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import {module}
+from agent import WindowsAgent
+agent = WindowsAgent(api_key="benchmark")
+if {eager}:
+    agent.registry.load_all()
+print(time.perf_counter() - start)
+"""
+
+
+def measure(module: str, eager: bool, runs: int) -> dict:
+    """Time a cold import of an entry point in fresh interpreters"""
+    code = SNIPPET.format(src=str(SRC), module=module, eager=eager)
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        samples.append(float(completed.stdout.strip().splitlines()[-1]))
+
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for module in ("main", "api_server"):
+        results[module] = {
+            "lazy": measure(module, eager=False, runs=args.runs),
+            "eager": measure(module, eager=True, runs=args.runs),
+        }
+
+    print(f"{'entry point':<12} {'lazy (ms)':>10} {'eager (ms)':>11} {'saved':>8}")
+    for module, result in results.items():
+        lazy = result["lazy"]["median_ms"]
+        eager = result["eager"]["median_ms"]
+        print(f"{module:<12} {lazy:>10} {eager:>11} {eager - lazy:>8.1f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
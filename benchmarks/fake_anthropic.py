@@ -0,0 +1,106 @@
+"""
+Scripted stand-in for the Anthropic client used by the benchmarks
+
+The fake plays back a fixed list of assistant turns through the same
+messages.stream() interface the agent loop uses, with no network and no
+artificial latency, so measurements show only the agent's own overhead.
+"""
+import time
+from typing import Dict, List
+
+from anthropic.types import Message
+
+
+def make_message(content: List[Dict], stop_reason: str, input_tokens: int = 1000, output_tokens: int = 50) -> Message:
+    """Build an SDK Message from plain content blocks"""
+    return Message.model_validate({
+        "id": "msg_benchmark",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-3-5-haiku-20241022",
+        "content": content,
+        "stop_reason": stop_reason,
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}
+    })
+
+
+def tool_turn(turn: int, tool_names: List[str]) -> Message:
+    """An assistant turn that calls each tool once"""
+    content = [{"type": "text", "text": f"Step {turn}."}]
+    for index, name in enumerate(tool_names):
+        content.append({
+            "type": "tool_use",
+            "id": f"toolu_{turn}_{index}",
+            "name": name,
+            "input": {"step": turn}
+        })
+    return make_message(content, "tool_use")
+
+
+def final_turn(text: str = "All done.") -> Message:
+    return make_message([{"type": "text", "text": text}], "end_turn")
+
+
+def task_script(iterations: int, tool_names: List[str]) -> List[Message]:
+    """A task that calls tools for iterations - 1 turns and then answers"""
+    return [tool_turn(turn, tool_names) for turn in range(1, iterations)] + [final_turn()]
+
+
+class FakeStream:
+    def __init__(self, client: "FakeClient", message: Message):
+        self._client = client
+        self._message = message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        if self._client.is_async:
+            return self._async_texts()
+        return iter([block.text for block in self._message.content if block.type == "text"])
+
+    async def _async_texts(self):
+        for block in self._message.content:
+            if block.type == "text":
+                yield block.text
+
+    def get_final_message(self):
+        self._client.response_times.append(time.perf_counter())
+        if self._client.is_async:
+            return self._async_message()
+        return self._message
+
+    async def _async_message(self):
+        return self._message
+
+
+class FakeMessages:
+    def __init__(self, client: "FakeClient"):
+        self._client = client
+
+    def stream(self, **kwargs):
+        self._client.requests.append(kwargs)
+        return FakeStream(self._client, self._client.script.pop(0))
+
+
+class FakeClient:
+    """
+    Replaces WindowsAgent.client (or async_client with is_async=True)
+    """
+
+    def __init__(self, script: List[Message], is_async: bool = False):
+        self.script = list(script)
+        self.is_async = is_async
+        self.requests: List[Dict] = []
+        self.response_times: List[float] = []  # when each response was handed over
+        self.messages = FakeMessages(self)
@@ -3,25 +3,103 @@ Windows Agent - Core orchestrator using Claude SDK with tool use
 """
 import os
 import json
-from typing import Any, Dict, List, Optional
-from anthropic import Anthropic
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Generator, Iterator, List, Optional, Set, Tuple
+from anthropic import Anthropic, AsyncAnthropic
 from rich.console import Console
 
-from tools.file_ops import get_file_tools
-from tools.process_ops import get_process_tools
-from tools.ui_automation import get_ui_tools
-from tools.system_info import get_system_tools
-from tools.app_installation import get_installation_tools
-from tools.system_settings import get_system_settings_tools
-from tools.app_control import get_app_control_tools
-from tools.browser_automation import get_browser_tools
-from tools.chrome_launcher import get_chrome_launcher_tools
-from tools.screen_reader import get_screen_reader_tools
-from tools.installer_automation import get_installer_automation_tools
-from tools.installer_automation_v2 import get_installer_automation_v2_tools
-from tools.download_manager import get_download_manager_tools
+from tools.registry import ToolRegistry
+from tools.selector import REQUEST_TOOLS, ToolSelector
+from utils.budget import WRAP_UP_PROMPT, TaskBudget
+from utils.cancellation import CancellationToken
+from utils.cassette import Cassette, CassetteClient
+from utils.context_manager import FETCH_TOOL_RESULT, ContextManager
+from utils.llm_client import LLMClient
+from utils.logger import truncate
+from utils.metrics import (
+    LLM_DURATION, LLM_TIME_TO_FIRST_TOKEN, LLM_TOKENS, MODEL_ESCALATIONS, TASK_ITERATIONS,
+    TASKS, TOOL_DURATION, TOOL_ERRORS
+)
+from utils.model_router import ModelRouter
+from utils.plan_cache import PlanCache
+from utils.pricing import USAGE_FIELDS, estimate_cost
+from utils.result_cache import ResultCache
+from utils.session_store import Session, SessionStore, message_to_dict
+from utils.task_stats import TASK_STATS
+from utils.tool_executor import ToolExecutor
 
 console = Console()
+logger = logging.getLogger("axonyx.agent")
+
+# Async client closes that close() scheduled on a running event loop
+_closing: Set["asyncio.Task"] = set()
+
+
+async def wait_for_closed_clients() -> None:
+    """Wait until the async HTTP clients closed by WindowsAgent.close() are shut (at server shutdown)"""
+    if _closing:
+        await asyncio.gather(*_closing, return_exceptions=True)
+
+# Fixed system prompt. Keep it byte-identical between requests: together with
+# the tool list it forms the cached prompt prefix.
+SYSTEM_PROMPT = (
+    "You are Axonyx Revolt, an agent that automates tasks on a Windows 11 PC "
+    "using the tools provided. Prefer the most direct tool for the job, call "
+    "independent tools in the same turn when you can, and check tool results "
+    "for errors before continuing. When the task is complete, reply with a "
+    "short summary of what was done."
+)
+
+# Why a task stopped when a budget ran out before Claude gave a final answer
+BUDGET_ERRORS = {
+    "iteration": "Max iterations reached",
+    "token": "Token budget exhausted",
+    "time": "Task deadline reached",
+}
+
+# Tools answered by the agent itself rather than a tool module
+META_TOOLS = {REQUEST_TOOLS["name"], FETCH_TOOL_RESULT["name"]}
+
+
+class TaskRun:
+    """
+    State of one task: the conversation so far and its running totals
+    """
+    
+    def __init__(self, task: str, budget: Optional[TaskBudget] = None,
+                 cancel_token: Optional[CancellationToken] = None):
+        self.task = task
+        self.messages: List[Dict] = [
+            {
+                "role": "user",
+                "content": task
+            }
+        ]
+        self.usage = dict.fromkeys(USAGE_FIELDS, 0)
+        self.budget = budget or TaskBudget()
+        self.cancel_token = cancel_token or CancellationToken()
+        self.exhausted: Optional[str] = None  # budget that stopped the task
+        self.wrap_up: Optional[str] = None  # budget that triggered the final-answer request
+        self.iteration = 0
+        self.active_tools: Optional[Set[str]] = None  # None means every tool
+        self.request_tools: List[Dict] = []
+        self.context: Optional[ContextManager] = None
+        self.cache_baseline: Optional[Dict[str, int]] = None
+        self.tool_history: List[List[tuple]] = []  # (call, result) pairs per turn
+        self.replayed_plan = False
+        self.model = ""
+        self.escalation: Optional[str] = None  # why the task moved to the stronger model
+        self.models: Dict[str, Dict[str, float]] = {}  # per-model requests, seconds and tokens
+        self.turns: List[Dict[str, Any]] = []  # model, usage and timing of each Claude turn
+        self.started = time.perf_counter()
+        self.llm_seconds = 0.0
+        self.tool_seconds = 0.0
+        self.queue_seconds = 0.0  # waiting for the shared rate limiter
+        self.session: Optional[Session] = None
+        self.cache_point: Optional[int] = None  # index of the last message carried over from the session
 
 
 class WindowsAgent:
@@ -30,196 +108,854 @@ class WindowsAgent:
     """
     
     def __init__(self, api_key: str, model: str = None):
-        self.client = Anthropic(api_key=api_key)
+        # Retries are handled by the shared LLMClient, which also paces requests
+        self.client = Anthropic(api_key=api_key, max_retries=0)
+        self.async_client = AsyncAnthropic(api_key=api_key, max_retries=0)
+        self.llm = LLMClient.shared()
         self.model = model or os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-20241022")
         self.max_tokens = int(os.getenv("MAX_TOKENS", "4096"))
         self.require_confirmation = os.getenv("REQUIRE_CONFIRMATION", "true").lower() == "true"
         self.allow_all = False  # "Yes to all" flag for current task
         
-        # Register all available tools
-        self.tools = self._register_tools()
-        self.tool_functions = self._map_tool_functions()
+        # Start tasks on self.model and move to a stronger model when they struggle
+        self.router = None
+        if os.getenv("MODEL_ROUTING", "true").lower() == "true":
+            self.router = ModelRouter()
+        
+        # Register all available tools (implementations are imported on first use)
+        self.registry = ToolRegistry()
+        self.tools = self.registry.schemas
+        self.prompt_caching = os.getenv("PROMPT_CACHING", "true").lower() == "true"
+        self.context_compaction = os.getenv("CONTEXT_COMPACTION", "true").lower() == "true"
+        self.system = self._build_system()
+        self.executor = ToolExecutor(self._execute_tool, resources=self.registry.resources)
+        
+        # Reuse results of read-only tools across turns, tasks and agents
+        self.result_cache = None
+        if os.getenv("TOOL_CACHE", "true").lower() == "true":
+            self.result_cache = ResultCache.shared()
+        # This agent's own hits and misses (the cache is shared), for the task result
+        self.cache_counts = {"hits": 0, "misses": 0}
+        self._cache_counts_lock = threading.Lock()
+        
+        # Offer each task only the tools relevant to it
+        self.tool_selector = None
+        if os.getenv("TOOL_SELECTION", "true").lower() == "true":
+            self.tool_selector = ToolSelector.from_registry(
+                self.registry,
+                top_k=int(os.getenv("TOOL_TOP_K", "15"))
+            )
+        
+        # Replay learned tool sequences for repeated tasks
+        self.plan_cache = None
+        if os.getenv("PLAN_CACHE", "true").lower() == "true":
+            self.plan_cache = PlanCache.shared()
+        
+        # Conversations that follow-up tasks continue (see utils/session_store.py)
+        self.session_store = SessionStore.shared()
+        
+        # Record or replay LLM turns and tool results (see utils/cassette.py)
+        self.cassette = None
+        cassette_path = os.getenv("AGENT_CASSETTE")
+        if cassette_path:
+            self.use_cassette(Cassette(cassette_path, os.getenv("AGENT_CASSETTE_MODE", "replay")))
         
         console.print(f"[dim]Initialized agent with {len(self.tools)} tools[/dim]")
     
-    def _register_tools(self) -> List[Dict]:
-        """Register all available tools for Claude"""
+    def use_cassette(self, cassette: Cassette) -> None:
+        """
+        Record this agent's LLM turns and tool results to a cassette, or replay them from one
+        
+        Args:
+            cassette: Cassette in "record" or "replay" mode
+        """
+        self.cassette = cassette
+        recording = cassette.recording
+        self.client = CassetteClient(cassette, self.client if recording else None)
+        self.async_client = CassetteClient(cassette, self.async_client if recording else None, is_async=True)
+        if not recording:
+            # Replayed turns never reach the API, so they must not wait for (or use up) its budget
+            self.llm = LLMClient(requests_per_minute=0, tokens_per_minute=0)
+        self.executor.execute = cassette.wrap_tool(self._execute_tool)
+    
+    def close(self) -> None:
+        """
+        Release the tool worker threads and both HTTP connection pools
+        
+        Inside an event loop (pooled API agents) the async client is closed by
+        a task on that loop; see wait_for_closed_clients().
+        """
+        self.executor.shutdown()
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
+        
+        close_async = getattr(self.async_client, "close", None)
+        if close_async is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(close_async())
+            return
+        task = loop.create_task(close_async())
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+    
+    def _build_system(self) -> List[Dict]:
+        """The system prompt, marked cacheable when prompt caching is on"""
+        system = [{"type": "text", "text": SYSTEM_PROMPT}]
+        if self.prompt_caching:
+            system[0]["cache_control"] = {"type": "ephemeral"}
+        return system
+    
+    def _build_request_tools(self, active_tools: Optional[Set[str]]) -> List[Dict]:
+        """
+        Build the tool list sent with each request of a task
+        
+        Tools always appear in registration order so the serialized prefix is
+        byte-identical from turn to turn. With prompt caching enabled the last
+        tool carries the cache breakpoint.
+        """
         tools = []
-        tools.extend(get_file_tools())
-        tools.extend(get_process_tools())
-        tools.extend(get_ui_tools())
-        tools.extend(get_system_tools())
-        tools.extend(get_installation_tools())
-        tools.extend(get_system_settings_tools())
-        tools.extend(get_app_control_tools())
-        tools.extend(get_browser_tools())
-        tools.extend(get_chrome_launcher_tools())
-        tools.extend(get_screen_reader_tools())
-        tools.extend(get_installer_automation_tools())
-        tools.extend(get_installer_automation_v2_tools())  # NEW: Robust installer automation
-        tools.extend(get_download_manager_tools())
-        
-        from tools.image_downloader import get_image_download_tools
-        tools.extend(get_image_download_tools())
+        if active_tools is not None:
+            tools.append(REQUEST_TOOLS)
+        if self.context_compaction:
+            tools.append(FETCH_TOOL_RESULT)
+        
+        if active_tools is None:
+            tools.extend(self.tools)
+        else:
+            tools.extend(tool for tool in self.tools if tool["name"] in active_tools)
+        
+        if self.prompt_caching and tools:
+            tools[-1] = {**tools[-1], "cache_control": {"type": "ephemeral"}}
         
         return tools
     
-    def _map_tool_functions(self) -> Dict:
-        """Map tool names to their implementation functions"""
-        from tools.file_ops import FILE_FUNCTIONS
-        from tools.process_ops import PROCESS_FUNCTIONS
-        from tools.ui_automation import UI_FUNCTIONS
-        from tools.system_info import SYSTEM_FUNCTIONS
-        from tools.app_installation import INSTALLATION_FUNCTIONS
-        from tools.system_settings import SYSTEM_SETTINGS_FUNCTIONS
-        from tools.app_control import APP_CONTROL_FUNCTIONS
-        from tools.browser_automation import BROWSER_FUNCTIONS
-        from tools.chrome_launcher import CHROME_LAUNCHER_FUNCTIONS
-        from tools.screen_reader import SCREEN_READER_FUNCTIONS
-        from tools.installer_automation import INSTALLER_AUTOMATION_FUNCTIONS
-        from tools.installer_automation_v2 import INSTALLER_AUTOMATION_V2_FUNCTIONS
-        from tools.download_manager import DOWNLOAD_MANAGER_FUNCTIONS
-        from tools.image_downloader import IMAGE_DOWNLOAD_FUNCTIONS
+    def execute_task(self, task: str, budget: Optional[TaskBudget] = None,
+                     cancel_token: Optional[CancellationToken] = None,
+                     session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute a task using the agentic workflow
+        
+        Args:
+            task: Natural language description of the task
+            budget: Iteration, token and time limits (defaults from TASK_* settings)
+            cancel_token: Token another thread can cancel to stop the task between steps
+            session_id: Continue this conversation (created on first use) instead of starting fresh
+            
+        Returns:
+            Dictionary with success status and result/error
+        """
+        for event in self.stream_task(task, budget, cancel_token, session_id):
+            if event["type"] == "done":
+                return event["result"]
         
         return {
-            **FILE_FUNCTIONS,
-            **PROCESS_FUNCTIONS,
-            **UI_FUNCTIONS,
-            **SYSTEM_FUNCTIONS,
-            **INSTALLATION_FUNCTIONS,
-            **SYSTEM_SETTINGS_FUNCTIONS,
-            **APP_CONTROL_FUNCTIONS,
-            **BROWSER_FUNCTIONS,
-            **CHROME_LAUNCHER_FUNCTIONS,
-            **SCREEN_READER_FUNCTIONS,
-            **INSTALLER_AUTOMATION_FUNCTIONS,
-            **INSTALLER_AUTOMATION_V2_FUNCTIONS,
-            **DOWNLOAD_MANAGER_FUNCTIONS,
-            **IMAGE_DOWNLOAD_FUNCTIONS
+            "success": False,
+            "error": "Task ended without a result"
         }
     
-    def execute_task(self, task: str) -> Dict[str, Any]:
+    def stream_task(self, task: str, budget: Optional[TaskBudget] = None,
+                    cancel_token: Optional[CancellationToken] = None,
+                    session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         """
-        Execute a task using the agentic workflow
+        Execute a task, yielding progress events as they happen
         
         Args:
             task: Natural language description of the task
+            budget: Iteration, token and time limits (defaults from TASK_* settings)
+            cancel_token: Token another thread can cancel to stop the task between steps
+            session_id: Continue this conversation (created on first use) instead of starting fresh
+            
+        Yields:
+            Event dictionaries, one of:
+                {"type": "text", "text": str} - incremental assistant text
+                {"type": "tool_start", "id": str, "name": str, "input": dict}
+                {"type": "tool_result", "id": str, "name": str, "result": dict}
+                {"type": "done", "result": dict} - same shape as execute_task's result
+        """
+        run = self._start_task(task, budget, cancel_token, session_id)
+        steps = self._task_steps(run)
+        reply = None
+        
+        try:
+            while True:
+                try:
+                    kind, value = steps.send(reply)
+                except StopIteration:
+                    return
+                reply = None
+                if kind == "event":
+                    yield value
+                elif kind == "tools":
+                    reply = self._run_tool_calls(run, value)
+                else:
+                    for item_kind, item in self._stream_llm(run, value):
+                        if item_kind == "event":
+                            yield item
+                        else:
+                            reply = item
+            
+        except Exception as e:
+            console.print(f"[red]Agent error: {str(e)}[/red]")
+            logger.exception("Task failed")
+            yield {"type": "done", "result": self._result(run, False, error=str(e))}
+    
+    async def execute_task_async(self, task: str, budget: Optional[TaskBudget] = None,
+                                 cancel_token: Optional[CancellationToken] = None,
+                                 session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Async version of execute_task for use inside an event loop
+        
+        Args:
+            task: Natural language description of the task
+            budget: Iteration, token and time limits (defaults from TASK_* settings)
+            cancel_token: Token another thread can cancel to stop the task between steps
+            session_id: Continue this conversation (created on first use) instead of starting fresh
             
         Returns:
             Dictionary with success status and result/error
         """
+        async for event in self.stream_task_async(task, budget, cancel_token, session_id):
+            if event["type"] == "done":
+                return event["result"]
+        
+        return {
+            "success": False,
+            "error": "Task ended without a result"
+        }
+    
+    async def stream_task_async(self, task: str, budget: Optional[TaskBudget] = None,
+                                cancel_token: Optional[CancellationToken] = None,
+                                session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of stream_task
+        
+        LLM calls go through AsyncAnthropic and the (blocking) tools run in a
+        thread via run_in_executor, so the event loop is never blocked.
+        Yields the same events as stream_task.
+        """
+        run = self._start_task(task, budget, cancel_token, session_id)
+        loop = asyncio.get_running_loop()
+        steps = self._task_steps(run)
+        reply = None
+        
+        try:
+            while True:
+                try:
+                    kind, value = steps.send(reply)
+                except StopIteration:
+                    return
+                reply = None
+                if kind == "event":
+                    yield value
+                elif kind == "tools":
+                    reply = await loop.run_in_executor(None, self._run_tool_calls, run, value)
+                else:
+                    async for item_kind, item in self._stream_llm_async(run, value):
+                        if item_kind == "event":
+                            yield item
+                        else:
+                            reply = item
+            
+        except Exception as e:
+            console.print(f"[red]Agent error: {str(e)}[/red]")
+            logger.exception("Task failed")
+            yield {"type": "done", "result": self._result(run, False, error=str(e))}
+    
+    def _task_steps(self, run: TaskRun) -> Generator[Tuple[str, Any], Any, None]:
+        """
+        The agent loop shared by stream_task and stream_task_async
+        
+        It does no I/O itself: it yields what to do next and is sent the outcome.
+            ("event", dict)  - pass the event on (nothing is sent back)
+            ("tools", list)  - run these tool calls; send back their results
+            ("llm", dict)    - stream a Claude request with these arguments, passing
+                               on its text; send back (response, started, first_token_at),
+                               or None if the task was cancelled meanwhile
+        """
+        # Replay a learned plan for this task if there is a confident one
+        plan = self._find_plan(run)
+        if plan is not None:
+            for tool_calls in plan:
+                tool_calls = self._confirm_calls(tool_calls)
+                if tool_calls is None:
+                    yield "event", {"type": "done", "result": self._result(run, False, error="User cancelled operation")}
+                    return
+                
+                for call in tool_calls:
+                    yield "event", {"type": "tool_start", **call}
+                results = yield "tools", tool_calls
+                for call, result in zip(tool_calls, results):
+                    yield "event", {"type": "tool_result", "id": call["id"], "name": call["name"], "result": result}
+                
+                # A cancelled step says nothing about the plan
+                if run.cancel_token.cancelled:
+                    yield "event", {"type": "done", "result": self._stopped_result(run)}
+                    return
+                if not self._record_plan_step(run, tool_calls, results):
+                    break
+            else:
+                yield "event", {"type": "done", "result": self._plan_result(run)}
+                return
+        
+        # Agentic loop - Claude can call tools multiple times
+        while self._can_continue(run):
+            run.iteration += 1
+            self._route(run)
+            
+            reply = yield "llm", self._request_kwargs(run)
+            if reply is None:
+                continue
+            response, started, first_token_at = reply
+            self._observe_llm_call(run, started, first_token_at, response)
+            
+            tool_calls, result = self._handle_response(run, response)
+            if result is not None:
+                yield "event", {"type": "done", "result": result}
+                return
+            
+            for call in tool_calls:
+                yield "event", {"type": "tool_start", **call}
+            
+            # Execute the tools (results come back in tool_use order)
+            results = yield "tools", tool_calls
+            
+            for call, result in zip(tool_calls, results):
+                yield "event", {"type": "tool_result", "id": call["id"], "name": call["name"], "result": result}
+            
+            self._record_tool_results(run, response, tool_calls, results)
+        
+        yield "event", {"type": "done", "result": self._stopped_result(run)}
+    
+    def _stream_llm(self, run: TaskRun, request: Dict) -> Iterator[Tuple[str, Any]]:
+        """
+        Stream Claude's response, paced and retried by the shared LLM client
+        
+        Yields ("event", text event) as text arrives, then ("response",
+        (response, started, first_token_at)) unless the task was cancelled.
+        """
+        stream = self.llm.stream(self.client, **request)
+        for kind, value in stream:
+            if run.cancel_token.cancelled:
+                break
+            if kind == "start":
+                run.queue_seconds += value
+                started = time.perf_counter()
+                first_token_at = None
+            elif kind == "text":
+                first_token_at = first_token_at or time.perf_counter()
+                yield "event", {"type": "text", "text": value}
+            else:
+                response = value
+        if run.cancel_token.cancelled:
+            stream.close()
+            return
+        yield "response", (response, started, first_token_at)
+    
+    async def _stream_llm_async(self, run: TaskRun, request: Dict) -> AsyncIterator[Tuple[str, Any]]:
+        """_stream_llm for the AsyncAnthropic client"""
+        stream = self.llm.stream_async(self.async_client, **request)
+        async for kind, value in stream:
+            if run.cancel_token.cancelled:
+                break
+            if kind == "start":
+                run.queue_seconds += value
+                started = time.perf_counter()
+                first_token_at = None
+            elif kind == "text":
+                first_token_at = first_token_at or time.perf_counter()
+                yield "event", {"type": "text", "text": value}
+            else:
+                response = value
+        if run.cancel_token.cancelled:
+            await stream.aclose()
+            return
+        yield "response", (response, started, first_token_at)
+    
+    def _start_task(self, task: str, budget: Optional[TaskBudget] = None,
+                    cancel_token: Optional[CancellationToken] = None,
+                    session_id: Optional[str] = None) -> TaskRun:
+        """Set up the state for a new task"""
         # Reset "allow all" for new task
         self.allow_all = False
         
-        messages = [
+        run = TaskRun(task, budget, cancel_token)
+        run.budget.start()
+        run.model = self.model
+        if self.tool_selector is not None:
+            run.active_tools = self.tool_selector.select(task)
+        if self.context_compaction:
+            run.context = ContextManager()
+        if self.result_cache is not None:
+            run.cache_baseline = dict(self.cache_counts)
+        if session_id is not None:
+            self._resume_session(run, session_id)
+        run.request_tools = self._build_request_tools(run.active_tools)
+        return run
+    
+    def _resume_session(self, run: TaskRun, session_id: str) -> None:
+        """
+        Continue a session: its history comes before the task
+        
+        The session keeps the tool set it started with (the task can still
+        widen it with request_tools), so the tools, system prompt and earlier
+        messages form the same prefix as before and are read from the prompt
+        cache.
+        """
+        run.session = self.session_store.load(session_id) or Session(session_id)
+        history = [dict(message) for message in run.session.messages]
+        if not history:
+            return
+        
+        if run.session.active_tools is not None and run.active_tools is not None:
+            run.active_tools = set(run.session.active_tools)
+        if run.context is not None:
+            run.context.resume(history, run.session.results)
+        
+        # A task that stopped after tool results left a user message last
+        if history[-1]["role"] == "user":
+            run.messages = history
+            self._add_user_text(run, run.task)
+            run.cache_point = len(history) - 2
+        else:
+            run.messages = history + run.messages
+            run.cache_point = len(history) - 1
+    
+    def _save_session(self, run: TaskRun) -> None:
+        """Store the conversation so the next task in the session continues it"""
+        session = run.session
+        session.messages = [message_to_dict(message) for message in run.messages]
+        if run.context is not None:
+            session.results.update(run.context.store)
+        if run.active_tools is not None:
+            session.active_tools = sorted(run.active_tools)
+        session.tasks += 1
+        try:
+            self.session_store.save(session)
+        except Exception:
+            logger.exception("Could not save session", extra={"session_id": session.id})
+    
+    def _request_kwargs(self, run: TaskRun) -> Dict[str, Any]:
+        """
+        Arguments for the next messages request of a task
+        
+        When a budget is running low the request asks for a final answer
+        with tool use disabled.
+        """
+        kwargs = {
+            "model": run.model,
+            "max_tokens": self.max_tokens,
+            "system": self.system,
+            "tools": run.request_tools,
+            "messages": run.messages
+        }
+        
+        if run.wrap_up is None:
+            run.wrap_up = run.budget.running_low(run.iteration, sum(run.usage.values()))
+            if run.wrap_up is not None:
+                console.print(f"[yellow]⏳ {run.wrap_up.capitalize()} budget running low, asking for a final answer[/yellow]")
+                self._add_user_text(run, WRAP_UP_PROMPT.format(reason=run.wrap_up))
+        if run.wrap_up is not None:
+            kwargs["tool_choice"] = {"type": "none"}
+        
+        # Cache the session history up to its last message
+        if self.prompt_caching and run.cache_point is not None and run.cache_point >= 0:
+            kwargs["messages"] = list(run.messages)
+            message = run.messages[run.cache_point]
+            content = message["content"]
+            if isinstance(content, str):
+                content = [{"type": "text", "text": content}]
+            content = list(content)
+            content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+            kwargs["messages"][run.cache_point] = {**message, "content": content}
+        
+        return kwargs
+    
+    def _add_user_text(self, run: TaskRun, text: str) -> None:
+        """Append text to the latest user message (which may hold tool results)"""
+        last = run.messages[-1]
+        if isinstance(last["content"], str):
+            last["content"] = [{"type": "text", "text": last["content"]}]
+        last["content"].append({"type": "text", "text": text})
+    
+    def _can_continue(self, run: TaskRun) -> bool:
+        """False once a budget is used up (kept in run.exhausted) or the task is cancelled"""
+        run.exhausted = run.budget.exhausted(run.iteration, sum(run.usage.values()))
+        return run.exhausted is None and not run.cancel_token.cancelled
+    
+    def _stopped_result(self, run: TaskRun) -> Dict[str, Any]:
+        """Result of a task stopped by its budget or a cancel before Claude finished"""
+        if run.exhausted is not None:
+            return self._result(run, False, error=BUDGET_ERRORS[run.exhausted])
+        console.print(f"[yellow]Task cancelled ({run.cancel_token.reason})[/yellow]")
+        return self._result(run, False, error=f"Task cancelled: {run.cancel_token.reason}", cancelled=True)
+    
+    def _route(self, run: TaskRun) -> None:
+        """Move a task to the stronger model once the router sees a reason to"""
+        if self.router is None or run.escalation is not None:
+            return
+        
+        reason = self.router.escalation_reason(run.model, run.task, run.tool_history)
+        if reason is not None:
+            run.escalation = reason
+            run.model = self.router.strong_model
+            MODEL_ESCALATIONS.inc(reason=reason)
+            console.print(f"[cyan]↑ Switching to {run.model} ({reason.replace('_', ' ')})[/cyan]")
+    
+    def _observe_llm_call(self, run: TaskRun, started: float, first_token_at: Optional[float], response) -> None:
+        """Record latency and token metrics for one Claude response"""
+        finished = time.perf_counter()
+        LLM_DURATION.observe(finished - started, model=run.model)
+        LLM_TIME_TO_FIRST_TOKEN.observe((first_token_at or finished) - started, model=run.model)
+        
+        usage = {field: getattr(response.usage, field, None) or 0 for field in USAGE_FIELDS}
+        run.llm_seconds += finished - started
+        run.turns.append({
+            "turn": run.iteration,
+            "model": run.model,
+            "usage": usage,
+            "llm_seconds": finished - started,
+            "tool_seconds": 0.0
+        })
+        
+        stats = run.models.setdefault(run.model, {"requests": 0, "seconds": 0.0, **dict.fromkeys(USAGE_FIELDS, 0)})
+        stats["requests"] += 1
+        stats["seconds"] += finished - started
+        for field, tokens in usage.items():
+            if tokens:
+                stats[field] += tokens
+                LLM_TOKENS.observe(tokens, model=run.model, type=field.replace("_input_tokens", "").replace("_tokens", ""))
+    
+    def _handle_response(self, run: TaskRun, response) -> tuple:
+        """
+        Process one response from Claude
+        
+        Returns:
+            (tool_calls, None) when Claude wants tools run, or
+            (None, result) when the task is finished or was cancelled
+        """
+        for field in USAGE_FIELDS:
+            run.usage[field] += getattr(response.usage, field, None) or 0
+        
+        if response.stop_reason != "tool_use":
+            # Claude is done, extract final response (kept in a session for follow-ups)
+            if run.session is not None:
+                run.messages.append({"role": "assistant", "content": response.content})
+            self._learn_plan(run)
+            return None, self._result(run, True, message=self._final_text(response))
+        
+        tool_calls = self._confirm_tool_calls(response)
+        if tool_calls is None:
+            return None, self._result(run, False, error="User cancelled operation")
+        
+        return tool_calls, None
+    
+    def _result(self, run: TaskRun, success: bool, **fields) -> Dict[str, Any]:
+        """Build the result dictionary returned for a task"""
+        TASKS.inc(status="success" if success else "failure")
+        TASK_ITERATIONS.observe(run.iteration)
+        
+        result = {"success": success, **fields}
+        if success:
+            result["iterations"] = run.iteration
+        result["usage"] = run.usage
+        result["model"] = run.model
+        result["models"] = {
+            model: {**stats, "seconds": round(stats["seconds"], 3), "cost_usd": estimate_cost(model, stats)}
+            for model, stats in run.models.items()
+        }
+        result["cost_usd"] = round(sum(stats["cost_usd"] for stats in result["models"].values()), 6)
+        result["turns"] = [
             {
-                "role": "user",
-                "content": task
+                **turn,
+                "llm_seconds": round(turn["llm_seconds"], 3),
+                "tool_seconds": round(turn["tool_seconds"], 3),
+                "cost_usd": estimate_cost(turn["model"], turn["usage"])
             }
+            for turn in run.turns
         ]
+        result["timing"] = {
+            "total_seconds": round(time.perf_counter() - run.started, 3),
+            "llm_seconds": round(run.llm_seconds, 3),
+            "tool_seconds": round(run.tool_seconds, 3),
+            "queue_seconds": round(run.queue_seconds, 3)
+        }
+        if self.router is not None:
+            result["escalated"] = run.escalation
+        result["budget"] = {**run.budget.to_dict(), "wrapped_up": run.wrap_up, "exhausted": run.exhausted}
+        if run.context is not None:
+            result["context"] = run.context.stats()
+        if self.plan_cache is not None:
+            result["plan_cache"] = {
+                "replayed": run.replayed_plan,
+                "hit_rate": self.plan_cache.stats()["hit_rate"]
+            }
+        if run.session is not None:
+            self._save_session(run)
+            result["session_id"] = run.session.id
+        if run.cache_baseline is not None:
+            result["cache"] = {
+                "hits": self.cache_counts["hits"] - run.cache_baseline["hits"],
+                "misses": self.cache_counts["misses"] - run.cache_baseline["misses"]
+            }
         
-        try:
-            # Agentic loop - Claude can call tools multiple times
-            max_iterations = 10
-            iteration = 0
-            
-            while iteration < max_iterations:
-                iteration += 1
-                
-                # Get Claude's response
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    tools=self.tools,
-                    messages=messages
-                )
-                
-                # Check if Claude wants to use tools
-                if response.stop_reason == "tool_use":
-                    # Process tool calls
-                    tool_results = []
-                    
-                    for block in response.content:
-                        if block.type == "tool_use":
-                            tool_name = block.name
-                            tool_input = block.input
-                            
-                            console.print(f"[yellow]🔧 Using tool: {tool_name}[/yellow]")
-                            console.print(f"[dim]   Input: {json.dumps(tool_input, indent=2)}[/dim]")
-                            
-                            # Confirm with user if required
-                            if self.require_confirmation and not self.allow_all:
-                                from rich.prompt import Prompt
-                                response_text = Prompt.ask(
-                                    f"Execute {tool_name}?",
-                                    choices=["y", "n", "a", "yes", "no", "all"],
-                                    default="y",
-                                    show_choices=True,
-                                    show_default=True
-                                ).lower()
-                                
-                                if response_text in ["a", "all"]:
-                                    console.print("[green]✓ Allowing all subsequent operations for this task[/green]")
-                                    self.allow_all = True
-                                elif response_text in ["n", "no"]:
-                                    console.print("[red]✗ Operation cancelled by user[/red]")
-                                    return {
-                                        "success": False,
-                                        "error": "User cancelled operation"
-                                    }
-                            
-                            # Execute the tool
-                            result = self._execute_tool(tool_name, tool_input)
-                            
-                            tool_results.append({
-                                "type": "tool_result",
-                                "tool_use_id": block.id,
-                                "content": json.dumps(result)
-                            })
-                    
-                    # Add assistant response and tool results to conversation
-                    messages.append({"role": "assistant", "content": response.content})
-                    messages.append({"role": "user", "content": tool_results})
-                    
-                else:
-                    # Claude is done, extract final response
-                    final_text = ""
-                    for block in response.content:
-                        if hasattr(block, "text"):
-                            final_text += block.text
-                    
-                    return {
-                        "success": True,
-                        "message": final_text,
-                        "iterations": iteration
-                    }
-            
-            return {
-                "success": False,
-                "error": "Max iterations reached"
+        TASK_STATS.record(result)
+        logger.info("Task finished", extra={
+            "success": success,
+            "iterations": run.iteration,
+            "model": run.model,
+            "timing": result["timing"],
+            "usage": run.usage,
+            "cost_usd": result["cost_usd"]
+        })
+        return result
+    
+    def _confirm_tool_calls(self, response) -> Optional[List[Dict]]:
+        """
+        Collect the tool calls of a response, asking the user to confirm each
+        
+        Returns:
+            List of {"id", "name", "input"} dicts, or None if the user cancelled
+        """
+        return self._confirm_calls([
+            {
+                "id": block.id,
+                "name": block.name,
+                "input": block.input
             }
+            for block in response.content
+            if block.type == "tool_use"
+        ])
+    
+    def _confirm_calls(self, tool_calls: List[Dict]) -> Optional[List[Dict]]:
+        """Show each tool call and ask the user to confirm it if required"""
+        for call in tool_calls:
+            tool_name = call["name"]
             
-        except Exception as e:
-            console.print(f"[red]Agent error: {str(e)}[/red]")
-            return {
-                "success": False,
-                "error": str(e)
+            console.print(f"[yellow]🔧 Using tool: {tool_name}[/yellow]")
+            console.print(f"[dim]   Input: {json.dumps(call['input'], indent=2)}[/dim]")
+            
+            # Confirm with user if required (the agent's own tools change nothing)
+            if self.require_confirmation and not self.allow_all and tool_name not in META_TOOLS:
+                from rich.prompt import Prompt
+                response_text = Prompt.ask(
+                    f"Execute {tool_name}?",
+                    choices=["y", "n", "a", "yes", "no", "all"],
+                    default="y",
+                    show_choices=True,
+                    show_default=True
+                ).lower()
+                
+                if response_text in ["a", "all"]:
+                    console.print("[green]✓ Allowing all subsequent operations for this task[/green]")
+                    self.allow_all = True
+                elif response_text in ["n", "no"]:
+                    console.print("[red]✗ Operation cancelled by user[/red]")
+                    return None
+        
+        return tool_calls
+    
+    def _run_tool_calls(self, run: TaskRun, tool_calls: List[Dict]) -> List[Dict]:
+        """
+        Run one turn's tool calls, returning results in tool_use order
+        
+        request_tools calls are answered here and widen the task's tool set.
+        A call to a registered tool outside the selected set widens it too.
+        fetch_tool_result calls are answered from the context side store.
+        """
+        started = time.perf_counter()
+        results: List[Optional[Dict]] = [None] * len(tool_calls)
+        pending = []
+        
+        for index, call in enumerate(tool_calls):
+            if call["name"] == REQUEST_TOOLS["name"] and run.active_tools is not None:
+                results[index] = self._request_more_tools(run, call["input"].get("query", ""))
+            elif call["name"] == FETCH_TOOL_RESULT["name"] and run.context is not None:
+                results[index] = run.context.fetch(call["input"].get("handle", ""))
+            else:
+                self._activate_tools(run, [call["name"]])
+                pending.append(index)
+        
+        pending_results = self.executor.run(
+            [tool_calls[index] for index in pending],
+            timeout=run.budget.remaining_seconds(),
+            cancel=run.cancel_token
+        )
+        for index, result in zip(pending, pending_results):
+            results[index] = result
+        
+        # Replayed plan steps have no Claude turn to charge the time to
+        elapsed = time.perf_counter() - started
+        run.tool_seconds += elapsed
+        if run.turns and run.turns[-1]["turn"] == run.iteration:
+            run.turns[-1]["tool_seconds"] += elapsed
+        
+        return results
+    
+    def _request_more_tools(self, run: TaskRun, query: str) -> Dict:
+        """Answer a request_tools call"""
+        names = [name for name in self.tool_selector.search(query) if name not in run.active_tools]
+        if not names:
+            return {"success": False, "error": f"No additional tools match: {query}"}
+        
+        self._activate_tools(run, names)
+        return {"success": True, "added_tools": names}
+    
+    def _activate_tools(self, run: TaskRun, names: List[str]) -> None:
+        """Add registered tools to a task's selected set"""
+        if run.active_tools is None:
+            return
+        
+        added = [name for name in names if name in self.registry and name not in run.active_tools]
+        if added:
+            run.active_tools.update(added)
+            run.request_tools = self._build_request_tools(run.active_tools)
+    
+    def _record_tool_results(self, run: TaskRun, response, tool_calls: List[Dict], results: List[Dict]) -> None:
+        """Add the assistant turn and its tool results to the conversation"""
+        blocks = [
+            {
+                "type": "tool_result",
+                "tool_use_id": call["id"],
+                "content": json.dumps(result)
             }
+            for call, result in zip(tool_calls, results)
+        ]
+        run.messages.append({"role": "assistant", "content": response.content})
+        run.messages.append({"role": "user", "content": blocks})
+        run.tool_history.append(list(zip(tool_calls, results)))
+        
+        # Shorten stale results once they outgrow the context budget
+        if run.context is not None:
+            run.context.add_results(blocks, results)
+            run.context.compact()
+    
+    def _find_plan(self, run: TaskRun) -> Optional[List[List[Dict]]]:
+        """Tool calls per turn of a learned plan matching the task, or None"""
+        # A replayed plan adds nothing to a session's history for later tasks to use
+        if self.plan_cache is None or run.session is not None:
+            return None
+        
+        plan = self.plan_cache.lookup(run.task)
+        if plan is None:
+            return None
+        
+        console.print("[cyan]♻ Replaying a saved plan for this task[/cyan]")
+        return [
+            [{"id": f"plan_{turn}_{index}", **call} for index, call in enumerate(calls)]
+            for turn, calls in enumerate(plan)
+        ]
+    
+    def _record_plan_step(self, run: TaskRun, tool_calls: List[Dict], results: List[Dict]) -> bool:
+        """
+        Record one replayed turn
+        
+        Returns:
+            False if a step failed; the plan is dropped and the task goes to Claude,
+            told which calls already ran so it does not repeat their side effects
+        """
+        run.tool_history.append(list(zip(tool_calls, results)))
+        for call, result in zip(tool_calls, results):
+            if not isinstance(result, dict) or "error" in result or result.get("success") is False:
+                console.print(f"[yellow]Saved plan failed at {call['name']}, asking Claude instead[/yellow]")
+                self.plan_cache.forget(run.task)
+                # The failed step stays in tool_history, so this run is not learned as a plan
+                lines = [
+                    "A saved plan for this task was partly carried out and one step failed. "
+                    "These tool calls already ran; do not repeat the ones that succeeded:"
+                ]
+                for turn in run.tool_history:
+                    for done_call, done_result in turn:
+                        lines.append(
+                            f"- {done_call['name']}({json.dumps(done_call['input'], default=str)}): "
+                            f"{json.dumps(done_result, default=str)[:500]}"
+                        )
+                run.messages[-1]["content"] = f"{run.task}\n\n" + "\n".join(lines)
+                return False
+        return True
+    
+    def _plan_result(self, run: TaskRun) -> Dict[str, Any]:
+        """Result of a task completed entirely from a saved plan"""
+        run.replayed_plan = True
+        lines = ["Completed using a saved plan:"]
+        for turn in run.tool_history:
+            for call, result in turn:
+                lines.append(f"- {call['name']}: {json.dumps(result, default=str)[:200]}")
+        return self._result(run, True, message="\n".join(lines))
+    
+    def _learn_plan(self, run: TaskRun) -> None:
+        """Remember the tool calls of a task Claude completed cleanly"""
+        # A follow-up in a session depends on the earlier turns, so it is not a plan on its own
+        if self.plan_cache is None or not run.tool_history or run.cache_point is not None:
+            return
+        
+        turns = []
+        for turn in run.tool_history:
+            for call, result in turn:
+                failed = not isinstance(result, dict) or "error" in result or result.get("success") is False
+                if call["name"] in META_TOOLS or failed:
+                    return
+            turns.append([{"name": call["name"], "input": call["input"]} for call, _ in turn])
+        
+        self.plan_cache.learn(run.task, turns)
+    
+    def _final_text(self, response) -> str:
+        """Extract the text of Claude's final response"""
+        final_text = ""
+        for block in response.content:
+            if hasattr(block, "text"):
+                final_text += block.text
+        return final_text
     
     def _execute_tool(self, tool_name: str, tool_input: Dict) -> Dict:
-        """Execute a tool function"""
+        """Execute a tool function, serving read-only tools from the result cache"""
         try:
-            if tool_name not in self.tool_functions:
+            func = self.registry.get_function(tool_name)
+            if func is None:
                 return {"error": f"Unknown tool: {tool_name}"}
             
-            func = self.tool_functions[tool_name]
-            result = func(**tool_input)
+            ttl = self.registry.cache_ttls.get(tool_name) if self.result_cache is not None else None
+            if ttl:
+                cached = self.result_cache.get(tool_name, tool_input)
+                with self._cache_counts_lock:
+                    self.cache_counts["hits" if cached is not None else "misses"] += 1
+                if cached is not None:
+                    console.print(f"[green]✓ Cached result for {tool_name}[/green]")
+                    return cached
+            
+            started = time.perf_counter()
+            try:
+                result = func(**tool_input)
+            finally:
+                elapsed = time.perf_counter() - started
+                TOOL_DURATION.observe(elapsed, tool=tool_name)
+            
+            failed = isinstance(result, dict) and "error" in result
+            if failed:
+                TOOL_ERRORS.inc(tool=tool_name)
+            
+            # Bound the result before serializing it: only a short preview is shown
+            preview = json.dumps(truncate(result, max_chars=80, max_items=8, depth=2), default=str)
+            console.print(f"[green]✓ Tool result: {preview[:200]}...[/green]")
+            logger.info("Tool finished", extra={"tool": tool_name, "seconds": round(elapsed, 4), "failed": failed})
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Tool result", extra={"tool": tool_name, "result": truncate(result, max_chars=2000)})
             
-            console.print(f"[green]✓ Tool result: {json.dumps(result, indent=2)[:200]}...[/green]")
+            if self.result_cache is not None:
+                if ttl and isinstance(result, dict) and "error" not in result:
+                    self.result_cache.put(tool_name, tool_input, result, ttl)
+                stale = self.registry.cache_invalidates.get(tool_name)
+                if stale:
+                    self.result_cache.invalidate(stale)
             
             return result
             
         except Exception as e:
+            TOOL_ERRORS.inc(tool=tool_name)
             error_msg = f"Tool execution error: {str(e)}"
             console.print(f"[red]{error_msg}[/red]")
+            logger.exception("Tool raised", extra={"tool": tool_name})
             return {"error": error_msg}
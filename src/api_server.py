@@ -3,19 +3,76 @@ FastAPI Backend Server for Axonyx GUI
 Exposes Windows Agent functionality via REST API
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import uvicorn
+import asyncio
+import json
 import os
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
 from dotenv import load_dotenv
 
-from agent import WindowsAgent
+from agent import WindowsAgent, wait_for_closed_clients
+from tools.registry import ToolRegistry
+from utils.agent_pool import AgentPool, PoolFullError
+from utils.budget import TaskBudget
+from utils.cancellation import CancellationToken
+from utils.idempotency import IdempotencyCache, IdempotencyConflict, fingerprint
+from utils.job_store import CANCELLED, FAILED, SUCCEEDED, Job, JobStore
+from utils.logger import setup_logger, truncate
+from utils.metrics import API_QUEUE_DEPTH, API_WORKER_UTILIZATION, IDEMPOTENT_REPLAYS, REGISTRY
+from utils.session_store import SessionStore
+from utils.task_stats import TASK_STATS
+from utils.warmup import WarmUp, stop_browser
 
 load_dotenv()
+setup_logger("axonyx", os.getenv("LOG_FILE"), os.getenv("LOG_LEVEL", "INFO"))
 
-app = FastAPI(title="Axonyx Revolt API", version="1.0.0")
+# How often idle pooled agents are looked for and closed
+POOL_SWEEP_SECONDS = 60
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up in the background (see GET /ready) and close idle pooled agents
+    while the server runs
+    """
+    async def sweep():
+        while True:
+            await asyncio.sleep(POOL_SWEEP_SECONDS)
+            pool.evict_idle()
+
+    async def warm_up():
+        # The pool is not thread-safe, so its agent is built here on the event loop
+        warmup.record("agent", lambda: pool.prewarm(current_model))
+        report = await asyncio.to_thread(warmup.run)
+        print(f"✅ Warm-up finished in {report['seconds']}s: " + ", ".join(
+            f"{step} {'ok' if outcome['ok'] else 'failed'} ({outcome['seconds']}s)"
+            for step, outcome in report["steps"].items()
+        ))
+
+    sweeper = asyncio.create_task(sweep())
+    warmer = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        warmer.cancel()
+        pool.close()
+        await wait_for_closed_clients()
+        if "browser" in warmup.results:
+            await asyncio.to_thread(stop_browser)
+
+
+app = FastAPI(title="Axonyx Revolt API", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS for Flutter app
 app.add_middleware(
@@ -26,14 +83,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global agent instance
-agent: Optional[WindowsAgent] = None
 current_model: str = os.getenv("CLAUDE_MODEL", "claude-3-5-haiku-20241022")
 
+# Cancellation tokens of the tasks in progress, by task id
+running_tasks: Dict[str, CancellationToken] = {}
 
-class ExecuteRequest(BaseModel):
-    task: str
+# Sessions with a task in progress; a session runs one task at a time
+busy_sessions: set = set()
+
+# Cold-start work done at startup (WARMUP_STEPS); GET /ready reports it
+warmup = WarmUp()
+
+# Responses of /execute and /jobs requests by Idempotency-Key
+idempotency = IdempotencyCache()
+
+# Background jobs started with POST /jobs, and the asyncio tasks running them
+jobs = JobStore()
+job_tasks: set = set()
+
+# Quiet seconds before an event stream sends a keep-alive
+EVENT_HEARTBEAT_SECONDS = 15
+
+
+class TaskOptions(BaseModel):
     model: Optional[str] = None
+    # Per-task budgets; omitted fields use the TASK_* settings, 0 means unlimited
+    max_iterations: Optional[int] = None
+    max_tokens: Optional[int] = None
+    deadline_seconds: Optional[float] = None
+
+
+class ExecuteRequest(TaskOptions):
+    task: str
+    # Client-chosen id for POST /tasks/{task_id}/cancel; generated when omitted
+    task_id: Optional[str] = None
+    # Continue this conversation (see GET/DELETE /sessions/{session_id})
+    session_id: Optional[str] = None
+
+
+class BatchRequest(TaskOptions):
+    tasks: List[str]
+    # Tasks run at once; defaults to BATCH_CONCURRENCY, at most API_WORKERS
+    concurrency: Optional[int] = None
 
 
 class SetModelRequest(BaseModel):
@@ -48,69 +139,221 @@ class ToolCallResponse(BaseModel):
 
 
 class AgentResponse(BaseModel):
+    task_id: Optional[str] = None
+    session_id: Optional[str] = None
     final_response: str
     success: bool
+    error: Optional[str] = None
     tool_calls: List[ToolCallResponse]
     iterations: int
+    model: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None
+    timing: Optional[Dict[str, float]] = None
+    cost_usd: Optional[float] = None
 
 
-def get_agent() -> WindowsAgent:
-    """Get or create agent instance"""
-    global agent, current_model
-    
-    if agent is None or agent.model != current_model:
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise HTTPException(status_code=500, detail="ANTHROPIC_API_KEY not set")
-        agent = WindowsAgent(api_key=api_key, model=current_model)
-        # Disable confirmation for GUI mode
-        agent.require_confirmation = False
-    
+def create_agent(model: str) -> WindowsAgent:
+    """Create an agent for the pool"""
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise HTTPException(status_code=500, detail="ANTHROPIC_API_KEY not set")
+    agent = WindowsAgent(api_key=api_key, model=model)
+    # Disable confirmation for GUI mode
+    agent.require_confirmation = False
     return agent
 
 
+# Each task leases its own agent, kept warm per model; API_WORKERS run at once,
+# API_QUEUE_SIZE more wait
+pool = AgentPool(create_agent)
+API_QUEUE_DEPTH.set_function(lambda: pool.queued)
+API_WORKER_UTILIZATION.set_function(lambda: pool.stats()["utilization"])
+
+
+def task_budget(request: TaskOptions) -> TaskBudget:
+    """Budget for a task, from the request's overrides and the TASK_* settings"""
+    return TaskBudget(
+        max_iterations=request.max_iterations,
+        max_tokens=request.max_tokens,
+        deadline_seconds=request.deadline_seconds
+    )
+
+
+def build_response(task_id: str, result: Dict[str, Any]) -> AgentResponse:
+    """Convert an agent result into the API response"""
+    tool_calls = []
+    for tool_result in result.get("tool_results", []):
+        tool_calls.append(ToolCallResponse(
+            name=tool_result.get("tool_name", "unknown"),
+            input=tool_result.get("input", {}),
+            result=tool_result.get("result", {}),
+            success=tool_result.get("result", {}).get("success", False)
+        ))
+
+    return AgentResponse(
+        task_id=task_id,
+        session_id=result.get("session_id"),
+        final_response=result.get("message") or result.get("error") or "",
+        success=result.get("success", False),
+        error=result.get("error"),
+        tool_calls=tool_calls,
+        iterations=result.get("iterations", len(result.get("turns", []))),
+        model=result.get("model"),
+        usage=result.get("usage"),
+        timing=result.get("timing"),
+        cost_usd=result.get("cost_usd")
+    )
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "ok",
         "model": current_model,
-        "api_key_set": bool(os.getenv("ANTHROPIC_API_KEY"))
+        "api_key_set": bool(os.getenv("ANTHROPIC_API_KEY")),
+        "pool": pool.stats()
     }
 
 
+@app.get("/ready")
+async def ready(response: Response):
+    """
+    Readiness: 503 until the startup warm-up has finished, then 200, with
+    the time each warm-up step took
+    """
+    if not warmup.done:
+        response.status_code = 503
+    return {**warmup.report(), "pool": pool.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: tool and LLM latency, tokens, iterations, errors"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/stats")
+async def stats():
+    """Rolling summary of recent tasks: success rate, latency, LLM vs tool time, tokens, cost"""
+    return TASK_STATS.summary()
+
+
+async def cancel_on_disconnect(http_request: Request, cancel_token: CancellationToken):
+    """Cancel a task whose client has gone away"""
+    while not cancel_token.cancelled:
+        if await http_request.is_disconnected():
+            cancel_token.cancel("client disconnected")
+            return
+        await asyncio.sleep(1)
+
+
+@app.get("/tasks")
+async def list_tasks():
+    """Ids of the tasks in progress"""
+    return {"tasks": list(running_tasks)}
+
+
+@app.post("/tasks/{task_id}/cancel")
+async def cancel_task(task_id: str):
+    """
+    Cancel a running task; it stops at its next step or tool poll
+    """
+    cancel_token = running_tasks.get(task_id)
+    if cancel_token is None:
+        raise HTTPException(status_code=404, detail=f"No running task {task_id}")
+    cancel_token.cancel("cancelled by client")
+    return {"task_id": task_id, "cancelled": True}
+
+
+def claim_session(session_id: Optional[str]) -> None:
+    """Mark a session busy, or refuse a second concurrent task in it"""
+    if session_id is None:
+        return
+    if session_id in busy_sessions:
+        raise HTTPException(status_code=409, detail=f"Session {session_id} already has a task running")
+    busy_sessions.add(session_id)
+
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    """Size and age of a conversation"""
+    session = await asyncio.to_thread(SessionStore.shared().load, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"No session {session_id}")
+    return {**session.summary(), "busy": session_id in busy_sessions}
+
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """Forget a conversation; the next task with this id starts fresh"""
+    if session_id in busy_sessions:
+        raise HTTPException(status_code=409, detail=f"Session {session_id} has a task running")
+    if not await asyncio.to_thread(SessionStore.shared().delete, session_id):
+        raise HTTPException(status_code=404, detail=f"No session {session_id}")
+    return {"session_id": session_id, "deleted": True}
+
+
+def replayed_request(endpoint: str, key: Optional[str], request: BaseModel) -> Optional[asyncio.Future]:
+    """The earlier request with this Idempotency-Key, if any (None without a key)"""
+    if key is None:
+        return None
+    try:
+        previous = idempotency.lookup(f"{endpoint}:{key}", fingerprint(request.model_dump()))
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if previous is not None:
+        IDEMPOTENT_REPLAYS.inc(endpoint=endpoint, state="completed" if previous.done() else "in_flight")
+    return previous
+
+
 @app.post("/execute", response_model=AgentResponse)
-async def execute_task(request: ExecuteRequest):
+async def execute_task(request: ExecuteRequest, http_request: Request, response: Response):
     """
     Execute a task using the Windows Agent
+    
+    With an Idempotency-Key header, a retry of a request still running waits
+    for the same task, and a retry of a successful one gets the same response.
     """
+    key = http_request.headers.get("idempotency-key")
+    previous = replayed_request("execute", key, request)
+    if previous is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return await asyncio.shield(previous)
+    if key is None:
+        return await run_task(request, http_request)
+    
+    # The task outlives this request, so a retry after a dropped connection can attach to it.
+    # Only successes are replayed; a retry of a failed or cancelled task runs it again
+    task = asyncio.create_task(run_task(request))
+    idempotency.track(f"execute:{key}", fingerprint(request.model_dump()), task, keep=lambda result: result.success)
+    return await asyncio.shield(task)
+
+
+async def run_task(request: ExecuteRequest, http_request: Optional[Request] = None) -> AgentResponse:
+    """Run one task on a pooled agent; it is cancelled if http_request's client disconnects"""
+    task_id = request.task_id or uuid.uuid4().hex
+    if task_id in running_tasks:
+        raise HTTPException(status_code=409, detail=f"Task {task_id} is already running")
+    claim_session(request.session_id)
+    cancel_token = CancellationToken()
+    running_tasks[task_id] = cancel_token
+    watcher = None
+    if http_request is not None:
+        watcher = asyncio.create_task(cancel_on_disconnect(http_request, cancel_token))
+    
     try:
-        # Update model if specified
-        if request.model:
-            global current_model
-            current_model = request.model
-            
-        agent = get_agent()
-        result = agent.execute_task(request.task)
+        async with pool.lease(request.model or current_model) as agent:
+            result = await agent.execute_task_async(
+                request.task, task_budget(request), cancel_token, request.session_id
+            )
         
-        # Extract tool calls information
-        tool_calls = []
-        if "tool_results" in result:
-            for tool_result in result["tool_results"]:
-                tool_calls.append(ToolCallResponse(
-                    name=tool_result.get("tool_name", "unknown"),
-                    input=tool_result.get("input", {}),
-                    result=tool_result.get("result", {}),
-                    success=tool_result.get("result", {}).get("success", False)
-                ))
-        
-        return AgentResponse(
-            final_response=result.get("final_response", "Task completed"),
-            success=result.get("success", False),
-            tool_calls=tool_calls,
-            iterations=result.get("iterations", 0)
-        )
+        return build_response(task_id, result)
         
+    except PoolFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_details = {
@@ -120,34 +363,247 @@ async def execute_task(request: ExecuteRequest):
         }
         print(f"❌ Error executing task: {error_details}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        running_tasks.pop(task_id, None)
+        busy_sessions.discard(request.session_id)
+
+
+@app.post("/batch")
+async def execute_batch(request: BatchRequest):
+    """
+    Run a list of tasks, a few at a time, streaming NDJSON: one line per task
+    as it finishes, then a summary line with timing
+    """
+    max_tasks = int(os.getenv("BATCH_MAX_TASKS", "100"))
+    if not request.tasks:
+        raise HTTPException(status_code=400, detail="No tasks given")
+    if len(request.tasks) > max_tasks:
+        raise HTTPException(status_code=400, detail=f"At most {max_tasks} tasks per batch")
+    concurrency = request.concurrency or int(os.getenv("BATCH_CONCURRENCY", str(pool.size)))
+    concurrency = max(1, min(concurrency, pool.size))
+    batch_id = uuid.uuid4().hex
+    model = request.model or current_model
+    limit = asyncio.Semaphore(concurrency)
+
+    async def run_one(index: int, task: str) -> Dict[str, Any]:
+        task_id = f"{batch_id}-{index}"
+        async with limit:
+            cancel_token = CancellationToken()
+            running_tasks[task_id] = cancel_token
+            started = time.perf_counter()
+            try:
+                async with pool.lease(model) as agent:
+                    result = await agent.execute_task_async(task, task_budget(request), cancel_token)
+                line = build_response(task_id, result).model_dump()
+            except PoolFullError as e:
+                line = {"task_id": task_id, "success": False, "error": str(e), "rejected": True}
+            except Exception as e:
+                line = {"task_id": task_id, "success": False, "error": str(e)}
+            finally:
+                running_tasks.pop(task_id, None)
+            return {"type": "result", "index": index, "task": task,
+                    "seconds": round(time.perf_counter() - started, 3), **line}
+
+    async def stream():
+        started = time.perf_counter()
+        pending = [asyncio.create_task(run_one(index, task)) for index, task in enumerate(request.tasks)]
+        seconds = []
+        succeeded = 0
+        try:
+            for finished in asyncio.as_completed(pending):
+                line = await finished
+                seconds.append(line["seconds"])
+                succeeded += bool(line.get("success"))
+                yield json.dumps(line, default=str, ensure_ascii=False) + "\n"
+        finally:
+            # The client went away: stop what is still running
+            for task_id in [task_id for task_id in running_tasks if task_id.startswith(f"{batch_id}-")]:
+                running_tasks[task_id].cancel("client disconnected")
+            for task in pending:
+                task.cancel()
+
+        seconds.sort()
+        summary = {
+            "type": "summary",
+            "batch_id": batch_id,
+            "tasks": len(seconds),
+            "succeeded": succeeded,
+            "failed": len(seconds) - succeeded,
+            "concurrency": concurrency,
+            "wall_seconds": round(time.perf_counter() - started, 3),
+            "task_seconds_total": round(sum(seconds), 3),
+            "task_seconds_mean": round(sum(seconds) / len(seconds), 3),
+            "task_seconds_max": seconds[-1]
+        }
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"X-Batch-Id": batch_id})
+
+
+async def run_job(job: Job, request: ExecuteRequest, agent_model: str, reservation: asyncio.Future):
+    """Run a job's task in the background, publishing its progress events"""
+    result = None
+    try:
+        async with pool.lease(agent_model, reservation) as agent:
+            if job.cancel_token.cancelled:
+                job.finish(CANCELLED, error=f"Task cancelled: {job.cancel_token.reason}")
+                return
+            job.start()
+            async for event in agent.stream_task_async(
+                job.task, task_budget(request), job.cancel_token, request.session_id
+            ):
+                if event["type"] == "done":
+                    result = event["result"]
+                elif event["type"] == "tool_result":
+                    # The full result is in the job's result; events only carry a preview
+                    job.publish({**event, "result": truncate(event["result"])})
+                else:
+                    job.publish(event)
+
+        if result.get("cancelled"):
+            status = CANCELLED
+        else:
+            status = SUCCEEDED if result.get("success") else FAILED
+        job.finish(status, build_response(job.id, result).model_dump(), result.get("error"))
+    except Exception as e:
+        print(f"❌ Error running job {job.id}: {e}")
+        job.finish(FAILED, error=str(e))
+    finally:
+        running_tasks.pop(job.id, None)
+        busy_sessions.discard(request.session_id)
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: ExecuteRequest, http_request: Request, response: Response):
+    """
+    Start a task in the background and return its job id at once
+    
+    A retry with the same Idempotency-Key gets the job already started.
+    """
+    key = http_request.headers.get("idempotency-key")
+    previous = replayed_request("jobs", key, request)
+    if previous is not None:
+        job = jobs.get(previous.result())
+        if job is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+            return {"job_id": job.id, "status": job.status}
+        # The job itself has expired; start it again
+        idempotency.forget(f"jobs:{key}")
+    
+    job_id = request.task_id or uuid.uuid4().hex
+    if job_id in running_tasks or jobs.get(job_id) is not None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already exists")
+    claim_session(request.session_id)
+    try:
+        agent_model = request.model or current_model
+        reservation = pool.reserve(agent_model)
+    except PoolFullError as e:
+        busy_sessions.discard(request.session_id)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+    job = jobs.create(request.task, job_id)
+    running_tasks[job.id] = job.cancel_token
+    background = asyncio.create_task(run_job(job, request, agent_model, reservation))
+    job_tasks.add(background)
+    background.add_done_callback(job_tasks.discard)
+    if key is not None:
+        idempotency.remember(f"jobs:{key}", fingerprint(request.model_dump()), job.id)
+    return {"job_id": job.id, "status": job.status}
+
+
+def get_job(job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job {job_id}")
+    return job
+
+
+@app.get("/jobs")
+async def list_jobs():
+    """Jobs that are running or finished within JOB_TTL_SECONDS"""
+    return {"jobs": [{"job_id": job.id, "status": job.status, "task": job.task} for job in jobs.list()]}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status of a job, with its result once finished"""
+    return get_job(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, http_request: Request, after: int = 0):
+    """
+    Server-sent events for a job: status changes, text deltas, tool starts
+    and results. Reconnecting clients resume after Last-Event-ID (or ?after=).
+    """
+    job = get_job(job_id)
+    after = int(http_request.headers.get("last-event-id", after))
+
+    async def stream():
+        async for event in job.follow(after, heartbeat=EVENT_HEARTBEAT_SECONDS):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            data = json.dumps(event, default=str, ensure_ascii=False)
+            yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/jobs/{job_id}/ws")
+async def job_events_ws(websocket: WebSocket, job_id: str, after: int = 0):
+    """
+    The job's events as JSON messages over a WebSocket; closes when the job finishes
+    """
+    await websocket.accept()
+    job = jobs.get(job_id)
+    if job is None:
+        await websocket.close(code=1008, reason=f"No job {job_id}")
+        return
+    try:
+        async for event in job.follow(after, heartbeat=EVENT_HEARTBEAT_SECONDS):
+            await websocket.send_json(event if event is not None else {"type": "heartbeat"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+# Serializes writes of the model setting to .env
+env_lock = threading.Lock()
+
+
+def save_model_setting() -> None:
+    """Persist the current model as CLAUDE_MODEL in .env, replacing the file atomically"""
+    with env_lock:
+        try:
+            env_path = Path(__file__).parent / ".env"
+            if not env_path.exists():
+                return
+            lines = env_path.read_text().splitlines(keepends=True)
+            lines = [f"CLAUDE_MODEL={current_model}\n" if line.startswith("CLAUDE_MODEL=") else line for line in lines]
+            temp_path = env_path.with_suffix(".tmp")
+            temp_path.write_text("".join(lines))
+            os.replace(temp_path, env_path)
+        except Exception as e:
+            print(f"Warning: Could not update .env file: {e}")
 
 
 @app.post("/set-model")
-async def set_model(request: SetModelRequest):
+async def set_model(request: SetModelRequest, background_tasks: BackgroundTasks):
     """
     Change the Claude model
     """
-    global current_model, agent
+    global current_model
     current_model = request.model
-    agent = None  # Force recreation with new model
     
-    # Update .env file
-    try:
-        from pathlib import Path
-        env_path = Path(__file__).parent / ".env"
-        
-        if env_path.exists():
-            with open(env_path, 'r') as f:
-                lines = f.readlines()
-            
-            with open(env_path, 'w') as f:
-                for line in lines:
-                    if line.startswith('CLAUDE_MODEL='):
-                        f.write(f'CLAUDE_MODEL={request.model}\n')
-                    else:
-                        f.write(line)
-    except Exception as e:
-        print(f"Warning: Could not update .env file: {e}")
+    # Written after the response is sent; each write saves the latest model
+    background_tasks.add_task(save_model_setting)
     
     return {
         "success": True,
@@ -189,16 +645,16 @@ async def get_available_tools():
     Get list of all available tools
     """
     try:
-        agent = get_agent()
+        tools = ToolRegistry().schemas
         return {
             "tools": [
                 {
                     "name": tool["name"],
                     "description": tool["description"]
                 }
-                for tool in agent.tools
+                for tool in tools
             ],
-            "count": len(agent.tools)
+            "count": len(tools)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,7 @@
 """
 Windows 11 Agentic AI - Main Entry Point
 """
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -13,14 +14,63 @@ from rich.prompt import Prompt
 sys.path.insert(0, str(Path(__file__).parent))
 
 from agent import WindowsAgent
+from utils.cancellation import CancellationToken
+from utils.logger import setup_logger
 
 console = Console()
 
 
+def render_task_events(events) -> dict:
+    """
+    Print agent events as they arrive and return the final task result
+    
+    The final answer is normally streamed as text. If it was not (a task
+    finished from a saved plan), its message is printed once it arrives.
+    
+    Args:
+        events: Event iterator from WindowsAgent.stream_task
+    
+    Returns:
+        The result carried by the "done" event
+    """
+    result = {"success": False, "error": "Task ended without a result"}
+    in_text = False
+    answered = False  # text streamed since the last tool call
+    
+    for event in events:
+        if event["type"] == "text":
+            console.print(event["text"], end="", markup=False, highlight=False)
+            in_text = answered = True
+            continue
+        
+        # End the streamed text line before anything else is printed
+        if in_text:
+            console.print()
+            in_text = False
+        
+        if event["type"] == "done":
+            result = event["result"]
+            if result.get("success") and result.get("message") and not answered:
+                console.print(result["message"], markup=False, highlight=False)
+        else:
+            answered = False
+    
+    return result
+
+
 def main():
     """Main entry point for the Windows Agent"""
+    parser = argparse.ArgumentParser(description="Windows 11 Agentic AI")
+    parser.add_argument(
+        "--session",
+        help="Continue this conversation: each task builds on the earlier ones (kept across runs)"
+    )
+    args = parser.parse_args()
+    
     # Load environment variables
     load_dotenv()
+    # Structured logs go to LOG_FILE only; the terminal is for the conversation
+    setup_logger("axonyx", os.getenv("LOG_FILE"), os.getenv("LOG_LEVEL", "INFO"), console=False)
     
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key or api_key == "your_anthropic_api_key_here":
@@ -48,7 +98,8 @@ def main():
         f"Model: [yellow]{model_display}[/yellow]\n"
         f"Mode: {confirmation_mode}\n\n"
         "[dim]Type your task in natural language, or 'quit' to exit\n"
-        "When prompted: [y]es, [n]o, [a]ll (yes to all for this task)[/dim]",
+        "When prompted: [y]es, [n]o, [a]ll (yes to all for this task)[/dim]"
+        + (f"\nSession: [cyan]{args.session}[/cyan]" if args.session else ""),
         title="🤖 Axonyx Revolt Agent"
     ))
     
@@ -57,6 +108,7 @@ def main():
     
     # Main loop
     while True:
+        cancel_token = CancellationToken()
         try:
             # Get user input
             task = Prompt.ask("\n[bold green]What would you like me to do?[/bold green]")
@@ -70,17 +122,19 @@ def main():
             
             # Execute task
             console.print(f"\n[cyan]🤔 Thinking about: {task}[/cyan]\n")
-            result = agent.execute_task(task)
+            result = render_task_events(agent.stream_task(task, cancel_token=cancel_token, session_id=args.session))
             
             # Display result
             if result.get("success"):
-                console.print(f"[green]✓ {result.get('message', 'Task completed')}[/green]")
+                console.print("[green]✓ Task completed[/green]")
                 if result.get("output"):
                     console.print(Panel(str(result["output"]), title="Output"))
             else:
                 console.print(f"[red]✗ {result.get('error', 'Task failed')}[/red]")
                 
         except KeyboardInterrupt:
+            # Tools still running in the background stop at their next poll
+            cancel_token.cancel("interrupted")
             console.print("\n[yellow]Interrupted. Type 'quit' to exit.[/yellow]")
         except Exception as e:
             console.print(f"[red]Error: {str(e)}[/red]")
@@ -12,6 +12,8 @@ try:
 except ImportError:
     Application = Desktop = None
 
+from utils.cancellation import cancelled_result, sleep as cancellable_sleep
+
 
 def launch_and_control_app(exe_path: str, window_title: str = None, maximize: bool = False) -> Dict:
     """
@@ -280,7 +282,8 @@ def wait_for_window(window_title: str, timeout: int = 30) -> Dict:
             except:
                 pass
             
-            time.sleep(0.5)
+            if cancellable_sleep(0.5):
+                return cancelled_result()
         
         return {"error": f"Window not found after {timeout} seconds"}
         
@@ -472,3 +475,10 @@ APP_CONTROL_FUNCTIONS = {
     "minimize_maximize_window": minimize_maximize_window,
     "wait_for_window": wait_for_window
 }
+
+
+# Tools that change state, and the cached tools whose results they make stale
+# (clicking Install or Finish in an installer window)
+CACHE_INVALIDATES = {
+    "click_button": ["list_installed_applications", "check_application_installed"]
+}
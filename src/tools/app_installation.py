@@ -339,3 +339,18 @@ INSTALLATION_FUNCTIONS = {
     "check_application_installed": check_application_installed,
     "download_and_install": download_and_install
 }
+
+
+# Read-only tools whose results may be reused for this many seconds. Kept short:
+# an installer started with start_process can finish long after it was launched
+CACHE_TTLS = {
+    "list_installed_applications": 30,
+    "check_application_installed": 30
+}
+
+# Tools that change state, and the cached tools whose results they make stale
+CACHE_INVALIDATES = {
+    "install_application": ["list_installed_applications", "check_application_installed"],
+    "uninstall_application": ["list_installed_applications", "check_application_installed"],
+    "download_and_install": ["list_installed_applications", "check_application_installed"]
+}
@@ -20,6 +20,18 @@ class BrowserSession:
     """Manages browser session state"""
     driver = None
     current_url = None
+    options = None  # (browser, headless, use_profile) the driver was started with
+
+
+def _reusable_session(options: tuple) -> bool:
+    """Whether the open session was started with these options and is still alive"""
+    if BrowserSession.driver is None or BrowserSession.options != options:
+        return False
+    try:
+        BrowserSession.driver.current_window_handle
+        return True
+    except Exception:
+        return False
 
 
 def start_browser(headless: bool = False, browser: str = "chrome", use_profile: bool = False) -> Dict:
@@ -34,6 +46,22 @@ def start_browser(headless: bool = False, browser: str = "chrome", use_profile:
     if not webdriver:
         return {"error": "selenium not installed. Run: pip install selenium"}
     
+    # A session started earlier (e.g. by the API server's warm-up) is reused
+    options_key = (browser.lower(), headless, use_profile)
+    if _reusable_session(options_key):
+        return {
+            "success": True,
+            "message": f"{browser.capitalize()} browser already running",
+            "headless": headless,
+            "reused": True
+        }
+    if BrowserSession.driver is not None:
+        try:
+            BrowserSession.driver.quit()
+        except Exception:
+            pass
+        BrowserSession.driver = None
+    
     try:
         if browser.lower() == "chrome":
             options = Options()
@@ -66,6 +94,7 @@ def start_browser(headless: bool = False, browser: str = "chrome", use_profile:
             return {"error": f"Unsupported browser: {browser}"}
         
         BrowserSession.driver.maximize_window()
+        BrowserSession.options = options_key
         
         return {
             "success": True,
@@ -233,6 +262,7 @@ def close_browser() -> Dict:
         BrowserSession.driver.quit()
         BrowserSession.driver = None
         BrowserSession.current_url = None
+        BrowserSession.options = None
         
         return {
             "success": True,
@@ -432,3 +462,9 @@ BROWSER_FUNCTIONS = {
     "wait_for_element": wait_for_element,
     "close_browser": close_browser
 }
+
+
+# Tools that change state, and the cached tools whose results they make stale
+CACHE_INVALIDATES = {
+    "take_browser_screenshot": ["list_directory", "read_file"]
+}
@@ -7,6 +7,8 @@ import os
 from typing import Dict, List
 from pathlib import Path
 
+from utils.cancellation import cancelled_result, sleep as cancellable_sleep
+
 
 def get_downloads_folder() -> Path:
     """Get the actual Downloads folder path (OneDrive-aware)"""
@@ -69,7 +71,8 @@ def wait_for_download(file_pattern: str, timeout: int = 120, check_interval: int
                 # Update size for next check
                 found_files[str(file_path)] = file_size
             
-            time.sleep(check_interval)
+            if cancellable_sleep(check_interval):
+                return cancelled_result()
         
         return {
             "success": False,
@@ -323,3 +326,10 @@ DOWNLOAD_MANAGER_FUNCTIONS = {
     "find_latest_download": find_latest_download,
     "check_download_in_progress": check_download_in_progress
 }
+
+
+# Tools that change state, and the cached tools whose results they make stale
+# (a finished download is a new file in the downloads folder)
+CACHE_INVALIDATES = {
+    "wait_for_download": ["list_directory", "read_file"]
+}
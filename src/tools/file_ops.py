@@ -239,3 +239,19 @@ FILE_FUNCTIONS = {
     "move_path": move_path,
     "copy_path": copy_path
 }
+
+
+# Read-only tools whose results may be reused for this many seconds
+CACHE_TTLS = {
+    "list_directory": 10,
+    "read_file": 10
+}
+
+# Tools that change state, and the cached tools whose results they make stale
+CACHE_INVALIDATES = {
+    "create_directory": ["list_directory"],
+    "create_file": ["list_directory", "read_file"],
+    "delete_path": ["list_directory", "read_file"],
+    "move_path": ["list_directory", "read_file"],
+    "copy_path": ["list_directory", "read_file"]
+}
@@ -5,13 +5,18 @@ Google Images Download Tool - Automated image search and download
 import time
 from typing import Dict, List
 from pathlib import Path
-import requests
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import pyautogui
+
+from utils.cancellation import is_cancelled, sleep as cancellable_sleep
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+try:
+    import pyautogui
+except ImportError:
+    pyautogui = None
 
 
 def search_and_download_images(query: str, count: int = 10, download_folder: str = None) -> Dict:
@@ -63,7 +68,8 @@ def search_and_download_images(query: str, count: int = 10, download_folder: str
             driver.execute_script("window.scrollBy(0, 1000);")
             time.sleep(0.5)
         
-        while len(downloaded_images) < count and attempts < max_attempts:
+        # Stop between images once the task is cancelled, keeping what was downloaded
+        while len(downloaded_images) < count and attempts < max_attempts and not is_cancelled():
             try:
                 attempts += 1
                 
@@ -77,7 +83,7 @@ def search_and_download_images(query: str, count: int = 10, download_folder: str
                 if attempts - 1 >= len(thumbnails):
                     # Scroll more to load additional images
                     driver.execute_script("window.scrollBy(0, 500);")
-                    time.sleep(1)
+                    cancellable_sleep(1)
                     continue
                 
                 thumbnail = thumbnails[min(attempts - 1, len(thumbnails) - 1)]
@@ -92,7 +98,8 @@ def search_and_download_images(query: str, count: int = 10, download_folder: str
                 except (ElementClickInterceptedException, Exception):
                     driver.execute_script("arguments[0].click();", thumbnail)
                 
-                time.sleep(2)  # Wait for full image to load
+                if cancellable_sleep(2):  # Wait for full image to load
+                    break
                 
                 # Find full-size image with multiple strategies
                 full_image = None
@@ -148,6 +155,7 @@ def search_and_download_images(query: str, count: int = 10, download_folder: str
         
         return {
             "success": True if len(downloaded_images) > 0 else False,
+            "cancelled": is_cancelled(),
             "message": f"Downloaded {len(downloaded_images)} of {count} requested images for '{query}'",
             "images": downloaded_images,
             "download_folder": str(downloads),
@@ -300,3 +308,10 @@ IMAGE_DOWNLOAD_FUNCTIONS = {
     "quick_google_images_search": quick_google_images_search,
     "download_image_from_url": download_image_from_url
 }
+
+
+# Tools that change state, and the cached tools whose results they make stale
+CACHE_INVALIDATES = {
+    "search_and_download_images": ["list_directory", "read_file"],
+    "download_image_from_url": ["list_directory", "read_file"]
+}
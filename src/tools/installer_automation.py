@@ -422,3 +422,11 @@ INSTALLER_AUTOMATION_FUNCTIONS = {
     "automate_python_installer": automate_python_installer,
     "check_installation_progress": check_installation_progress
 }
+
+
+# Tools that change state, and the cached tools whose results they make stale
+CACHE_INVALIDATES = {
+    "automate_python_installer": ["list_installed_applications", "check_application_installed"],
+    "find_and_click_button_by_text": ["list_installed_applications", "check_application_installed"],
+    "check_installation_progress": ["list_installed_applications", "check_application_installed"]
+}
@@ -6,8 +6,15 @@ import time
 from typing import Dict
 from pathlib import Path
 import subprocess
-from pywinauto import Desktop
-import pyautogui
+
+try:
+    from pywinauto import Desktop
+    import pyautogui
+except ImportError as e:
+    print(f"Warning: installer_automation_v2 dependencies not available: {e}")
+    Desktop = pyautogui = None
+
+from utils.cancellation import cancelled_result, sleep as cancellable_sleep
 
 
 def wait_for_installer_window_v2(window_title_contains: str, timeout: int = 15) -> Dict:
@@ -376,7 +383,8 @@ def check_installation_complete_v2(expected_window_title: str, check_interval: i
                 app = desktop.window(title=expected_window_title, top_level_only=True)
                 if app.exists(timeout=1):
                     checks_done += 1
-                    time.sleep(check_interval)
+                    if cancellable_sleep(check_interval):
+                        return cancelled_result()
                 else:
                     return {
                         "success": True,
@@ -523,3 +531,11 @@ INSTALLER_AUTOMATION_V2_FUNCTIONS = {
     "automate_python_installer_v2": automate_python_installer_v2,
     "check_installation_complete_v2": check_installation_complete_v2
 }
+
+
+# Tools that change state, and the cached tools whose results they make stale
+CACHE_INVALIDATES = {
+    "automate_python_installer_v2": ["list_installed_applications", "check_application_installed"],
+    "click_button_in_window_v2": ["list_installed_applications", "check_application_installed"],
+    "check_installation_complete_v2": ["list_installed_applications", "check_application_installed"]
+}
@@ -175,3 +175,16 @@ PROCESS_FUNCTIONS = {
     "kill_process": kill_process,
     "get_process_info": get_process_info
 }
+
+
+# Read-only tools whose results may be reused for this many seconds
+CACHE_TTLS = {
+    "list_processes": 5
+}
+
+# Tools that change state, and the cached tools whose results they make stale
+CACHE_INVALIDATES = {
+    # Starting an installer (or an uninstaller) changes what is installed
+    "start_process": ["list_processes", "list_installed_applications", "check_application_installed"],
+    "kill_process": ["list_processes"]
+}
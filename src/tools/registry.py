@@ -0,0 +1,162 @@
+"""
+Tool Registry - tool schemas up front, implementations on demand
+
+Tool modules pull in heavy optional dependencies (selenium, pywinauto,
+pyautogui, pytesseract, PIL). The schemas returned by each module's
+get_*_tools() function are plain literals, so the registry reads them
+straight from the module source and only imports a module the first time
+one of its tools is called.
+"""
+import ast
+import importlib
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+# (module, schema function, function table, shared resource) in registration order.
+# The resource names tools that drive shared desktop state and must be serialized:
+# "desktop" for mouse, keyboard and window focus, "browser" for the Selenium session.
+# A tuple names every resource a module's tools use; all of their locks are held.
+TOOL_MODULES = [
+    ("file_ops", "get_file_tools", "FILE_FUNCTIONS", None),
+    ("process_ops", "get_process_tools", "PROCESS_FUNCTIONS", None),
+    ("ui_automation", "get_ui_tools", "UI_FUNCTIONS", "desktop"),
+    ("system_info", "get_system_tools", "SYSTEM_FUNCTIONS", None),
+    ("app_installation", "get_installation_tools", "INSTALLATION_FUNCTIONS", None),
+    ("system_settings", "get_system_settings_tools", "SYSTEM_SETTINGS_FUNCTIONS", None),
+    ("app_control", "get_app_control_tools", "APP_CONTROL_FUNCTIONS", "desktop"),
+    ("browser_automation", "get_browser_tools", "BROWSER_FUNCTIONS", "browser"),
+    ("chrome_launcher", "get_chrome_launcher_tools", "CHROME_LAUNCHER_FUNCTIONS", "desktop"),
+    ("screen_reader", "get_screen_reader_tools", "SCREEN_READER_FUNCTIONS", None),
+    ("installer_automation", "get_installer_automation_tools", "INSTALLER_AUTOMATION_FUNCTIONS", "desktop"),
+    ("installer_automation_v2", "get_installer_automation_v2_tools", "INSTALLER_AUTOMATION_V2_FUNCTIONS", "desktop"),
+    ("download_manager", "get_download_manager_tools", "DOWNLOAD_MANAGER_FUNCTIONS", None),
+    ("image_downloader", "get_image_download_tools", "IMAGE_DOWNLOAD_FUNCTIONS", ("browser", "desktop")),
+]
+
+
+def _import_tool_module(module: str):
+    return importlib.import_module(f"{__package__}.{module}")
+
+
+@lru_cache(maxsize=None)
+def _parse_module(module: str) -> ast.Module:
+    path = Path(__file__).parent / f"{module}.py"
+    return ast.parse(path.read_text(encoding="utf-8"))
+
+
+@lru_cache(maxsize=None)
+def _read_schemas(module: str, schema_function: str) -> tuple:
+    """
+    Read a module's tool schemas without importing it
+
+    Falls back to importing the module if the schema function does not
+    simply return a literal.
+    """
+    for node in _parse_module(module).body:
+        if isinstance(node, ast.FunctionDef) and node.name == schema_function:
+            for statement in node.body:
+                if isinstance(statement, ast.Return):
+                    try:
+                        return tuple(ast.literal_eval(statement.value))
+                    except ValueError:
+                        break
+
+    return tuple(getattr(_import_tool_module(module), schema_function)())
+
+
+def _read_constant(module: str, name: str) -> Dict:
+    """Read a module-level literal dict (e.g. CACHE_TTLS) without importing the module"""
+    for node in _parse_module(module).body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id == name):
+            return ast.literal_eval(node.value)
+    return {}
+
+
+class ToolRegistry:
+    """
+    Tool schemas and lazily imported tool implementations
+    """
+
+    def __init__(self, modules: List[tuple] = None):
+        self.modules = modules or TOOL_MODULES
+        self.schemas: List[Dict] = []
+        self.resources: Dict[str, Union[str, Tuple[str, ...]]] = {}
+        self.cache_ttls: Dict[str, float] = {}
+        self.cache_invalidates: Dict[str, List[str]] = {}
+        self._owners: Dict[str, tuple] = {}
+        self._functions: Dict[str, Callable] = {}
+        self._loaded = set()
+        self._lock = threading.Lock()
+
+        for entry in self.modules:
+            module, schema_function, _, resource = entry
+            for schema in _read_schemas(module, schema_function):
+                self.schemas.append(schema)
+                self._owners[schema["name"]] = entry
+                if resource:
+                    self.resources[schema["name"]] = resource
+
+            # Optional result caching declarations (see utils/result_cache.py)
+            self.cache_ttls.update(_read_constant(module, "CACHE_TTLS"))
+            self.cache_invalidates.update(_read_constant(module, "CACHE_INVALIDATES"))
+
+    def __contains__(self, tool_name: str) -> bool:
+        return tool_name in self._owners
+
+    def module_of(self, tool_name: str) -> Optional[str]:
+        """Name of the tool module that implements a tool"""
+        entry = self._owners.get(tool_name)
+        return entry[0] if entry else None
+
+    def get_function(self, tool_name: str) -> Optional[Callable]:
+        """Get a tool's implementation, importing its module on first use"""
+        func = self._functions.get(tool_name)
+        if func is not None:
+            return func
+
+        entry = self._owners.get(tool_name)
+        if entry is None:
+            return None
+
+        self._load(entry)
+        return self._functions.get(tool_name)
+
+    def set_function(self, tool_name: str, func: Callable) -> None:
+        """Replace a registered tool's implementation (for tests and benchmarks)"""
+        if tool_name not in self._owners:
+            raise KeyError(f"Unknown tool: {tool_name}")
+        self._functions[tool_name] = func
+
+    def _load(self, entry: tuple):
+        module, _, functions_table, _ = entry
+        with self._lock:
+            if module in self._loaded:
+                return
+            self._functions.update(getattr(_import_tool_module(module), functions_table))
+            self._loaded.add(module)
+
+    def load_all(self) -> Dict[str, Dict]:
+        """
+        Import every tool module now
+
+        Returns:
+            Per module: {"seconds": import time} plus "error" if the import failed
+        """
+        timings = {}
+        for entry in self.modules:
+            start = time.perf_counter()
+            try:
+                self._load(entry)
+                timings[entry[0]] = {"seconds": time.perf_counter() - start}
+            except Exception as e:
+                timings[entry[0]] = {"seconds": time.perf_counter() - start, "error": str(e)}
+        return timings
+
+    @property
+    def loaded_modules(self) -> List[str]:
+        """Tool modules imported so far"""
+        return sorted(self._loaded)
@@ -400,3 +400,9 @@ SCREEN_READER_FUNCTIONS = {
     "extract_currency_from_screen": extract_currency_from_screen,
     "locate_image_on_screen": locate_image_on_screen
 }
+
+
+# Tools that change state, and the cached tools whose results they make stale
+CACHE_INVALIDATES = {
+    "take_screenshot": ["list_directory", "read_file"]
+}
@@ -0,0 +1,161 @@
+"""
+Tool Selector - picks the tools relevant to a task
+
+An offline BM25 index over tool names, descriptions, parameter names and
+per-module category tags. Each task gets its top-K tools plus a small
+always-on core. Claude can pull in more tools with the request_tools meta
+tool.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Set
+
+# Everyday words for each tool module so that phrasing like "how much space
+# is left" or "open a website" reaches the right category
+CATEGORY_TAGS = {
+    "file_ops": "file files folder directory document path",
+    "process_ops": "process program running task kill pid",
+    "ui_automation": "keyboard mouse type press click key hotkey window screen",
+    "system_info": "system computer pc hardware cpu processor memory ram disk drive storage space network battery",
+    "app_installation": "install uninstall installed application app program software",
+    "system_settings": "settings wallpaper volume sound theme dark light power display screen timeout update",
+    "app_control": "application app window button menu control",
+    "browser_automation": "browser web website page url link chrome selenium",
+    "chrome_launcher": "chrome browser open website profile",
+    "screen_reader": "screen screenshot ocr read text image price",
+    "installer_automation": "installer setup wizard install checkbox next",
+    "installer_automation_v2": "installer setup wizard install checkbox next",
+    "download_manager": "download downloads downloaded file",
+    "image_downloader": "image images picture pictures photo photos google download",
+}
+
+# Tools offered on every task regardless of score
+CORE_TOOLS = (
+    "list_directory",
+    "read_file",
+    "start_process",
+    "get_system_info",
+    "take_screenshot",
+)
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from",
+    "how", "i", "if", "in", "is", "it", "me", "my", "of", "on", "or", "please",
+    "the", "this", "to", "what", "whats", "with", "you",
+}
+
+REQUEST_TOOLS = {
+    "name": "request_tools",
+    "description": (
+        "Only a subset of the available tools is listed. Call this with a short "
+        "description of what you need (e.g. 'uninstall an application', 'read text "
+        "from the screen') to make matching tools available on your next turn."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "What the tools should be able to do"
+            }
+        },
+        "required": ["query"]
+    }
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split snake_case and strip simple plurals"""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower().replace("_", " ")):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def _tool_document(tool: Dict, tags: str) -> str:
+    properties = tool.get("input_schema", {}).get("properties", {})
+    parts = [tool["name"], tool.get("description", ""), tags]
+    for name, spec in properties.items():
+        parts.append(name)
+        parts.append(spec.get("description", ""))
+    return " ".join(parts)
+
+
+class ToolSelector:
+    """
+    BM25 retrieval over tool descriptions
+    """
+
+    def __init__(
+        self,
+        documents: Dict[str, str],
+        core: Iterable[str] = CORE_TOOLS,
+        top_k: int = 15,
+        k1: float = 1.5,
+        b: float = 0.75
+    ):
+        """
+        Args:
+            documents: Map of tool name -> text to index
+            core: Tools included in every selection
+            top_k: How many scored tools to add to the core
+            k1, b: BM25 parameters
+        """
+        self.core = [name for name in core if name in documents]
+        self.top_k = top_k
+        self.k1 = k1
+        self.b = b
+
+        self._term_counts = {name: Counter(tokenize(text)) for name, text in documents.items()}
+        self._lengths = {name: sum(counts.values()) for name, counts in self._term_counts.items()}
+        self._avg_length = (sum(self._lengths.values()) / len(self._lengths)) if self._lengths else 0.0
+
+        document_frequency = Counter()
+        for counts in self._term_counts.values():
+            document_frequency.update(counts.keys())
+        total = len(self._term_counts)
+        self._idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    @classmethod
+    def from_registry(cls, registry, **kwargs) -> "ToolSelector":
+        """Build the index from a ToolRegistry's schemas and category tags"""
+        documents = {
+            tool["name"]: _tool_document(tool, CATEGORY_TAGS.get(registry.module_of(tool["name"]), ""))
+            for tool in registry.schemas
+        }
+        return cls(documents, **kwargs)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """BM25 score of every tool with at least one matching term"""
+        query = set(tokenize(text))
+        scores = {}
+        for name, counts in self._term_counts.items():
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[name] / (self._avg_length or 1))
+            for term in query:
+                tf = counts.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            if score > 0:
+                scores[name] = score
+        return scores
+
+    def search(self, text: str, limit: int = None) -> List[str]:
+        """Tool names ranked by relevance to the text"""
+        scores = self.scores(text)
+        ranked = sorted(scores, key=lambda name: (-scores[name], name))
+        return ranked[:limit or self.top_k]
+
+    def select(self, task: str) -> Set[str]:
+        """Core tools plus the top-K tools for a task"""
+        return set(self.core) | set(self.search(task))
@@ -210,3 +210,14 @@ SYSTEM_FUNCTIONS = {
     "get_network_info": get_network_info,
     "get_battery_info": get_battery_info
 }
+
+
+# Read-only tools whose results may be reused for this many seconds
+CACHE_TTLS = {
+    "get_system_info": 300,
+    "get_cpu_info": 5,
+    "get_memory_info": 5,
+    "get_disk_info": 30,
+    "get_network_info": 10,
+    "get_battery_info": 30
+}
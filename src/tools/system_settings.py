@@ -313,3 +313,9 @@ SYSTEM_SETTINGS_FUNCTIONS = {
     "disable_windows_updates": disable_windows_updates,
     "open_windows_settings": open_windows_settings
 }
+
+
+# Read-only tools whose results may be reused for this many seconds
+CACHE_TTLS = {
+    "get_display_settings": 300
+}
@@ -282,3 +282,11 @@ UI_FUNCTIONS = {
     "find_window": find_window,
     "hotkey": hotkey_wrapper
 }
+
+
+# Tools that change state, and the cached tools whose results they make stale
+# (a click or key press may be the one that finishes an installer)
+CACHE_INVALIDATES = {
+    "click_mouse": ["list_installed_applications", "check_application_installed"],
+    "press_key": ["list_installed_applications", "check_application_installed"]
+}
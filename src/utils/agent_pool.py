@@ -0,0 +1,232 @@
+"""
+Bounded pool of agent instances for the API server
+
+Each request leases its own agent, so concurrent tasks never share
+per-agent state (the "allow all" flag, the tool executor). At most `size`
+tasks run at once; up to `max_queue` more wait in arrival order, and
+anything beyond that is refused immediately so the caller can retry later.
+
+Agents are kept warm per model: a request for a model reuses an idle
+agent built for it, so clients alternating models do not pay for agent
+construction each time. When every slot is taken, the least recently
+used idle agent of another model makes room. Agents left idle for
+`idle_seconds` are closed.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import AGENTS_CREATED, AGENTS_EVICTED, API_QUEUE_WAIT, API_REJECTED
+
+
+class PoolFullError(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+def close_agent(agent: Any) -> None:
+    """Release an agent's resources, if it has a close()"""
+    close = getattr(agent, "close", None)
+    if close is not None:
+        close()
+
+
+class AgentPool:
+    """
+    Fixed number of lazily created agents, kept per model, with a bounded wait queue
+    """
+
+    def __init__(self, factory: Callable[[str], Any], size: Optional[int] = None, max_queue: Optional[int] = None,
+                 idle_seconds: Optional[float] = None, closer: Callable[[Any], None] = close_agent):
+        """
+        Args:
+            factory: Creates a new agent for a model; the agent's `model` attribute is its key
+            size: Agents (concurrent tasks) at most (API_WORKERS, default 2)
+            max_queue: Requests allowed to wait for an agent (API_QUEUE_SIZE, default 8)
+            idle_seconds: Close agents unused for this long (API_AGENT_IDLE_SECONDS, default 600; 0 keeps them)
+            closer: Releases an agent that leaves the pool
+        """
+        if idle_seconds is None:
+            idle_seconds = float(os.getenv("API_AGENT_IDLE_SECONDS", "600"))
+        self.factory = factory
+        self.closer = closer
+        self.size = size or int(os.getenv("API_WORKERS", "2"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("API_QUEUE_SIZE", "8"))
+        self.idle_seconds = idle_seconds or None
+        self._idle: Dict[str, List[Tuple[Any, float]]] = {}  # model -> [(agent, released at)], oldest first
+        self._created = 0
+        self._waiters: deque = deque()  # (reservation, model)
+
+    @property
+    def idle(self) -> int:
+        return sum(len(agents) for agents in self._idle.values())
+
+    @property
+    def busy(self) -> int:
+        return self._created - self.idle
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _create(self, model: str) -> Any:
+        """Build an agent in a slot that is already counted"""
+        try:
+            agent = self.factory(model)
+        except Exception:
+            self._created -= 1
+            raise
+        AGENTS_CREATED.inc(model=model)
+        return agent
+
+    def _discard(self, agent: Any, reason: str) -> None:
+        AGENTS_EVICTED.inc(reason=reason)
+        self.closer(agent)
+
+    def _evict_other_model(self, model: str) -> bool:
+        """Close the least recently used idle agent of another model to free its slot"""
+        candidates = [(agents[0][1], other) for other, agents in self._idle.items() if other != model and agents]
+        if not candidates:
+            return False
+        _, other = min(candidates)
+        agent, _ = self._idle[other].pop(0)
+        if not self._idle[other]:
+            del self._idle[other]
+        self._discard(agent, "model")
+        return True
+
+    def reserve(self, model: str) -> "asyncio.Future":
+        """
+        Claim an agent for model, or a place in line, without waiting
+
+        Returns:
+            Future for the agent, already done if one was free
+
+        Raises:
+            PoolFullError: if the wait queue is already full
+        """
+        self.evict_idle()
+        reservation = asyncio.get_running_loop().create_future()
+        if self._idle.get(model):
+            agent, _ = self._idle[model].pop()
+            if not self._idle[model]:
+                del self._idle[model]
+            reservation.set_result(agent)
+        elif self._created < self.size or self._evict_other_model(model):
+            if self._created < self.size:
+                self._created += 1
+            reservation.set_result(self._create(model))
+        elif len(self._waiters) >= self.max_queue:
+            API_REJECTED.inc()
+            raise PoolFullError(f"All {self.size} workers are busy and {self.max_queue} requests are waiting")
+        else:
+            self._waiters.append((reservation, model))
+        return reservation
+
+    async def wait(self, reservation: "asyncio.Future") -> Any:
+        """Wait for a reserved agent; cancelling gives up the place in line"""
+        started = time.perf_counter()
+        try:
+            agent = await asyncio.shield(reservation)
+        except asyncio.CancelledError:
+            # Gave up waiting; pass on an agent that arrived in the meantime
+            if reservation.done() and reservation.exception() is None:
+                self.release(reservation.result())
+            elif not reservation.done():
+                reservation.cancel()
+                self._waiters = deque(waiter for waiter in self._waiters if waiter[0] is not reservation)
+            raise
+        API_QUEUE_WAIT.observe(time.perf_counter() - started)
+        return agent
+
+    async def acquire(self, model: str) -> Any:
+        """
+        Lease an agent for model, waiting in line if all are busy
+
+        Raises:
+            PoolFullError: if the wait queue is already full
+        """
+        return await self.wait(self.reserve(model))
+
+    def release(self, agent: Any) -> None:
+        """
+        Return an agent, handing it straight to the next waiter if there is one
+
+        A waiter for another model gets the slot: the agent is closed and
+        one is built for the waiter's model.
+        """
+        while self._waiters:
+            waiter, model = self._waiters.popleft()
+            if waiter.done():
+                continue
+            if model == agent.model:
+                waiter.set_result(agent)
+                return
+            self._discard(agent, "model")
+            try:
+                waiter.set_result(self._create(model))
+            except Exception as e:
+                waiter.set_exception(e)
+            return
+        self._idle.setdefault(agent.model, []).append((agent, time.monotonic()))
+
+    @asynccontextmanager
+    async def lease(self, model: str, reservation: Optional["asyncio.Future"] = None) -> AsyncIterator[Any]:
+        """async with pool.lease(model) as agent: ... (optionally for an earlier reserve())"""
+        agent = await self.wait(reservation or self.reserve(model))
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    def prewarm(self, model: str) -> Dict[str, Any]:
+        """Build an idle agent for model ahead of the first request, if a slot is free"""
+        if self._idle.get(model) or self._created >= self.size:
+            return {"created": False}
+        self._created += 1
+        agent = self._create(model)
+        self._idle.setdefault(model, []).append((agent, time.monotonic()))
+        return {"created": True, "model": model}
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Close agents idle for longer than idle_seconds; returns how many were closed"""
+        if self.idle_seconds is None:
+            return 0
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        for model in list(self._idle):
+            keep = []
+            for agent, released in self._idle[model]:
+                if now - released >= self.idle_seconds:
+                    self._discard(agent, "idle")
+                    evicted += 1
+                else:
+                    keep.append((agent, released))
+            if keep:
+                self._idle[model] = keep
+            else:
+                del self._idle[model]
+        self._created -= evicted
+        return evicted
+
+    def close(self) -> None:
+        """Close every idle agent (at shutdown)"""
+        for agents in self._idle.values():
+            for agent, _ in agents:
+                self.closer(agent)
+        self._created -= self.idle
+        self._idle.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Workers, how many are busy, queue depth, utilization and warm agents per model"""
+        return {
+            "workers": self.size,
+            "created": self._created,
+            "busy": self.busy,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "utilization": round(self.busy / self.size, 3) if self.size else 0.0,
+            "idle_by_model": {model: len(agents) for model, agents in self._idle.items()}
+        }
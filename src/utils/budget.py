@@ -0,0 +1,88 @@
+"""
+Per-task budgets: iterations, tokens and wall-clock deadline
+
+A task wraps up gracefully as a budget runs low: its next request asks
+Claude for a final answer with tool use disabled. At the deadline itself,
+tools still running are abandoned and the task ends.
+"""
+import os
+import time
+from typing import Any, Dict, Optional
+
+# Appended to the conversation when a budget is nearly used up
+WRAP_UP_PROMPT = (
+    "The task's {reason} budget is nearly used up. Do not call any more tools. "
+    "Reply now with your final answer: what was done, and what is left if the "
+    "task is not complete."
+)
+
+
+class TaskBudget:
+    """
+    Limits for one task; 0 or None means unlimited
+    """
+
+    def __init__(self, max_iterations: Optional[int] = None, max_tokens: Optional[int] = None,
+                 deadline_seconds: Optional[float] = None, wrap_up_fraction: float = 0.2):
+        """
+        Args:
+            max_iterations: Claude turns (TASK_MAX_ITERATIONS, default 10); the last one is the wrap-up
+            max_tokens: Tokens across all turns, input and output (TASK_MAX_TOKENS, default unlimited)
+            deadline_seconds: Wall-clock limit (TASK_DEADLINE_SECONDS, default 600)
+            wrap_up_fraction: Wrap up once less than this share of the token or time budget is left
+        """
+        if max_iterations is None:
+            max_iterations = int(os.getenv("TASK_MAX_ITERATIONS", "10"))
+        if max_tokens is None:
+            max_tokens = int(os.getenv("TASK_MAX_TOKENS", "0"))
+        if deadline_seconds is None:
+            deadline_seconds = float(os.getenv("TASK_DEADLINE_SECONDS", "600"))
+        self.max_iterations = max_iterations or None
+        self.max_tokens = max_tokens or None
+        self.deadline_seconds = deadline_seconds or None
+        self.wrap_up_fraction = wrap_up_fraction
+        self.started = time.monotonic()
+
+    def start(self) -> None:
+        """Start the clock (called when the task starts)"""
+        self.started = time.monotonic()
+
+    def remaining_seconds(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one"""
+        if self.deadline_seconds is None:
+            return None
+        return max(0.0, self.deadline_seconds - (time.monotonic() - self.started))
+
+    def exhausted(self, iterations: int, tokens: int) -> Optional[str]:
+        """Which budget is used up, so no further request may be sent, or None"""
+        if self.deadline_seconds is not None and self.remaining_seconds() <= 0:
+            return "time"
+        if self.max_tokens is not None and tokens >= self.max_tokens:
+            return "token"
+        if self.max_iterations is not None and iterations >= self.max_iterations:
+            return "iteration"
+        return None
+
+    def running_low(self, iteration: int, tokens: int) -> Optional[str]:
+        """
+        Which budget is nearly used up, so request iteration should be the last, or None
+
+        Args:
+            iteration: Number of the request about to be sent (1-based)
+            tokens: Tokens used so far
+        """
+        if self.max_iterations is not None and iteration >= self.max_iterations:
+            return "iteration"
+        if self.max_tokens is not None and tokens >= self.max_tokens * (1 - self.wrap_up_fraction):
+            return "token"
+        remaining = self.remaining_seconds()
+        if remaining is not None and remaining <= self.deadline_seconds * self.wrap_up_fraction:
+            return "time"
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_iterations": self.max_iterations,
+            "max_tokens": self.max_tokens,
+            "deadline_seconds": self.deadline_seconds
+        }
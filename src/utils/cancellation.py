@@ -0,0 +1,85 @@
+"""
+Cooperative cancellation of running tasks
+
+Each task gets a CancellationToken. The agent loop checks it between
+Claude turns and tool calls, and ToolExecutor makes it the current token
+while a tool runs, so long-running tools can poll with sleep() below
+instead of time.sleep() and return early once the task is cancelled:
+
+    if sleep(check_interval):
+        return cancelled_result()
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+_current: ContextVar[Optional["CancellationToken"]] = ContextVar("cancellation_token", default=None)
+
+
+class CancellationToken:
+    """
+    Thread-safe flag that a running task can be asked to stop with
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Ask the task to stop; the first reason given is kept"""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to seconds, waking early on cancel; returns True if cancelled"""
+        return self._event.wait(seconds)
+
+
+def current_token() -> Optional[CancellationToken]:
+    """The token of the task whose tool is running in this thread, if any"""
+    return _current.get()
+
+
+@contextmanager
+def use_token(token: Optional[CancellationToken]) -> Iterator[None]:
+    """Make token the current token for the duration of a tool call"""
+    reset = _current.set(token)
+    try:
+        yield
+    finally:
+        _current.reset(reset)
+
+
+def is_cancelled() -> bool:
+    """Whether the current task has been cancelled"""
+    token = _current.get()
+    return token is not None and token.cancelled
+
+
+def sleep(seconds: float) -> bool:
+    """
+    time.sleep() that wakes up when the current task is cancelled
+
+    Returns:
+        True if the task was cancelled (the caller should stop), else False
+    """
+    token = _current.get()
+    if token is None:
+        time.sleep(seconds)
+        return False
+    return token.wait(seconds)
+
+
+def cancelled_result(reason: Optional[str] = None) -> Dict:
+    """Tool result for a call that stopped because its task was cancelled"""
+    if reason is None:
+        token = _current.get()
+        reason = token.reason if token is not None else None
+    return {"success": False, "cancelled": True, "error": f"Tool cancelled: task {reason or 'cancelled'}"}
@@ -0,0 +1,225 @@
+"""
+Record/replay cassettes for the agent loop
+
+In record mode every LLM turn (request summary and full response) and every
+tool result is written to a JSON cassette file. In replay mode the agent is
+served from the cassette instead: no API calls and no tools touch the
+desktop, so the whole loop runs offline, deterministically, on any OS.
+
+    agent.use_cassette(Cassette("task.json", "record"))
+    agent.use_cassette(Cassette("task.json", "replay"))
+"""
+import json
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from utils.result_cache import cache_key
+
+CASSETTE_VERSION = 1
+
+
+class CassetteError(Exception):
+    """Raised when a replayed run asks for more than was recorded"""
+
+
+def _to_json(value: Any) -> Any:
+    """Serialize SDK objects (pydantic models) found in requests"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return str(value)
+
+
+class Cassette:
+    """
+    A recorded agent run: LLM turns in order, tool results by call
+    """
+
+    def __init__(self, path: str, mode: str = "replay"):
+        """
+        Args:
+            path: Cassette file
+            mode: "record" (start a new cassette) or "replay" (serve from it)
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+
+        if mode == "record":
+            self.data = {"version": CASSETTE_VERSION, "llm": [], "tools": []}
+        else:
+            self.data = json.loads(self.path.read_text(encoding="utf-8"))
+
+        # Replay cursors
+        self._llm_index = 0
+        self._tool_results: Dict[str, deque] = defaultdict(deque)
+        for entry in self.data["tools"]:
+            self._tool_results[cache_key(entry["name"], entry["input"])].append(entry["result"])
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.data, indent=2, default=_to_json), encoding="utf-8")
+
+    # LLM turns
+
+    def record_llm(self, request: Dict, message) -> None:
+        """Append one LLM turn"""
+        messages = request.get("messages", [])
+        summary = {
+            "model": request.get("model"),
+            "tools": [tool["name"] for tool in request.get("tools", [])],
+            "message_count": len(messages),
+            "last_message": messages[-1] if messages else None
+        }
+        with self._lock:
+            self.data["llm"].append({
+                "request": json.loads(json.dumps(summary, default=_to_json)),
+                "response": message.model_dump(mode="json", exclude_none=True)
+            })
+            self._save()
+
+    def next_llm(self):
+        """Next recorded LLM response, as an SDK Message"""
+        from anthropic.types import Message
+
+        with self._lock:
+            if self._llm_index >= len(self.data["llm"]):
+                raise CassetteError(f"Cassette {self.path} has no more recorded LLM turns")
+            entry = self.data["llm"][self._llm_index]
+            self._llm_index += 1
+        return Message.model_validate(entry["response"])
+
+    # Tool results
+
+    def wrap_tool(self, execute: Callable[[str, Dict], Dict]) -> Callable[[str, Dict], Dict]:
+        """Wrap a tool runner so calls are recorded or replayed"""
+        if self.recording:
+            def record(tool_name: str, tool_input: Dict) -> Dict:
+                result = execute(tool_name, tool_input)
+                with self._lock:
+                    self.data["tools"].append({"name": tool_name, "input": tool_input, "result": result})
+                    self._save()
+                return result
+            return record
+
+        def replay(tool_name: str, tool_input: Dict) -> Dict:
+            with self._lock:
+                queue = self._tool_results.get(cache_key(tool_name, tool_input))
+                if not queue:
+                    return {"error": f"No recorded result for {tool_name} with this input"}
+                # Keep the last result so repeated calls keep getting an answer
+                return queue.popleft() if len(queue) > 1 else queue[0]
+        return replay
+
+
+class _RecordingStream:
+    """Wraps an SDK message stream and records the final message"""
+
+    def __init__(self, cassette: Cassette, request: Dict, manager):
+        self._cassette = cassette
+        self._request = request
+        self._manager = manager
+        self._stream = None
+
+    def __enter__(self):
+        self._stream = self._manager.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._manager.__exit__(*exc_info)
+
+    async def __aenter__(self):
+        self._stream = await self._manager.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._manager.__aexit__(*exc_info)
+
+    @property
+    def text_stream(self):
+        return self._stream.text_stream
+
+    def get_final_message(self):
+        message = self._stream.get_final_message()
+        if hasattr(message, "__await__"):
+            return self._record_async(message)
+        self._cassette.record_llm(self._request, message)
+        return message
+
+    async def _record_async(self, pending):
+        message = await pending
+        self._cassette.record_llm(self._request, message)
+        return message
+
+
+class _ReplayStream:
+    """Plays a recorded message back through the streaming interface"""
+
+    def __init__(self, message, is_async: bool):
+        self._message = message
+        self._is_async = is_async
+        self._texts: List[str] = [block.text for block in message.content if block.type == "text"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        if self._is_async:
+            return self._async_texts()
+        return iter(self._texts)
+
+    async def _async_texts(self):
+        for text in self._texts:
+            yield text
+
+    def get_final_message(self):
+        if self._is_async:
+            return self._async_message()
+        return self._message
+
+    async def _async_message(self):
+        return self._message
+
+
+class _CassetteMessages:
+    def __init__(self, cassette: Cassette, inner, is_async: bool):
+        self._cassette = cassette
+        self._inner = inner
+        self._is_async = is_async
+
+    def stream(self, **kwargs):
+        if self._cassette.recording:
+            return _RecordingStream(self._cassette, kwargs, self._inner.stream(**kwargs))
+        return _ReplayStream(self._cassette.next_llm(), self._is_async)
+
+
+class CassetteClient:
+    """
+    Stands in for Anthropic / AsyncAnthropic in the agent loop
+
+    Recording passes requests through to the real client; replay never
+    touches the network.
+    """
+
+    def __init__(self, cassette: Cassette, inner=None, is_async: bool = False):
+        if cassette.recording and inner is None:
+            raise ValueError("Recording needs the real client to pass requests to")
+        self.messages = _CassetteMessages(cassette, inner.messages if inner else None, is_async)
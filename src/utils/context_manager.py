@@ -0,0 +1,163 @@
+"""
+Context-window management for the agent loop
+
+Every tool result stays in the conversation and is resent on each later
+turn. The ContextManager tracks the approximate token size of each tool
+result and, once the results exceed a budget, replaces the oldest ones
+with a short preview and a handle. The full results are kept in a side
+store that Claude can read back with the fetch_tool_result tool.
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+FETCH_TOOL_RESULT = {
+    "name": "fetch_tool_result",
+    "description": (
+        "Older tool results are shortened to save space and marked with a handle. "
+        "Call this with the handle to get the full result back."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "handle": {
+                "type": "string",
+                "description": "Handle of the shortened result, e.g. 'r3'"
+            }
+        },
+        "required": ["handle"]
+    }
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+class ContextManager:
+    """
+    Keeps the tool results of one conversation within a token budget
+    """
+
+    def __init__(
+        self,
+        budget_tokens: Optional[int] = None,
+        keep_recent_turns: int = 1,
+        min_tokens: int = 200,
+        preview_chars: int = 300
+    ):
+        """
+        Args:
+            budget_tokens: Tokens of tool results to keep verbatim (CONTEXT_TOKEN_BUDGET)
+            keep_recent_turns: Newest turns whose results are never shortened
+            min_tokens: Results smaller than this are not worth shortening
+            preview_chars: Characters of the original kept as a preview
+        """
+        self.budget_tokens = budget_tokens or int(os.getenv("CONTEXT_TOKEN_BUDGET", "8000"))
+        self.keep_recent_turns = keep_recent_turns
+        self.min_tokens = min_tokens
+        self.preview_chars = preview_chars
+
+        self.store: Dict[str, Any] = {}
+        self.elided_results = 0
+        self.elided_tokens = 0
+        self._entries: List[Dict] = []
+        self._turn = 0
+
+    def add_results(self, blocks: List[Dict], results: List[Any]) -> None:
+        """
+        Track the tool_result blocks of one turn
+
+        Args:
+            blocks: tool_result content blocks, as placed in the messages list
+            results: The original tool results, aligned with blocks
+        """
+        self._turn += 1
+        for block, result in zip(blocks, results):
+            self._entries.append({
+                "block": block,
+                "result": result,
+                "tokens": estimate_tokens(block["content"]),
+                "turn": self._turn,
+                "handle": None
+            })
+
+    def resume(self, messages: List[Dict], store: Dict[str, Any]) -> None:
+        """
+        Pick up an earlier conversation: its shortened results by handle, and
+        the tool results still sent verbatim, one turn per message
+        """
+        self.store.update(store)
+        for message in messages:
+            if message["role"] != "user" or isinstance(message["content"], str):
+                continue
+            blocks, results = [], []
+            for block in message["content"]:
+                if block.get("type") != "tool_result":
+                    continue
+                try:
+                    result = json.loads(block["content"])
+                except (TypeError, ValueError):
+                    result = block["content"]
+                if isinstance(result, dict) and result.get("shortened"):
+                    continue
+                blocks.append(block)
+                results.append(result)
+            if blocks:
+                self.add_results(blocks, results)
+
+    @property
+    def live_tokens(self) -> int:
+        """Tokens of tool results currently sent verbatim"""
+        return sum(entry["tokens"] for entry in self._entries if entry["handle"] is None)
+
+    def compact(self) -> int:
+        """
+        Shorten the oldest tool results until the rest fit in the budget
+
+        Returns:
+            Number of results shortened by this call
+        """
+        live = self.live_tokens
+        if live <= self.budget_tokens:
+            return 0
+
+        cutoff = self._turn - self.keep_recent_turns
+        shortened = 0
+        for entry in self._entries:
+            if live <= self.budget_tokens:
+                break
+            if entry["handle"] is not None or entry["turn"] > cutoff or entry["tokens"] < self.min_tokens:
+                continue
+
+            handle = f"r{len(self.store) + 1}"
+            self.store[handle] = entry["result"]
+            entry["handle"] = handle
+            entry["block"]["content"] = json.dumps({
+                "shortened": True,
+                "handle": handle,
+                "original_tokens": entry["tokens"],
+                "preview": entry["block"]["content"][:self.preview_chars]
+            })
+
+            live -= entry["tokens"]
+            self.elided_results += 1
+            self.elided_tokens += entry["tokens"]
+            shortened += 1
+
+        return shortened
+
+    def fetch(self, handle: str) -> Dict:
+        """Get a shortened result back by its handle"""
+        if handle not in self.store:
+            return {"error": f"Unknown result handle: {handle}"}
+        return self.store[handle]
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the task result"""
+        return {
+            "tool_result_tokens": self.live_tokens,
+            "elided_results": self.elided_results,
+            "elided_tokens": self.elided_tokens
+        }
@@ -0,0 +1,105 @@
+"""
+Idempotency-Key support for the API server
+
+A client that retries a request after a dropped connection sends the same
+Idempotency-Key. While the first request is still running, the retry waits
+for the same task instead of starting another; once it has finished, the
+retry gets the stored response. Failed requests - ones that raised, were
+cancelled or gave an unsuccessful response - are not kept, so retrying
+them runs them again. Keys expire ttl_seconds after their request finished.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class IdempotencyConflict(Exception):
+    """Raised when a key is reused with a different request body"""
+
+
+def fingerprint(body: Dict[str, Any]) -> str:
+    """Stable hash of a request body"""
+    return hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class IdempotencyCache:
+    """
+    In-flight and completed requests by key, each an asyncio future for the response
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            ttl_seconds: How long a finished request's response is kept (IDEMPOTENCY_TTL_SECONDS, default 3600)
+            max_entries: Finished responses kept before the oldest is dropped (IDEMPOTENCY_MAX_ENTRIES, default 1000)
+        """
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries or int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "1000"))
+        # key -> [future, request fingerprint, expiry (None while in flight), keep]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+
+    def lookup(self, key: str, request_fingerprint: str) -> Optional["asyncio.Future"]:
+        """
+        The future of an earlier request with this key, or None
+
+        Raises:
+            IdempotencyConflict: if the key was used for a different request
+        """
+        self._evict()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] != request_fingerprint:
+            raise IdempotencyConflict(f"Idempotency-Key {key} was already used for a different request")
+        return entry[0]
+
+    def track(self, key: str, request_fingerprint: str, future: "asyncio.Future",
+              keep: Optional[Callable[[Any], bool]] = None) -> "asyncio.Future":
+        """
+        Remember the future (usually a running task) that answers requests with this key
+
+        Args:
+            keep: Whether a finished response should be stored for retries (default: all)
+        """
+        self._entries[key] = [future, request_fingerprint, None, keep]
+        future.add_done_callback(lambda done: self._finished(key, done))
+        return future
+
+    def remember(self, key: str, request_fingerprint: str, value: Any) -> None:
+        """Store a response that is already known"""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self.track(key, request_fingerprint, future)
+
+    def forget(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def _finished(self, key: str, future: "asyncio.Future") -> None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] is not future:
+            return
+        if future.cancelled() or future.exception() is not None or (entry[3] and not entry[3](future.result())):
+            del self._entries[key]
+            return
+        entry[2] = time.monotonic() + self.ttl_seconds
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired responses, and the oldest ones beyond max_entries"""
+        now = time.monotonic()
+        finished = [key for key, entry in self._entries.items() if entry[2] is not None]
+        excess = len(finished) - self.max_entries
+        for key in finished:
+            if excess > 0 or self._entries[key][2] <= now:
+                del self._entries[key]
+                excess -= 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,147 @@
+"""
+Background jobs for the API server
+
+POST /jobs returns at once with a job id while the task runs in the
+background. Each job keeps its progress events (the agent's stream_task
+events) so clients can poll its status or follow the events live, and
+reconnect without missing any. Finished jobs are evicted after a TTL.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from utils.cancellation import CancellationToken
+
+# Job states; the last three are final
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class Job:
+    """
+    One background task: its status, events so far and final result
+    """
+
+    def __init__(self, task: str, job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.task = task
+        self.status = QUEUED
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.cancel_token = CancellationToken()
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+    def _notify(self) -> None:
+        # Wake everyone following the job, and give later waiters a fresh event
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Add a progress event, numbered from 1 in order"""
+        self.events.append({"seq": len(self.events) + 1, **event})
+        self._notify()
+
+    def start(self) -> None:
+        self.status = RUNNING
+        self.started = time.time()
+        self.publish({"type": "status", "status": RUNNING})
+
+    def finish(self, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """Record the outcome; the final event carries the status"""
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished = time.time()
+        self.publish({"type": "status", "status": status})
+
+    async def follow(self, after: int = 0, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield the events after sequence number `after`, then new ones as they
+        arrive, until the job is finished
+
+        Args:
+            after: Last sequence number the client has seen
+            heartbeat: Yield None after this many quiet seconds, so the caller can keep the connection alive
+        """
+        while True:
+            changed = self._changed
+            while after < len(self.events):
+                after += 1
+                yield self.events[after - 1]
+            if self.done:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "task": self.task,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "events": len(self.events),
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobStore:
+    """
+    Jobs by id; finished jobs are dropped ttl seconds after they finish
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            ttl_seconds: How long finished jobs are kept (JOB_TTL_SECONDS, default 3600)
+        """
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("JOB_TTL_SECONDS", "3600"))
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+
+    def create(self, task: str, job_id: Optional[str] = None) -> Job:
+        self.evict()
+        job = Job(task, job_id)
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.evict()
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        self.evict()
+        return list(self._jobs.values())
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop finished jobs past their TTL; returns how many were dropped"""
+        now = time.time() if now is None else now
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and now - job.finished >= self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
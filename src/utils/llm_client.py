@@ -0,0 +1,292 @@
+"""
+Rate-limited access to Claude shared by every agent in the process
+
+All agents send their requests through one LLMClient, which:
+  - paces requests with token buckets for requests and tokens per minute
+    (LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE; 0 disables a bucket)
+  - serves waiting requests first come, first served. Each task has at most
+    one request in flight, so no task can starve the others.
+  - retries rate limits (429), overload (529), server and network errors with
+    jittered exponential backoff, honoring retry-after (LLM_MAX_RETRIES)
+  - pauses every caller after a 429 so a burst of tasks backs off together
+
+Token usage is only known once a response arrives, so the token bucket is
+charged afterwards and may go negative; new requests wait until it refills.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Iterator, Optional, Tuple
+
+import anthropic
+
+from utils.metrics import LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT, LLM_RETRIES
+
+logger = logging.getLogger("axonyx.llm")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Longest single sleep while waiting for a turn, so new capacity is noticed
+POLL_SECONDS = 0.05
+
+
+class TokenBucket:
+    """Refills continuously up to one minute's worth of capacity"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 if it is now)"""
+        self._refill(now)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+
+class RateLimiter:
+    """
+    Admits requests in arrival order within the per-minute budgets
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._lock = threading.Condition()
+        self._tickets = itertools.count()
+        self._waiting: deque = deque()
+        self._paused_until = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiting)
+
+    def _join(self) -> int:
+        with self._lock:
+            ticket = next(self._tickets)
+            self._waiting.append(ticket)
+            return ticket
+
+    def _try_acquire(self, ticket: int) -> float:
+        """Take a slot for ticket; returns 0 on success or the seconds to wait"""
+        now = time.monotonic()
+        if self._waiting[0] != ticket:
+            return POLL_SECONDS
+        wait = self._paused_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(1, now))
+        if wait > 0:
+            return wait
+
+        if self.requests is not None:
+            self.requests.take(1)
+        self._waiting.popleft()
+        self._lock.notify_all()
+        return 0.0
+
+    def _leave(self, ticket: int) -> None:
+        with self._lock:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                self._lock.notify_all()
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds spent waiting"""
+        started = time.monotonic()
+        ticket = self._join()
+        try:
+            with self._lock:
+                while True:
+                    wait = self._try_acquire(ticket)
+                    if not wait:
+                        return time.monotonic() - started
+                    self._lock.wait(min(wait, POLL_SECONDS))
+        finally:
+            self._leave(ticket)
+
+    async def acquire_async(self) -> float:
+        """acquire() for the event loop: waits with asyncio.sleep instead of blocking"""
+        started = time.monotonic()
+        ticket = self._join()
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_acquire(ticket)
+                if not wait:
+                    return time.monotonic() - started
+                await asyncio.sleep(min(wait, POLL_SECONDS))
+        finally:
+            self._leave(ticket)
+
+    def charge(self, tokens: int) -> None:
+        """Count a finished request's tokens against the per-minute budget"""
+        if self.tokens is None or tokens <= 0:
+            return
+        with self._lock:
+            self.tokens.wait_time(0, time.monotonic())
+            self.tokens.take(tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for seconds, e.g. after the API said to slow down"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, overload, server and network errors are worth another try"""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the API asked us to wait, from the retry-after header"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        value = response.headers.get("retry-after")
+        return max(0.0, float(value)) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def billable_tokens(message) -> int:
+    """Tokens of a response that count towards the per-minute limit"""
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return 0
+    return sum(
+        getattr(usage, field, None) or 0
+        for field in ("input_tokens", "output_tokens", "cache_creation_input_tokens")
+    )
+
+
+class LLMClient:
+    """
+    Streams Claude responses through the shared rate limiter with retries
+
+    stream() and stream_async() take the agent's own Anthropic client (so
+    cassettes and test fakes keep working) and yield (kind, value) pairs:
+        ("start", float)    - a request is being sent (again after each retry),
+                              with the seconds it waited for the rate limiter
+        ("text", str)       - streamed text
+        ("message", Message) - the final response
+    """
+
+    _shared: Optional["LLMClient"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 max_retries: Optional[int] = None, base_delay: float = 1.0, max_delay: float = 60.0):
+        """
+        Args:
+            requests_per_minute: Request budget (LLM_REQUESTS_PER_MINUTE, default 50)
+            tokens_per_minute: Token budget (LLM_TOKENS_PER_MINUTE, default 80000)
+            max_retries: Retries per request before giving up (LLM_MAX_RETRIES, default 4)
+            base_delay: First backoff in seconds, doubled on each retry
+            max_delay: Longest backoff in seconds
+        """
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "50"))
+        if tokens_per_minute is None:
+            tokens_per_minute = float(os.getenv("LLM_TOKENS_PER_MINUTE", "80000"))
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", "4"))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def shared(cls) -> "LLMClient":
+        """The process-wide instance every agent uses"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+                LLM_QUEUE_DEPTH.set_function(lambda: cls._shared.limiter.queue_depth)
+            return cls._shared
+
+    def _retry_delay(self, error: Exception, attempt: int, streamed: bool) -> Optional[float]:
+        """Seconds to wait before retrying, or None to give up"""
+        # Text already handed to the caller cannot be taken back
+        if streamed or attempt >= self.max_retries or not is_retryable(error):
+            return None
+
+        delay = retry_after(error)
+        if delay is None:
+            delay = random.uniform(0.5, 1.0) * min(self.max_delay, self.base_delay * 2 ** attempt)
+        if getattr(error, "status_code", None) == 429:
+            self.limiter.pause(delay)
+
+        reason = str(getattr(error, "status_code", None) or type(error).__name__)
+        LLM_RETRIES.inc(reason=reason)
+        logger.warning("Retrying Claude request", extra={"reason": reason, "attempt": attempt + 1, "delay": round(delay, 2)})
+        return delay
+
+    def stream(self, client, **kwargs) -> Iterator[Tuple[str, Any]]:
+        """Send a messages request with client, yielding (kind, value) events"""
+        attempt = 0
+        while True:
+            waited = self.limiter.acquire()
+            LLM_QUEUE_WAIT.observe(waited)
+            yield "start", waited
+            streamed = False
+            try:
+                with client.messages.stream(**kwargs) as stream:
+                    for text in stream.text_stream:
+                        streamed = True
+                        yield "text", text
+                    message = stream.get_final_message()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, streamed)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+
+            self.limiter.charge(billable_tokens(message))
+            yield "message", message
+            return
+
+    async def stream_async(self, client, **kwargs) -> AsyncIterator[Tuple[str, Any]]:
+        """Async version of stream for an AsyncAnthropic client"""
+        attempt = 0
+        while True:
+            waited = await self.limiter.acquire_async()
+            LLM_QUEUE_WAIT.observe(waited)
+            yield "start", waited
+            streamed = False
+            try:
+                async with client.messages.stream(**kwargs) as stream:
+                    async for text in stream.text_stream:
+                        streamed = True
+                        yield "text", text
+                    message = await stream.get_final_message()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, streamed)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self.limiter.charge(billable_tokens(message))
+            yield "message", message
+            return
@@ -1,48 +1,176 @@
 """
 Logging utilities for the agent
+
+setup_logger() puts a QueueHandler on the logger and moves the real work
+(formatting, serializing, writing, rotating) to a background QueueListener
+thread, so a log call costs the caller little more than a queue put. The
+file output is JSON lines; anything passed in `extra` becomes a field.
+
+Large values (tool results) should go through truncate() before they are
+logged: it bounds them cheaply, and serialization happens later on the
+listener thread only if the record is emitted.
 """
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
-from datetime import datetime
+from typing import Any, Dict
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Listener per configured logger name, so setup_logger can be called again safely
+_listeners: Dict[str, tuple] = {}
+
+
+def truncate(value: Any, max_chars: int = 200, max_items: int = 20, depth: int = 4) -> Any:
+    """
+    Bound the size of a value before it is serialized
+
+    Long strings are cut to max_chars, lists and dicts to max_items entries,
+    and nesting below depth is replaced by a placeholder.
+    """
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars] + f"... ({len(value)} chars)"
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    if depth <= 0:
+        return f"<{type(value).__name__}>"
+    if isinstance(value, dict):
+        items = list(value.items())
+        bounded = {
+            str(key): truncate(item, max_chars, max_items, depth - 1)
+            for key, item in items[:max_items]
+        }
+        if len(items) > max_items:
+            bounded["..."] = f"{len(items) - max_items} more keys"
+        return bounded
+    if isinstance(value, (list, tuple)):
+        bounded = [truncate(item, max_chars, max_items, depth - 1) for item in value[:max_items]]
+        if len(value) > max_items:
+            bounded.append(f"... {len(value) - max_items} more items")
+        return bounded
+    return truncate(str(value), max_chars, max_items, depth)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that hands exc_info to the listener
+
+    The stock prepare() formats the record on the caller's thread and folds
+    the traceback into the message. This one only merges the message
+    arguments, so the traceback is formatted on the listener thread and
+    JsonFormatter can write it to its own "exception" field.
+    """
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
-def setup_logger(name: str, log_file: str = None, level: str = "INFO") -> logging.Logger:
+
+def setup_logger(name: str, log_file: str = None, level: str = "INFO", console: bool = True,
+                 max_bytes: int = None, backup_count: int = None) -> logging.Logger:
     """
-    Setup a logger with console and file handlers
-    
+    Setup a logger with console and file handlers behind a background queue
+
+    Calling it again for the same name replaces the previous handlers instead
+    of adding more.
+
     Args:
         name: Logger name
-        log_file: Optional log file path
+        log_file: Optional JSON-lines log file path
         level: Logging level (DEBUG, INFO, WARNING, ERROR)
-    
+        console: Also write human-readable lines to stdout
+        max_bytes: Rotate the log file at this size (LOG_MAX_BYTES, default 10 MB)
+        backup_count: Rotated files kept (LOG_BACKUP_COUNT, default 5)
+
     Returns:
         Configured logger instance
     """
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, level.upper()))
-    
+    logger.propagate = False
+
+    stop_logger(name)
+    handlers = []
+
     # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%H:%M:%S'
-    )
-    console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
-    
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(logging.INFO)
+        console_format = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%H:%M:%S'
+        )
+        console_handler.setFormatter(console_format)
+        handlers.append(console_handler)
+
     # File handler
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)
-        file_format = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=max_bytes or int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            backupCount=backup_count if backup_count is not None else int(os.getenv("LOG_BACKUP_COUNT", "5")),
+            encoding="utf-8"
         )
-        file_handler.setFormatter(file_format)
-        logger.addHandler(file_handler)
-    
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    # The caller only enqueues; the listener thread formats and writes
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(queue_handler)
+    _listeners[name] = (queue_handler, listener)
+
     return logger
+
+
+def stop_logger(name: str) -> None:
+    """Write out queued records and detach the handlers setup_logger added"""
+    previous = _listeners.pop(name, None)
+    if previous is None:
+        return
+    queue_handler, listener = previous
+    logging.getLogger(name).removeHandler(queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+@atexit.register
+def _flush_logs() -> None:
+    """Drain queued records before the interpreter exits"""
+    for name in list(_listeners):
+        stop_logger(name)
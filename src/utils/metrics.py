@@ -0,0 +1,270 @@
+"""
+Prometheus-style metrics for the agent, tools and API server
+
+A small dependency-free implementation of counters, gauges and histograms
+with labels, rendered in the Prometheus text exposition format by
+REGISTRY.render() (served at /metrics by api_server.py).
+"""
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Default buckets in seconds, from fast dispatch up to long installer polls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 200000)
+ITERATION_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time"""
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callbacks: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, callback: Callable[[], float], **labels) -> None:
+        """Read the value from callback whenever metrics are rendered"""
+        with self._lock:
+            self._callbacks[self._key(labels)] = callback
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        with self._lock:
+            callback = self._callbacks.get(key)
+            if callback is None:
+                return self._values.get(key, 0)
+        return callback()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            callbacks = dict(self._callbacks)
+        for key, callback in callbacks.items():
+            try:
+                values[key] = callback()
+            except Exception:
+                continue
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts, sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * len(self.buckets), 0.0, 0]
+                self._series[key] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Agent and tool metrics
+TOOL_DURATION = REGISTRY.histogram(
+    "axonyx_tool_duration_seconds", "Tool execution time", ["tool"]
+)
+TOOL_ERRORS = REGISTRY.counter(
+    "axonyx_tool_errors_total", "Tool calls that returned or raised an error", ["tool"]
+)
+LLM_DURATION = REGISTRY.histogram(
+    "axonyx_llm_request_duration_seconds", "Time for a full Claude response", ["model"]
+)
+LLM_TIME_TO_FIRST_TOKEN = REGISTRY.histogram(
+    "axonyx_llm_time_to_first_token_seconds", "Time until the first streamed text (or the whole response if it has none)", ["model"]
+)
+LLM_TOKENS = REGISTRY.histogram(
+    "axonyx_llm_tokens", "Tokens per Claude request", ["model", "type"], buckets=TOKEN_BUCKETS
+)
+TASK_ITERATIONS = REGISTRY.histogram(
+    "axonyx_task_iterations", "Agent loop iterations per task", buckets=ITERATION_BUCKETS
+)
+TASKS = REGISTRY.counter(
+    "axonyx_tasks_total", "Finished tasks", ["status"]
+)
+MODEL_ESCALATIONS = REGISTRY.counter(
+    "axonyx_model_escalations_total", "Tasks moved to the stronger model", ["reason"]
+)
+
+# Shared LLM client (utils/llm_client.py)
+LLM_QUEUE_WAIT = REGISTRY.histogram(
+    "axonyx_llm_queue_wait_seconds", "Time a request waited for the rate limiter before being sent"
+)
+LLM_QUEUE_DEPTH = REGISTRY.gauge(
+    "axonyx_llm_queue_depth", "Requests waiting for the rate limiter"
+)
+LLM_RETRIES = REGISTRY.counter(
+    "axonyx_llm_retries_total", "Claude requests retried after a rate limit, overload or network error", ["reason"]
+)
+
+# API server worker pool (utils/agent_pool.py)
+API_QUEUE_WAIT = REGISTRY.histogram(
+    "axonyx_api_queue_wait_seconds", "Time a request waited for a free agent"
+)
+API_QUEUE_DEPTH = REGISTRY.gauge(
+    "axonyx_api_queue_depth", "Requests waiting for a free agent"
+)
+API_WORKER_UTILIZATION = REGISTRY.gauge(
+    "axonyx_api_worker_utilization", "Share of the pool's agents running a task"
+)
+API_REJECTED = REGISTRY.counter(
+    "axonyx_api_rejected_total", "Requests refused because the worker queue was full"
+)
+AGENTS_CREATED = REGISTRY.counter(
+    "axonyx_api_agents_created_total", "Agents built for the worker pool", ["model"]
+)
+AGENTS_EVICTED = REGISTRY.counter(
+    "axonyx_api_agents_evicted_total", "Pooled agents closed after idling or to make room for another model", ["reason"]
+)
+IDEMPOTENT_REPLAYS = REGISTRY.counter(
+    "axonyx_api_idempotent_replays_total", "Requests answered from an earlier request with the same Idempotency-Key",
+    ["endpoint", "state"]
+)
@@ -0,0 +1,86 @@
+"""
+Tiered model routing - start on the agent's model, escalate when it struggles
+
+A task starts on the agent's configured (fast, cheap) model and moves to the
+stronger model for the rest of the task when:
+  - its tool calls have failed ROUTER_MAX_TOOL_ERRORS times
+  - the same tool has been called with the same input ROUTER_MAX_REPEATS times
+  - the task text scores ROUTER_COMPLEXITY_THRESHOLD or more on complexity()
+
+The conversation carries over unchanged; only the model of later requests
+changes. Escalation only ever moves to a pricier model.
+"""
+import json
+import os
+import re
+from collections import Counter
+from typing import List, Optional
+
+from utils.pricing import model_price
+
+DEFAULT_STRONG_MODEL = "claude-sonnet-4-20250514"
+
+# Words that chain steps together ("download it, then install it and open it")
+SEQUENCE_WORDS = re.compile(r"\b(then|after(?:wards)?|next|finally|also|before|once|and)\b", re.IGNORECASE)
+LIST_ITEM = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s+", re.MULTILINE)
+
+
+def _failed(result) -> bool:
+    return not isinstance(result, dict) or "error" in result or result.get("success") is False
+
+
+class ModelRouter:
+    """
+    Picks the model for each request of a task
+    """
+
+    def __init__(self, strong_model: Optional[str] = None, max_tool_errors: Optional[int] = None,
+                 max_repeats: Optional[int] = None, complexity_threshold: Optional[int] = None):
+        """
+        Args:
+            strong_model: Model to escalate to (ROUTER_STRONG_MODEL)
+            max_tool_errors: Failed tool calls that trigger escalation (ROUTER_MAX_TOOL_ERRORS, default 2)
+            max_repeats: Identical tool calls that trigger escalation (ROUTER_MAX_REPEATS, default 3)
+            complexity_threshold: complexity() score that starts a task on the strong model
+                (ROUTER_COMPLEXITY_THRESHOLD, default 4)
+        """
+        self.strong_model = strong_model or os.getenv("ROUTER_STRONG_MODEL", DEFAULT_STRONG_MODEL)
+        self.max_tool_errors = max_tool_errors or int(os.getenv("ROUTER_MAX_TOOL_ERRORS", "2"))
+        self.max_repeats = max_repeats or int(os.getenv("ROUTER_MAX_REPEATS", "3"))
+        self.complexity_threshold = complexity_threshold or int(os.getenv("ROUTER_COMPLEXITY_THRESHOLD", "4"))
+
+    def can_escalate(self, model: str) -> bool:
+        """False when the strong model is no upgrade on model (e.g. the agent already runs Opus)"""
+        return self.strong_model != model and model_price(self.strong_model) > model_price(model)
+
+    def complexity(self, task: str) -> int:
+        """Rough score of how many steps a task involves"""
+        words = len(task.split())
+        return words // 30 + len(SEQUENCE_WORDS.findall(task)) + len(LIST_ITEM.findall(task))
+
+    def escalation_reason(self, model: str, task: str, tool_history: List[List[tuple]]) -> Optional[str]:
+        """
+        Why a task should move from model to the strong model, or None
+
+        Args:
+            model: The model the task is on
+            task: The task text
+            tool_history: (call, result) pairs per turn so far
+        """
+        if not self.can_escalate(model):
+            return None
+
+        if self.complexity(task) >= self.complexity_threshold:
+            return "complex_task"
+
+        calls = [pair for turn in tool_history for pair in turn]
+        if sum(1 for _, result in calls if _failed(result)) >= self.max_tool_errors:
+            return "tool_errors"
+
+        repeats = Counter(
+            (call["name"], json.dumps(call["input"], sort_keys=True, default=str)) for call, _ in calls
+        )
+        if repeats and max(repeats.values()) >= self.max_repeats:
+            return "repeated_calls"
+
+        return None
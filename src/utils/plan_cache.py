@@ -0,0 +1,262 @@
+"""
+Learned plan cache - replay successful tool sequences without calling Claude
+
+A task's text is normalized into a template key: literal values such as
+quoted strings, URLs, file names, paths and numbers become numbered slots
+("open chrome to github.com" -> "open chrome to {0}"). When a task succeeds,
+its tool calls are stored against that key with the slot values in their
+inputs replaced by placeholders. Once the same plan has succeeded enough
+times, a matching task replays it directly with its own slot values.
+
+Plans are persisted as JSON with LRU eviction.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+PLAN_CACHE_VERSION = 1
+
+# Literal values that are likely to vary between otherwise identical tasks
+SLOT_PATTERN = re.compile(
+    r'"[^"]+"'                      # "quoted text"
+    r"|'[^']+'"                     # 'quoted text'
+    r'|[A-Za-z]:\\[^\s"\']+'        # C:\Windows\path
+    r'|https?://[^\s"\']+'          # URLs
+    r'|\b[\w-]+(?:\.[\w-]+)+\b'     # domains and file names (github.com, notes.txt)
+    r'|\b\d+(?:\.\d+)?\b'           # numbers
+)
+
+NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+# Words that do not change what a task means
+FILLER_WORDS = {"please", "can", "could", "would", "you", "kindly", "for", "me", "the", "a", "an"}
+
+
+def default_path() -> Path:
+    return Path(os.getenv(
+        "PLAN_CACHE_FILE", str(Path.home() / ".axonyx_revolt" / "plan_cache.json")
+    )).expanduser()
+
+
+def _normalize_words(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return [word for word in words if word not in FILLER_WORDS]
+
+
+def task_template(task: str) -> Tuple[str, List[str]]:
+    """
+    Split a task into a template key and its slot values
+
+    Returns:
+        (key, values) - e.g. ("open chrome to {0}", ["github.com"])
+    """
+    parts, values = [], []
+    position = 0
+    for match in SLOT_PATTERN.finditer(task):
+        parts.extend(_normalize_words(task[position:match.start()]))
+        value = match.group(0)
+        if value[0] in "\"'":
+            value = value[1:-1]
+        parts.append(f"{{{len(values)}}}")
+        values.append(value)
+        position = match.end()
+    parts.extend(_normalize_words(task[position:]))
+    return " ".join(parts), values
+
+
+def _placeholder(index: int) -> str:
+    return f"{{{{slot{index}}}}}"
+
+
+def _slot_in_text(slot: str) -> Optional["re.Pattern"]:
+    """Pattern for a slot value as a whole token inside a longer string (None for numbers)"""
+    # A number such as "5" would also match inside "2025" or "v1.5"; only
+    # an input that is exactly the number is templated
+    if not slot or NUMBER.fullmatch(slot):
+        return None
+    # Not glued to letters or digits: "notes.txt" matches in "C:\docs\notes.txt", not "old_notes.txt"
+    start = r"(?<!\w)" if re.match(r"\w", slot) else ""
+    end = r"(?!\w)" if re.match(r"\w", slot[-1]) else ""
+    return re.compile(start + re.escape(slot) + end)
+
+
+def to_template(value: Any, slots: List[str]) -> Any:
+    """Replace slot values inside tool inputs with placeholders"""
+    if isinstance(value, dict):
+        return {key: to_template(item, slots) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_template(item, slots) for item in value]
+    if isinstance(value, str):
+        for index, slot in enumerate(slots):
+            if value == slot:
+                return _placeholder(index)
+        # Longest first so "github.com/x" is not split by a shorter slot
+        for index in sorted(range(len(slots)), key=lambda i: -len(slots[i])):
+            pattern = _slot_in_text(slots[index])
+            if pattern is not None:
+                value = pattern.sub(_placeholder(index), value)
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        for index, slot in enumerate(slots):
+            if slot == str(value):
+                return {"__slot__": index, "type": type(value).__name__}
+    return value
+
+
+def fill_template(value: Any, slots: List[str]) -> Any:
+    """Substitute a task's slot values back into a templated tool input"""
+    if isinstance(value, dict):
+        if "__slot__" in value:
+            cast = float if value.get("type") == "float" else int
+            return cast(slots[value["__slot__"]])
+        return {key: fill_template(item, slots) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill_template(item, slots) for item in value]
+    if isinstance(value, str):
+        for index, slot in enumerate(slots):
+            value = value.replace(_placeholder(index), slot)
+        return value
+    return value
+
+
+class PlanCache:
+    """
+    Disk-backed LRU of learned tool plans
+    """
+
+    _shared: Dict[str, "PlanCache"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None, min_successes: Optional[int] = None):
+        """
+        Args:
+            path: JSON file (PLAN_CACHE_FILE, default ~/.axonyx_revolt/plan_cache.json)
+            max_entries: Plans kept before the least recently used is evicted (PLAN_CACHE_SIZE)
+            min_successes: Identical successful runs needed before a plan is replayed
+                (PLAN_CACHE_MIN_SUCCESSES)
+        """
+        self.path = Path(path).expanduser() if path else default_path()
+        self.max_entries = max_entries or int(os.getenv("PLAN_CACHE_SIZE", "200"))
+        self.min_successes = min_successes or int(os.getenv("PLAN_CACHE_MIN_SUCCESSES", "2"))
+        self._lock = threading.Lock()
+        self._plans: "OrderedDict[str, Dict]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "failed_replays": 0, "learned": 0}
+        self._load()
+
+    @classmethod
+    def shared(cls, path: Optional[str] = None) -> "PlanCache":
+        """One instance per file, shared by every agent in the process"""
+        key = str(Path(path).expanduser() if path else default_path())
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(key)
+            return cls._shared[key]
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != PLAN_CACHE_VERSION:
+            return
+        self._plans = OrderedDict(data.get("plans", {}))
+        self._stats.update(data.get("stats", {}))
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_suffix(".tmp")
+            temp.write_text(json.dumps({
+                "version": PLAN_CACHE_VERSION,
+                "plans": self._plans,
+                "stats": self._stats
+            }, default=str), encoding="utf-8")
+            temp.replace(self.path)
+        except OSError:
+            pass
+
+    def lookup(self, task: str) -> Optional[List[List[Dict]]]:
+        """
+        Find a confident plan for a task
+
+        Returns:
+            Tool calls per turn ({"name", "input"}) with this task's values filled in, or None
+        """
+        key, slots = task_template(task)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None or plan["successes"] < self.min_successes:
+                self._stats["misses"] += 1
+                return None
+
+            try:
+                filled = [
+                    [{"name": call["name"], "input": fill_template(call["input"], slots)} for call in turn]
+                    for turn in plan["turns"]
+                ]
+            except (ValueError, IndexError):
+                # Same shape, different kind of value ("2.5" or "notes.txt" where the plan took an int)
+                self._stats["misses"] += 1
+                return None
+
+            self._plans.move_to_end(key)
+            plan["last_used"] = time.time()
+            self._stats["hits"] += 1
+            self._save()
+
+        return filled
+
+    def learn(self, task: str, turns: List[List[Dict]]) -> None:
+        """
+        Remember the tool calls of a successful task
+
+        Args:
+            task: The task text
+            turns: Tool calls per turn, each {"name", "input"}
+        """
+        if not turns:
+            return
+
+        key, slots = task_template(task)
+        templated = [
+            [{"name": call["name"], "input": to_template(call["input"], slots)} for call in turn]
+            for turn in turns
+        ]
+
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None and plan["turns"] == templated:
+                plan["successes"] += 1
+            else:
+                plan = {"turns": templated, "successes": 1}
+                self._plans[key] = plan
+                self._stats["learned"] += 1
+            plan["last_used"] = time.time()
+            self._plans.move_to_end(key)
+
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+            self._save()
+
+    def forget(self, task: str) -> None:
+        """Drop a task's plan after its replay failed"""
+        key, _ = task_template(task)
+        with self._lock:
+            if self._plans.pop(key, None) is not None:
+                self._stats["failed_replays"] += 1
+                self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and size counters"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "plans": len(self._plans),
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0
+            }
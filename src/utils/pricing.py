@@ -0,0 +1,53 @@
+"""
+Claude list prices for cost estimates
+
+Prices are USD per million tokens. Cache writes cost 1.25x the input price
+and cache reads 0.1x. Unknown models are priced as Sonnet.
+"""
+from typing import Dict, Optional, Tuple
+
+# (substring of the model id, input price, output price) - first match wins
+MODEL_PRICES = (
+    ("opus", 15.00, 75.00),
+    ("sonnet", 3.00, 15.00),
+    ("claude-3-haiku", 0.25, 1.25),
+    ("haiku", 0.80, 4.00),
+)
+DEFAULT_PRICE = (3.00, 15.00)
+
+# Token counts of the API's usage block
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.10
+
+
+def model_price(model: str) -> Tuple[float, float]:
+    """(input, output) USD per million tokens for a model id"""
+    for fragment, input_price, output_price in MODEL_PRICES:
+        if fragment in model:
+            return input_price, output_price
+    return DEFAULT_PRICE
+
+
+def estimate_cost(model: str, usage: Dict[str, Optional[int]]) -> float:
+    """
+    Estimated USD cost of a request or task
+
+    Args:
+        model: Model id
+        usage: Token counts keyed like the API's usage block
+    """
+    input_price, output_price = model_price(model)
+    cost = (
+        (usage.get("input_tokens") or 0) * input_price
+        + (usage.get("output_tokens") or 0) * output_price
+        + (usage.get("cache_creation_input_tokens") or 0) * input_price * CACHE_WRITE_MULTIPLIER
+        + (usage.get("cache_read_input_tokens") or 0) * input_price * CACHE_READ_MULTIPLIER
+    )
+    return round(cost / 1_000_000, 6)
@@ -0,0 +1,100 @@
+"""
+TTL result cache for read-only tools
+
+Tool modules declare which of their tools are read-only with a CACHE_TTLS
+dict (tool name -> seconds), and which state-changing tools make those
+results stale with a CACHE_INVALIDATES dict (tool name -> cached tools).
+Results are kept in an LRU keyed by tool name and canonical input. Every
+agent in the process shares one cache, so a state change made through one
+agent makes the results stale for all of them.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+
+def cache_key(tool_name: str, tool_input: Dict) -> str:
+    """Canonical key for a tool call (argument order does not matter)"""
+    return f"{tool_name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
+
+
+class ResultCache:
+    """
+    Thread-safe LRU of tool results with per-entry expiry
+    """
+
+    _shared: Optional["ResultCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("TOOL_CACHE_SIZE", "256"))
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "ResultCache":
+        """The process-wide instance every agent uses"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def get(self, tool_name: str, tool_input: Dict) -> Optional[Any]:
+        """Get a cached result, or None on a miss or expired entry"""
+        key = cache_key(tool_name, tool_input)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, tool_name: str, tool_input: Dict, result: Any, ttl: float) -> None:
+        """Store a result for ttl seconds"""
+        key = cache_key(tool_name, tool_input)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, tool_name, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tool_names: Iterable[str]) -> int:
+        """
+        Drop every cached result of the given tools
+
+        Returns:
+            Number of entries removed
+        """
+        names = set(tool_names)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[1] in names]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and size counters"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries)
+            }
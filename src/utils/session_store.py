@@ -0,0 +1,225 @@
+"""
+Conversation sessions - follow-up tasks continue from earlier context
+
+A session keeps the message history of every task run under its id, plus
+the full tool results the ContextManager shortened to handles, in SQLite.
+The next task in the session starts from that history, so "now do the
+same for Firefox" can build on what earlier turns discovered instead of
+repeating it. History is only ever appended to (apart from compaction of
+old tool results), so the conversation prefix, and with it the prompt
+cache, stays the same from one task to the next.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    tasks INTEGER NOT NULL DEFAULT 0,
+    active_tools TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+CREATE TABLE IF NOT EXISTS tool_results (
+    session_id TEXT NOT NULL,
+    handle TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (session_id, handle)
+);
+"""
+
+
+def default_path() -> Path:
+    return Path(os.getenv(
+        "SESSION_DB", str(Path.home() / ".axonyx_revolt" / "sessions.db")
+    )).expanduser()
+
+
+def _plain(block: Any) -> Any:
+    """A content block as plain JSON data (SDK response blocks become dicts)"""
+    to_dict = getattr(block, "to_dict", None)
+    return to_dict() if to_dict is not None else block
+
+
+def message_to_dict(message: Dict) -> Dict:
+    """A message as stored: role and JSON-serializable content"""
+    content = message["content"]
+    if not isinstance(content, str):
+        content = [_plain(block) for block in content]
+    return {"role": message["role"], "content": content}
+
+
+class Session:
+    """
+    History of one conversation: messages, shortened tool results and tool set
+    """
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.messages: List[Dict] = []
+        self.results: Dict[str, Any] = {}  # handle -> full tool result
+        self.active_tools: Optional[List[str]] = None
+        self.tasks = 0
+        self.created = time.time()
+        self.updated = self.created
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            "tasks": self.tasks,
+            "messages": len(self.messages),
+            "stored_results": len(self.results),
+            "created": self.created,
+            "updated": self.updated
+        }
+
+
+class SessionStore:
+    """
+    SQLite-backed sessions by id; sessions idle for ttl_days are deleted
+    """
+
+    _shared: Dict[str, "SessionStore"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None, ttl_days: Optional[float] = None):
+        """
+        Args:
+            path: Database file (SESSION_DB, default ~/.axonyx_revolt/sessions.db)
+            ttl_days: Delete sessions not used for this long (SESSION_TTL_DAYS, default 7; 0 keeps them)
+        """
+        if ttl_days is None:
+            ttl_days = float(os.getenv("SESSION_TTL_DAYS", "7"))
+        self.path = Path(path).expanduser() if path else default_path()
+        self.ttl_seconds = ttl_days * 86400 or None
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @classmethod
+    def shared(cls, path: Optional[str] = None) -> "SessionStore":
+        """One instance per file, shared by every agent in the process"""
+        key = str(Path(path).expanduser() if path else default_path())
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(key)
+            return cls._shared[key]
+
+    def _connect(self) -> sqlite3.Connection:
+        # The database is only created once a session is actually used
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        if not self._ready:
+            connection.executescript(SCHEMA)
+            self._ready = True
+        return connection
+
+    def load(self, session_id: str) -> Optional[Session]:
+        """The stored session, or None if there is none with this id"""
+        with self._lock:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    "SELECT created, updated, tasks, active_tools FROM sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                session = Session(session_id)
+                session.created, session.updated, session.tasks, active_tools = row
+                session.active_tools = json.loads(active_tools) if active_tools else None
+                session.messages = [
+                    {"role": role, "content": json.loads(content)}
+                    for role, content in connection.execute(
+                        "SELECT role, content FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+                    )
+                ]
+                session.results = {
+                    handle: json.loads(result)
+                    for handle, result in connection.execute(
+                        "SELECT handle, result FROM tool_results WHERE session_id = ?", (session_id,)
+                    )
+                }
+                return session
+            finally:
+                connection.close()
+
+    def save(self, session: Session) -> None:
+        """
+        Store a session after a task
+
+        Every message is rewritten because compaction shortens old tool
+        results in place; new handles are added to the stored results.
+        """
+        session.updated = time.time()
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO sessions (id, created, updated, tasks, active_tools) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (session.id, session.created, session.updated, session.tasks,
+                         json.dumps(session.active_tools) if session.active_tools is not None else None)
+                    )
+                    connection.execute("DELETE FROM messages WHERE session_id = ?", (session.id,))
+                    connection.executemany(
+                        "INSERT INTO messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                        [
+                            (session.id, seq, message["role"], json.dumps(message["content"], default=str))
+                            for seq, message in enumerate(session.messages)
+                        ]
+                    )
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO tool_results (session_id, handle, result) VALUES (?, ?, ?)",
+                        [
+                            (session.id, handle, json.dumps(result, default=str))
+                            for handle, result in session.results.items()
+                        ]
+                    )
+                self._prune(connection)
+            finally:
+                connection.close()
+
+    def delete(self, session_id: str) -> bool:
+        """Forget a session; returns False if there was none"""
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    deleted = self._delete(connection, [session_id])
+                return deleted > 0
+            finally:
+                connection.close()
+
+    def _delete(self, connection: sqlite3.Connection, session_ids: List[str]) -> int:
+        deleted = 0
+        for session_id in session_ids:
+            deleted += connection.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount
+            connection.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            connection.execute("DELETE FROM tool_results WHERE session_id = ?", (session_id,))
+        return deleted
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        """Delete sessions idle for longer than the TTL"""
+        if self.ttl_seconds is None:
+            return
+        expired = [
+            session_id for (session_id,) in connection.execute(
+                "SELECT id FROM sessions WHERE updated < ?", (time.time() - self.ttl_seconds,)
+            )
+        ]
+        if expired:
+            with connection:
+                self._delete(connection, expired)
@@ -0,0 +1,87 @@
+"""
+Rolling summary of recent task results
+
+Every finished task's accounting (timing, tokens, cost, model) is added to a
+fixed-size window; summary() aggregates it for the /stats endpoint.
+"""
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from utils.pricing import USAGE_FIELDS
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class TaskStats:
+    """
+    Window of the most recent task results
+    """
+
+    def __init__(self, window: Optional[int] = None):
+        """
+        Args:
+            window: Tasks kept (TASK_STATS_WINDOW, default 100)
+        """
+        self.window = window or int(os.getenv("TASK_STATS_WINDOW", "100"))
+        self._tasks: deque = deque(maxlen=self.window)
+        self._lock = threading.Lock()
+
+    def record(self, result: Dict[str, Any]) -> None:
+        """Add a finished task's result"""
+        timing = result.get("timing", {})
+        entry = {
+            "success": bool(result.get("success")),
+            "model": result.get("model"),
+            "total_seconds": timing.get("total_seconds", 0.0),
+            "llm_seconds": timing.get("llm_seconds", 0.0),
+            "tool_seconds": timing.get("tool_seconds", 0.0),
+            "usage": dict(result.get("usage", {})),
+            "cost_usd": result.get("cost_usd", 0.0),
+        }
+        with self._lock:
+            self._tasks.append(entry)
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts, latency percentiles, token totals and cost over the window"""
+        with self._lock:
+            tasks = list(self._tasks)
+
+        count = len(tasks)
+        totals = [task["total_seconds"] for task in tasks]
+        llm = sum(task["llm_seconds"] for task in tasks)
+        tools = sum(task["tool_seconds"] for task in tasks)
+
+        models: Dict[str, Dict[str, Any]] = {}
+        for task in tasks:
+            model = models.setdefault(task["model"] or "none", {"tasks": 0, "cost_usd": 0.0})
+            model["tasks"] += 1
+            model["cost_usd"] = round(model["cost_usd"] + task["cost_usd"], 6)
+
+        return {
+            "window": self.window,
+            "tasks": count,
+            "success_rate": round(sum(task["success"] for task in tasks) / count, 3) if count else 0.0,
+            "seconds": {
+                "mean": round(sum(totals) / count, 3) if count else 0.0,
+                "p50": round(_percentile(totals, 0.5), 3),
+                "p95": round(_percentile(totals, 0.95), 3),
+            },
+            "llm_seconds": round(llm, 3),
+            "tool_seconds": round(tools, 3),
+            "llm_share": round(llm / (llm + tools), 3) if llm + tools else 0.0,
+            "usage": {
+                field: sum(task["usage"].get(field, 0) for task in tasks) for field in USAGE_FIELDS
+            },
+            "cost_usd": round(sum(task["cost_usd"] for task in tasks), 6),
+            "models": models,
+        }
+
+
+TASK_STATS = TaskStats()
@@ -0,0 +1,169 @@
+"""
+Concurrent tool execution for a single Claude turn
+
+Independent tool calls run in a bounded thread pool. Tools that share a
+desktop resource (mouse, keyboard, window focus, the Selenium session) are
+grouped per resource, run in their original order and hold a process-wide
+lock so that two turns - or two agents - never drive the desktop at once.
+A tool that uses several resources holds all of their locks, taken in name
+order so two such tools cannot deadlock.
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from utils.cancellation import CancellationToken, cancelled_result, use_token
+
+# How often a waiting turn checks its task's cancellation token
+CANCEL_POLL_SECONDS = 0.1
+
+# Process-wide locks, one per shared resource name
+_resource_locks: Dict[str, threading.Lock] = {}
+_resource_locks_guard = threading.Lock()
+
+
+def get_resource_lock(resource: str) -> threading.Lock:
+    """Get (or create) the process-wide lock for a shared resource"""
+    with _resource_locks_guard:
+        lock = _resource_locks.get(resource)
+        if lock is None:
+            lock = threading.Lock()
+            _resource_locks[resource] = lock
+        return lock
+
+
+def resource_names(resource: Union[str, Tuple[str, ...], None]) -> Tuple[str, ...]:
+    """A tool's shared resources as a sorted tuple (lock order); empty if it has none"""
+    if not resource:
+        return ()
+    if isinstance(resource, str):
+        return (resource,)
+    return tuple(sorted(set(resource)))
+
+
+class ToolExecutor:
+    """
+    Runs the tool_use blocks of one turn concurrently where it is safe to do so
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[str, Dict], Dict],
+        resources: Optional[Dict[str, Union[str, Tuple[str, ...]]]] = None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            execute: Function that runs one tool, called as execute(name, input)
+            resources: Map of tool name -> shared resource (or tuple of resources) it must be serialized on
+            max_workers: Thread pool size (defaults to TOOL_MAX_WORKERS or 4)
+        """
+        self.execute = execute
+        self.resources = resources or {}
+        self.max_workers = max_workers or int(os.getenv("TOOL_MAX_WORKERS", "4"))
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="tool"
+            )
+        return self._pool
+
+    def _run_group(self, calls: List[Dict], resource: Union[str, Tuple[str, ...], None],
+                   cancel: Optional[CancellationToken] = None) -> List[Dict]:
+        """Run a group of calls in order, holding the resource locks if any"""
+        with ExitStack() as stack:
+            for name in resource_names(resource):
+                stack.enter_context(get_resource_lock(name))
+            return self._run_calls(calls, cancel)
+
+    def _run_calls(self, calls: List[Dict], cancel: Optional[CancellationToken]) -> List[Dict]:
+        """Run calls with cancel as the current token, skipping the rest once it fires"""
+        results = []
+        with use_token(cancel):
+            for call in calls:
+                if cancel is not None and cancel.cancelled:
+                    results.append(cancelled_result(cancel.reason))
+                else:
+                    results.append(self.execute(call["name"], call["input"]))
+        return results
+
+    def run(self, calls: List[Dict], timeout: Optional[float] = None,
+            cancel: Optional[CancellationToken] = None) -> List[Dict]:
+        """
+        Execute tool calls and return their results in the original order
+
+        Args:
+            calls: List of {"id", "name", "input"} dicts from one Claude turn
+            timeout: Seconds to wait for the calls. At the timeout cancel is
+                fired so polling tools stop; calls still running are abandoned
+                (their threads finish in the background) and get an error result.
+            cancel: The task's cancellation token, current while its tools run
+
+        Returns:
+            List of tool results, aligned index-for-index with calls
+        """
+        if len(calls) <= 1 and timeout is None:
+            return [
+                self._run_group([call], self.resources.get(call["name"]), cancel)[0]
+                for call in calls
+            ]
+
+        # One group per set of overlapping resources (kept in call order), one per free tool
+        groups: List[tuple] = []
+        for index, call in enumerate(calls):
+            names = resource_names(self.resources.get(call["name"]))
+            sharing = [group for group in groups if set(group[0]) & set(names)]
+            for group in sharing:
+                groups.remove(group)
+            members = sorted(
+                [(index, call)] + [member for group in sharing for member in zip(group[1], group[2])],
+                key=lambda member: member[0]
+            )
+            names = resource_names(names + tuple(name for group in sharing for name in group[0]))
+            groups.append((names, [member[0] for member in members], [member[1] for member in members]))
+
+        pool = self._get_pool()
+        waiting = {
+            pool.submit(self._run_group, group_calls, resource, cancel): indexes
+            for resource, indexes, group_calls in groups
+        }
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        results: List[Optional[Dict]] = [None] * len(calls)
+        reason = None
+        while waiting:
+            if cancel is not None and cancel.cancelled:
+                reason = cancel.reason
+                break
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                reason = "deadline reached"
+                if cancel is not None:
+                    cancel.cancel(reason)
+                break
+            if cancel is not None:
+                remaining = CANCEL_POLL_SECONDS if remaining is None else min(remaining, CANCEL_POLL_SECONDS)
+
+            done, _ = wait(waiting, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                for index, result in zip(waiting.pop(future), future.result()):
+                    results[index] = result
+
+        # Whatever is still running is left to finish (or notice the token) on its own
+        for future, indexes in waiting.items():
+            future.cancel()
+            for index in indexes:
+                results[index] = cancelled_result(reason)
+        return results
+
+    def shutdown(self):
+        """Release the worker threads"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -0,0 +1,134 @@
+"""
+Server warm-up - pay cold-start costs before the first request does
+
+The first task that touches OCR, Selenium or pywinauto would otherwise
+wait for module imports, Tesseract path probing, UI Automation setup and
+a browser launch. The API server runs these steps in the background at
+startup and reports readiness, with per-step timings, at /ready.
+
+Steps are chosen with WARMUP_STEPS (comma-separated, "none" to skip):
+    tool_modules - import every tool module
+    tesseract    - find the Tesseract binary and run it once
+    uia          - create the pywinauto UI Automation desktop
+    browser      - start the headless browser session browser tools reuse
+"""
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_STEPS = "tool_modules,tesseract,uia"
+
+
+def import_tool_modules() -> Dict[str, Any]:
+    from tools.registry import ToolRegistry
+
+    timings = ToolRegistry().load_all()
+    failed = {module: timing["error"] for module, timing in timings.items() if "error" in timing}
+    return {
+        "modules": {module: round(timing["seconds"], 3) for module, timing in timings.items()},
+        "failed": failed
+    }
+
+
+def probe_tesseract() -> Dict[str, Any]:
+    # Importing screen_reader sets the Tesseract path
+    from tools import screen_reader  # noqa: F401
+    import pytesseract
+
+    return {
+        "path": pytesseract.pytesseract.tesseract_cmd,
+        "version": str(pytesseract.get_tesseract_version())
+    }
+
+
+def start_uia() -> Dict[str, Any]:
+    from pywinauto import Desktop
+
+    windows = Desktop(backend="uia").windows()
+    return {"windows": len(windows)}
+
+
+def start_browser() -> Dict[str, Any]:
+    from tools.browser_automation import start_browser as start
+
+    result = start(headless=True)
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return {"headless": True}
+
+
+def stop_browser() -> None:
+    """Close the browser session if one is open (at shutdown)"""
+    import sys
+
+    browser_automation = sys.modules.get("tools.browser_automation")
+    if browser_automation is not None and browser_automation.BrowserSession.driver is not None:
+        browser_automation.close_browser()
+
+
+WARMUP_FUNCTIONS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "tool_modules": import_tool_modules,
+    "tesseract": probe_tesseract,
+    "uia": start_uia,
+    "browser": start_browser,
+}
+
+
+class WarmUp:
+    """
+    Runs the warm-up steps once and keeps their outcome for /ready
+    """
+
+    def __init__(self, steps: Optional[List[str]] = None,
+                 functions: Optional[Dict[str, Callable[[], Dict[str, Any]]]] = None):
+        """
+        Args:
+            steps: Step names in order (WARMUP_STEPS, default tool_modules,tesseract,uia)
+            functions: Step implementations by name (defaults to WARMUP_FUNCTIONS)
+        """
+        if steps is None:
+            configured = os.getenv("WARMUP_STEPS", DEFAULT_STEPS)
+            steps = [] if configured.strip().lower() == "none" else [
+                step.strip() for step in configured.split(",") if step.strip()
+            ]
+        self.steps = steps
+        self.functions = functions or WARMUP_FUNCTIONS
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def record(self, step: str, function: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Time one step; a failing step is reported, not raised"""
+        self.started = self.started or time.time()
+        started = time.perf_counter()
+        try:
+            outcome = {"ok": True, **(function() or {})}
+        except Exception as e:
+            outcome = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        outcome["seconds"] = round(time.perf_counter() - started, 3)
+        self.results[step] = outcome
+        return outcome
+
+    def run(self) -> Dict[str, Any]:
+        """Run every configured step in order (blocking; call it from a thread)"""
+        self.started = self.started or time.time()
+        for step in self.steps:
+            function = self.functions.get(step)
+            if function is None:
+                self.results[step] = {"ok": False, "error": "Unknown warm-up step", "seconds": 0.0}
+                continue
+            self.record(step, function)
+        self.finished = time.time()
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.done,
+            "steps": self.results,
+            "pending": [step for step in self.steps if step not in self.results],
+            "seconds": round(self.finished - self.started, 3) if self.done else None
+        }
@@ -0,0 +1,39 @@
+"""
+Shared test helpers - the scripted Anthropic client and an offline agent
+"""
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from agent import WindowsAgent
+from utils.llm_client import LLMClient
+from fake_anthropic import FakeClient, make_message  # noqa: F401  (used by the tests)
+
+
+def make_agent(script=None, model=None, is_async=False, **attributes) -> WindowsAgent:
+    """
+    An agent that runs offline, without confirmation prompts, plan or result
+    caching, model routing or rate limiting
+
+    Args:
+        script: Assistant turns for a FakeClient to play back
+        model: Model the agent starts on
+        is_async: Play the script through async_client (for the *_async methods)
+        attributes: Agent attributes to set on top of the defaults (e.g. router=...)
+    """
+    agent = WindowsAgent(api_key="test", model=model)
+    agent.require_confirmation = False
+    agent.plan_cache = None
+    agent.result_cache = None
+    agent.router = None
+    agent.llm = LLMClient(requests_per_minute=0, tokens_per_minute=0)
+    if script is not None and is_async:
+        agent.async_client = FakeClient(script, is_async=True)
+    elif script is not None:
+        agent.client = FakeClient(script)
+    for name, value in attributes.items():
+        setattr(agent, name, value)
+    return agent
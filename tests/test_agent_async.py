@@ -0,0 +1,120 @@
+"""
+Tests for the async agent loop used by the API server
+"""
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from agent import wait_for_closed_clients
+from tests.fakes import make_agent, make_message
+from utils.cancellation import CancellationToken
+from utils.plan_cache import PlanCache
+
+
+def tool_turn(name="get_system_info"):
+    return make_message([
+        {"type": "text", "text": "Checking."},
+        {"type": "tool_use", "id": "t1", "name": name, "input": {}}
+    ], "tool_use")
+
+
+def final_turn(text):
+    return make_message([{"type": "text", "text": text}], "end_turn")
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+class TestAgentAsync(unittest.TestCase):
+    """Test stream_task_async and execute_task_async through an AsyncAnthropic stand-in"""
+
+    def test_streams_tools_and_answer(self):
+        """Test text, tool and done events arrive in order and the task succeeds"""
+        agent = make_agent([tool_turn(), final_turn("Windows 11.")], is_async=True)
+        agent.registry.set_function("get_system_info", lambda: {"success": True, "os": "Windows 11"})
+
+        events = asyncio.run(collect(agent.stream_task_async("what OS is this?")))
+
+        self.assertEqual(
+            [event["type"] for event in events],
+            ["text", "tool_start", "tool_result", "text", "done"]
+        )
+        self.assertEqual(events[2]["result"]["os"], "Windows 11")
+        result = events[-1]["result"]
+        self.assertTrue(result["success"])
+        self.assertEqual(result["message"], "Windows 11.")
+        self.assertEqual(len(agent.async_client.requests), 2)
+
+    def test_cancel_mid_turn(self):
+        """Test a cancel during a tool call stops the task before the next request"""
+        token = CancellationToken()
+
+        def tool():
+            token.cancel("cancelled by client")
+            return {"success": True}
+
+        agent = make_agent([tool_turn(), final_turn("never sent")], is_async=True)
+        agent.registry.set_function("get_system_info", tool)
+
+        result = asyncio.run(agent.execute_task_async("check the system", cancel_token=token))
+
+        self.assertFalse(result["success"])
+        self.assertTrue(result["cancelled"])
+        self.assertEqual(len(agent.async_client.requests), 1)
+
+    def test_plan_replay(self):
+        """Test a learned plan is replayed without calling Claude"""
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        cache = PlanCache(str(Path(temp.name) / "plans.json"), min_successes=1)
+        cache.learn("check the system", [[{"name": "get_system_info", "input": {}}]])
+
+        agent = make_agent([], is_async=True, plan_cache=cache)
+        agent.registry.set_function("get_system_info", lambda: {"success": True, "os": "Windows 11"})
+
+        result = asyncio.run(agent.execute_task_async("check the system"))
+
+        self.assertTrue(result["success"])
+        self.assertTrue(result["plan_cache"]["replayed"])
+        self.assertIn("get_system_info", result["message"])
+        self.assertEqual(agent.async_client.requests, [])
+
+
+
+class ClosableClient:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class TestAgentClose(unittest.TestCase):
+    """Test close() releases the async client the API server uses"""
+
+    def test_close_inside_event_loop(self):
+        """Test an agent closed by the pool on the event loop closes its async client"""
+        agent = make_agent(async_client=ClosableClient())
+
+        async def evict():
+            agent.close()
+            await wait_for_closed_clients()
+
+        asyncio.run(evict())
+        self.assertTrue(agent.async_client.closed)
+
+    def test_close_without_event_loop(self):
+        """Test closing outside a loop (the CLI) closes the async client too"""
+        agent = make_agent(async_client=ClosableClient())
+        agent.close()
+        self.assertTrue(agent.async_client.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
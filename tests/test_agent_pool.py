@@ -0,0 +1,115 @@
+"""
+Tests for the API server's agent pool
+"""
+import asyncio
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.agent_pool import AgentPool, PoolFullError
+
+HAIKU = "claude-3-5-haiku-20241022"
+SONNET = "claude-sonnet-4-20250514"
+
+
+class FakeAgent:
+    def __init__(self, model):
+        self.model = model
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestAgentPool(unittest.TestCase):
+    """Test leasing, per-model reuse, queueing and admission control"""
+
+    def setUp(self):
+        self.created = []
+        self.pool = AgentPool(self.factory, size=2, max_queue=1, idle_seconds=60)
+
+    def factory(self, model):
+        agent = FakeAgent(model)
+        self.created.append(agent)
+        return agent
+
+    def test_reuses_agents_per_model(self):
+        """Test alternating models reuse a warm agent for each instead of rebuilding"""
+        async def scenario():
+            leased = []
+            for model in (HAIKU, SONNET, HAIKU, SONNET):
+                async with self.pool.lease(model) as agent:
+                    leased.append(agent)
+            return leased
+
+        leased = asyncio.run(scenario())
+        self.assertEqual(len(self.created), 2)
+        self.assertIs(leased[0], leased[2])
+        self.assertIs(leased[1], leased[3])
+        self.assertEqual(self.pool.stats()["idle_by_model"], {HAIKU: 1, SONNET: 1})
+
+    def test_new_model_replaces_least_recently_used(self):
+        """Test a third model takes the slot of the agent idle the longest"""
+        async def scenario():
+            for model in (HAIKU, SONNET, "claude-3-opus-20240229"):
+                async with self.pool.lease(model):
+                    pass
+
+        asyncio.run(scenario())
+        self.assertTrue(self.created[0].closed)
+        self.assertFalse(self.created[1].closed)
+        self.assertEqual(self.pool.stats()["created"], 2)
+
+    def test_queue_then_reject(self):
+        """Test requests wait while workers are busy and are refused once the queue is full"""
+        async def scenario():
+            first = await self.pool.acquire(HAIKU)
+            await self.pool.acquire(HAIKU)
+            waiting = asyncio.create_task(self.pool.acquire(SONNET))
+            await asyncio.sleep(0)
+            stats = self.pool.stats()
+            with self.assertRaises(PoolFullError):
+                await self.pool.acquire(HAIKU)
+            self.pool.release(first)
+            return stats, await waiting, first
+
+        stats, handed_over, first = asyncio.run(scenario())
+        self.assertEqual(stats["busy"], 2)
+        self.assertEqual(stats["queued"], 1)
+        self.assertEqual(stats["utilization"], 1.0)
+        # The waiter wanted another model, so the freed slot got a new agent
+        self.assertTrue(first.closed)
+        self.assertEqual(handed_over.model, SONNET)
+        self.assertEqual(self.pool.stats()["created"], 2)
+
+    def test_cancelled_waiter_leaves_queue(self):
+        """Test a request that gives up waiting frees its queue slot"""
+        async def scenario():
+            await self.pool.acquire(HAIKU)
+            await self.pool.acquire(HAIKU)
+            waiting = asyncio.create_task(self.pool.acquire(HAIKU))
+            await asyncio.sleep(0)
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            return self.pool.queued
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+
+    def test_idle_eviction(self):
+        """Test agents unused for idle_seconds are closed and their slots freed"""
+        async def scenario():
+            async with self.pool.lease(HAIKU):
+                pass
+
+        asyncio.run(scenario())
+        self.assertEqual(self.pool.evict_idle(), 0)
+        self.assertEqual(self.pool.evict_idle(now=float("inf")), 1)
+        self.assertTrue(self.created[0].closed)
+        self.assertEqual(self.pool.stats()["created"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for the API server endpoints
+"""
+import json
+import unittest
+from pathlib import Path
+import sys
+from unittest import mock
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from fastapi.testclient import TestClient
+
+import api_server
+from utils.agent_pool import AgentPool
+
+
+class FakeAgent:
+    """Answers disk tasks and fails the rest, returning results shaped like the agent's"""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def execute_task_async(self, task, budget=None, cancel_token=None):
+        if "disk" in task:
+            return {"success": True, "message": "C: has 120 GB free", "iterations": 2,
+                    "turns": [{}, {}], "model": self.model}
+        return {"success": False, "error": "Task exceeded max_iterations", "turns": [{}], "model": self.model}
+
+
+class TestBatch(unittest.TestCase):
+    """Test /batch streams each task's answer or error, then a summary"""
+
+    def test_lines_carry_answers_and_errors(self):
+        """Test every NDJSON line has the agent's message, or its error when the task failed"""
+        with mock.patch.object(api_server, "pool", AgentPool(FakeAgent)):
+            client = TestClient(api_server.app)
+            response = client.post("/batch", json={"tasks": ["check disk space", "defragment"]})
+
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        results = {line["task"]: line for line in lines if line["type"] == "result"}
+
+        self.assertEqual(results["check disk space"]["final_response"], "C: has 120 GB free")
+        self.assertIsNone(results["check disk space"]["error"])
+        self.assertEqual(results["check disk space"]["iterations"], 2)
+        self.assertFalse(results["defragment"]["success"])
+        self.assertEqual(results["defragment"]["error"], "Task exceeded max_iterations")
+        self.assertEqual(results["defragment"]["final_response"], "Task exceeded max_iterations")
+        self.assertEqual(lines[-1]["type"], "summary")
+
+
+
+class FlakyAgent:
+    """Fails its first task as overloaded, then succeeds"""
+
+    runs = 0
+
+    def __init__(self, model):
+        self.model = model
+
+    async def execute_task_async(self, task, budget=None, cancel_token=None, session_id=None):
+        FlakyAgent.runs += 1
+        if FlakyAgent.runs == 1:
+            return {"success": False, "error": "529 overloaded", "turns": [{}], "model": self.model}
+        return {"success": True, "message": "Done", "turns": [{}], "model": self.model}
+
+
+class TestIdempotentExecute(unittest.TestCase):
+    """Test /execute replays successes for an Idempotency-Key and reruns failures"""
+
+    def test_failure_is_retried_and_success_replayed(self):
+        """Test a retry after a failed attempt runs the task again, and a retry after success does not"""
+        FlakyAgent.runs = 0
+        headers = {"Idempotency-Key": "retry-me"}
+        body = {"task": "install VLC"}
+        with mock.patch.object(api_server, "pool", AgentPool(FlakyAgent)):
+            client = TestClient(api_server.app)
+            failed = client.post("/execute", json=body, headers=headers)
+            retried = client.post("/execute", json=body, headers=headers)
+            replayed = client.post("/execute", json=body, headers=headers)
+
+        self.assertEqual(failed.json()["error"], "529 overloaded")
+        self.assertNotIn("Idempotent-Replayed", retried.headers)
+        self.assertTrue(retried.json()["success"])
+        self.assertEqual(replayed.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(replayed.json(), retried.json())
+        self.assertEqual(FlakyAgent.runs, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for per-task budgets
+"""
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tests.fakes import make_agent, make_message
+from utils.budget import TaskBudget
+from utils.tool_executor import ToolExecutor
+
+
+def tool_turn(turn):
+    return make_message([{"type": "tool_use", "id": f"t{turn}", "name": "get_system_info", "input": {}}], "tool_use")
+
+
+class TestTaskBudget(unittest.TestCase):
+    """Test when budgets run low and run out"""
+
+    def test_last_iteration_wraps_up(self):
+        """Test the final allowed turn is the wrap-up turn"""
+        budget = TaskBudget(max_iterations=3, max_tokens=0, deadline_seconds=0)
+        self.assertIsNone(budget.running_low(2, 0))
+        self.assertEqual(budget.running_low(3, 0), "iteration")
+        self.assertEqual(budget.exhausted(3, 0), "iteration")
+
+    def test_tokens_wrap_up_before_running_out(self):
+        """Test the token budget wraps up at 80% and stops at 100%"""
+        budget = TaskBudget(max_iterations=0, max_tokens=1000, deadline_seconds=0)
+        self.assertIsNone(budget.running_low(1, 700))
+        self.assertEqual(budget.running_low(1, 850), "token")
+        self.assertEqual(budget.exhausted(1, 1000), "token")
+
+    def test_deadline(self):
+        """Test time runs low and then out"""
+        budget = TaskBudget(max_iterations=0, max_tokens=0, deadline_seconds=10)
+        budget.started -= 9
+        self.assertEqual(budget.running_low(1, 0), "time")
+        budget.started -= 2
+        self.assertEqual(budget.exhausted(1, 0), "time")
+
+
+class TestExecutorTimeout(unittest.TestCase):
+    """Test tools still running at the deadline are abandoned"""
+
+    def test_slow_tool_is_cancelled(self):
+        """Test a slow call gets an error result and fast calls keep theirs"""
+        def execute(name, tool_input):
+            time.sleep(tool_input["sleep"])
+            return {"success": True}
+
+        executor = ToolExecutor(execute)
+        started = time.perf_counter()
+        results = executor.run([
+            {"id": "a", "name": "fast", "input": {"sleep": 0}},
+            {"id": "b", "name": "slow", "input": {"sleep": 1}}
+        ], timeout=0.1)
+
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(results[0], {"success": True})
+        self.assertTrue(results[1]["cancelled"])
+        executor.shutdown()
+
+
+class TestAgentWrapUp(unittest.TestCase):
+    """Test the agent asks for a final answer instead of failing"""
+
+    def test_final_answer_on_last_iteration(self):
+        """Test the last allowed request disables tools and the task still succeeds"""
+        agent = make_agent([
+            tool_turn(1),
+            make_message([{"type": "text", "text": "Partly done."}], "end_turn")
+        ])
+        agent.registry.set_function("get_system_info", lambda: {"success": True, "os": "Windows 11"})
+
+        result = agent.execute_task("check the system", TaskBudget(max_iterations=2, max_tokens=0, deadline_seconds=0))
+
+        first, last = agent.client.requests
+        self.assertNotIn("tool_choice", first)
+        self.assertEqual(last["tool_choice"], {"type": "none"})
+        self.assertIn("final answer", last["messages"][-1]["content"][-1]["text"])
+        self.assertTrue(result["success"])
+        self.assertEqual(result["budget"]["wrapped_up"], "iteration")
+
+    def test_token_budget_stops_task(self):
+        """Test a task that blows through its token budget in one turn stops"""
+        agent = make_agent([make_message(tool_turn(1).model_dump()["content"], "tool_use", input_tokens=5000)])
+        agent.registry.set_function("get_system_info", lambda: {"success": True})
+
+        result = agent.execute_task("check the system", TaskBudget(max_iterations=10, max_tokens=2000, deadline_seconds=0))
+
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Token budget exhausted")
+        self.assertEqual(len(agent.client.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
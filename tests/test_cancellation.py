@@ -0,0 +1,97 @@
+"""
+Tests for cooperative task cancellation
+"""
+import threading
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tests.fakes import make_agent, make_message
+from tools.download_manager import wait_for_download
+from utils.cancellation import CancellationToken, sleep, use_token
+from utils.tool_executor import ToolExecutor
+
+
+class TestCancellationToken(unittest.TestCase):
+    """Test the token and the cancellable sleep"""
+
+    def test_sleep_wakes_on_cancel(self):
+        """Test sleep() returns early and reports the cancel"""
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel, args=("stop",)).start()
+        started = time.perf_counter()
+        with use_token(token):
+            self.assertTrue(sleep(5))
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(token.reason, "stop")
+
+    def test_sleep_without_token(self):
+        """Test sleep() outside a task just sleeps"""
+        self.assertFalse(sleep(0))
+
+    def test_polling_tool_stops(self):
+        """Test wait_for_download gives up at its next poll once cancelled"""
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+        started = time.perf_counter()
+        with use_token(token):
+            result = wait_for_download("no-such-file-*.exe", timeout=30, check_interval=1)
+        self.assertTrue(result["cancelled"])
+        self.assertLess(time.perf_counter() - started, 2)
+
+
+class TestExecutorCancel(unittest.TestCase):
+    """Test a turn stops waiting once its task is cancelled"""
+
+    def test_cancel_mid_turn(self):
+        """Test polling tools see the token and the turn returns promptly"""
+        def execute(name, tool_input):
+            if sleep(5):
+                return {"success": False, "stopped": name}
+            return {"success": True}
+
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+        executor = ToolExecutor(execute)
+        started = time.perf_counter()
+        results = executor.run([
+            {"id": "a", "name": "first", "input": {}},
+            {"id": "b", "name": "second", "input": {}}
+        ], cancel=token)
+
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertTrue(all(result["success"] is False for result in results))
+        executor.shutdown()
+
+
+class TestAgentCancel(unittest.TestCase):
+    """Test the agent loop stops between steps"""
+
+    def test_cancel_stops_before_next_turn(self):
+        """Test no further Claude request is made after a cancel"""
+        token = CancellationToken()
+
+        def tool():
+            token.cancel("cancelled by client")
+            return {"success": True}
+
+        agent = make_agent([
+            make_message([{"type": "tool_use", "id": "t1", "name": "get_system_info", "input": {}}], "tool_use"),
+            make_message([{"type": "text", "text": "never sent"}], "end_turn")
+        ])
+        agent.registry.set_function("get_system_info", tool)
+
+        result = agent.execute_task("check the system", cancel_token=token)
+
+        self.assertFalse(result["success"])
+        self.assertTrue(result["cancelled"])
+        self.assertIn("cancelled by client", result["error"])
+        self.assertEqual(len(agent.client.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
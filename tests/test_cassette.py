@@ -0,0 +1,96 @@
+"""
+Tests for recording and replaying agent runs
+"""
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tests.fakes import make_agent, make_message
+from utils.cassette import Cassette
+from utils.llm_client import LLMClient
+
+
+class TestCassette(unittest.TestCase):
+    """Test a task recorded once replays offline with the same result"""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.cassette_path = self.test_dir / "task.json"
+        self.work_dir = self.test_dir / "work"
+        self.work_dir.mkdir()
+        (self.work_dir / "notes.txt").touch()
+
+    def tearDown(self):
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_record_then_replay(self):
+        """Test replay serves LLM turns and tool results without running anything"""
+        script = [
+            make_message([
+                {"type": "text", "text": "Listing."},
+                {"type": "tool_use", "id": "t1", "name": "list_directory", "input": {"path": str(self.work_dir)}}
+            ], "tool_use"),
+            make_message([{"type": "text", "text": "One file."}], "end_turn")
+        ]
+
+        recorder = make_agent(script)
+        recorder.use_cassette(Cassette(str(self.cassette_path), "record"))
+        recorded = recorder.execute_task("what is in the work folder?")
+
+        # The folder is gone, so only the cassette can answer
+        shutil.rmtree(self.work_dir)
+
+        player = make_agent()
+        player.use_cassette(Cassette(str(self.cassette_path), "replay"))
+        events = list(player.stream_task("what is in the work folder?"))
+
+        tool_results = [event["result"] for event in events if event["type"] == "tool_result"]
+        self.assertEqual(tool_results[0]["count"], 1)
+        self.assertEqual(events[-1]["result"]["message"], recorded["message"])
+        self.assertEqual(events[-1]["result"]["usage"], recorded["usage"])
+
+    def test_replay_skips_rate_limiter(self):
+        """Test replayed turns are not paced or billed by the LLM rate limiter"""
+        script = [
+            make_message([
+                {"type": "tool_use", "id": f"t{turn}", "name": "list_directory", "input": {"path": str(self.work_dir)}}
+            ], "tool_use", input_tokens=60000)
+            for turn in range(2)
+        ] + [make_message([{"type": "text", "text": "Done."}], "end_turn", input_tokens=60000)]
+
+        recorder = make_agent(script)
+        recorder.use_cassette(Cassette(str(self.cassette_path), "record"))
+        recorder.execute_task("list the work folder three times")
+
+        player = make_agent()
+        # A budget the replay would exhaust after its first turn
+        player.llm = LLMClient(requests_per_minute=50, tokens_per_minute=80000)
+        player.use_cassette(Cassette(str(self.cassette_path), "replay"))
+        started = time.perf_counter()
+        result = player.execute_task("list the work folder three times")
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["usage"]["input_tokens"], 180000)
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_replay_past_end_fails_cleanly(self):
+        """Test running out of recorded turns ends the task with an error"""
+        self.cassette_path.write_text('{"version": 1, "llm": [], "tools": []}')
+
+        player = make_agent()
+        player.use_cassette(Cassette(str(self.cassette_path), "replay"))
+        result = player.execute_task("anything")
+
+        self.assertFalse(result["success"])
+        self.assertIn("no more recorded", result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
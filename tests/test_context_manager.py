@@ -0,0 +1,66 @@
+"""
+Unit tests for tool-result compaction
+"""
+import json
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.context_manager import ContextManager
+
+
+def make_turn(manager, *sizes):
+    """Add one turn of tool results with the given content lengths"""
+    results = [{"success": True, "text": "x" * size} for size in sizes]
+    blocks = [
+        {"type": "tool_result", "tool_use_id": str(i), "content": json.dumps(result)}
+        for i, result in enumerate(results)
+    ]
+    manager.add_results(blocks, results)
+    return blocks, results
+
+
+class TestContextManager(unittest.TestCase):
+    """Test compaction of stale tool results"""
+
+    def test_under_budget_is_untouched(self):
+        """Test nothing is shortened while results fit the budget"""
+        manager = ContextManager(budget_tokens=10000)
+        blocks, _ = make_turn(manager, 4000)
+
+        self.assertEqual(manager.compact(), 0)
+        self.assertNotIn("shortened", blocks[0]["content"])
+
+    def test_oldest_results_are_shortened(self):
+        """Test old results are replaced by a handle and the newest turn is kept"""
+        manager = ContextManager(budget_tokens=1500)
+        old_blocks, old_results = make_turn(manager, 4000)
+        new_blocks, _ = make_turn(manager, 4000)
+
+        self.assertEqual(manager.compact(), 1)
+
+        shortened = json.loads(old_blocks[0]["content"])
+        self.assertTrue(shortened["shortened"])
+        self.assertNotIn("shortened", new_blocks[0]["content"])
+        self.assertEqual(manager.fetch(shortened["handle"]), old_results[0])
+
+    def test_small_results_are_kept(self):
+        """Test results below the minimum size are never shortened"""
+        manager = ContextManager(budget_tokens=10, min_tokens=200)
+        old_blocks, _ = make_turn(manager, 100)
+        make_turn(manager, 100)
+
+        manager.compact()
+
+        self.assertNotIn("shortened", old_blocks[0]["content"])
+
+    def test_unknown_handle(self):
+        """Test fetching an unknown handle reports an error"""
+        self.assertIn("error", ContextManager().fetch("r99"))
+
+
+if __name__ == "__main__":
+    unittest.main()
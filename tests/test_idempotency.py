@@ -0,0 +1,72 @@
+"""
+Tests for Idempotency-Key handling
+"""
+import asyncio
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.idempotency import IdempotencyCache, IdempotencyConflict, fingerprint
+
+BODY = fingerprint({"task": "install VLC"})
+
+
+class TestIdempotencyCache(unittest.TestCase):
+    """Test duplicates attach to the running request and get its stored response"""
+
+    def test_duplicates_share_one_run(self):
+        """Test an in-flight retry waits for the same run and a later one gets its response"""
+        runs = []
+
+        async def handle(cache):
+            previous = cache.lookup("k", BODY)
+            if previous is not None:
+                return await asyncio.shield(previous)
+
+            async def install():
+                runs.append(1)
+                await asyncio.sleep(0.01)
+                return {"success": True}
+
+            return await asyncio.shield(cache.track("k", BODY, asyncio.ensure_future(install())))
+
+        async def scenario():
+            cache = IdempotencyCache(ttl_seconds=60)
+            together = await asyncio.gather(handle(cache), handle(cache))
+            return together + [await handle(cache)]
+
+        responses = asyncio.run(scenario())
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(responses, [{"success": True}] * 3)
+
+    def test_different_body_conflicts(self):
+        """Test a key reused for another request is refused"""
+        async def scenario():
+            cache = IdempotencyCache(ttl_seconds=60)
+            cache.remember("k", BODY, "job1")
+            with self.assertRaises(IdempotencyConflict):
+                cache.lookup("k", fingerprint({"task": "uninstall VLC"}))
+
+        asyncio.run(scenario())
+
+    def test_failures_and_expiry_are_forgotten(self):
+        """Test failed requests can be retried and finished ones expire"""
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def scenario():
+            cache = IdempotencyCache(ttl_seconds=0)
+            failed = cache.track("failed", BODY, asyncio.ensure_future(fail()))
+            await asyncio.gather(failed, return_exceptions=True)
+            cache.remember("done", BODY, "job1")
+            await asyncio.sleep(0)
+            return cache.lookup("failed", BODY), cache.lookup("done", BODY)
+
+        self.assertEqual(asyncio.run(scenario()), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests for background jobs
+"""
+import asyncio
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.job_store import FAILED, QUEUED, SUCCEEDED, JobStore
+
+
+class TestJobStore(unittest.TestCase):
+    """Test job events, following and TTL eviction"""
+
+    def test_follow_replays_and_waits(self):
+        """Test a follower gets past events, then live ones, and stops when the job finishes"""
+        async def scenario():
+            job = JobStore(ttl_seconds=60).create("check disk space")
+            job.start()
+            job.publish({"type": "text", "text": "Checking"})
+
+            async def run():
+                await asyncio.sleep(0.01)
+                job.publish({"type": "tool_start", "name": "get_system_info"})
+                job.finish(SUCCEEDED, {"final_response": "done"})
+
+            asyncio.create_task(run())
+            return [event async for event in job.follow(after=1)], job
+
+        events, job = asyncio.run(scenario())
+        self.assertEqual([event["seq"] for event in events], [2, 3, 4])
+        self.assertEqual(events[-1], {"seq": 4, "type": "status", "status": SUCCEEDED})
+        self.assertEqual(job.to_dict()["result"], {"final_response": "done"})
+
+    def test_heartbeat(self):
+        """Test a quiet job yields None so the stream can send a keep-alive"""
+        async def scenario():
+            job = JobStore(ttl_seconds=60).create("install VLC")
+            events = job.follow(heartbeat=0.01)
+            first = await events.__anext__()
+            job.finish(FAILED, error="boom")
+            return first, [event async for event in events]
+
+        first, rest = asyncio.run(scenario())
+        self.assertIsNone(first)
+        self.assertEqual(rest[-1]["status"], FAILED)
+
+    def test_ttl_eviction(self):
+        """Test finished jobs expire after the TTL and running ones are kept"""
+        store = JobStore(ttl_seconds=60)
+        finished = store.create("a")
+        finished.finish(SUCCEEDED)
+        queued = store.create("b")
+
+        self.assertEqual(store.evict(now=finished.finished + 30), 0)
+        self.assertEqual(store.evict(now=finished.finished + 61), 1)
+        self.assertIsNone(store.get(finished.id))
+        self.assertEqual(store.get(queued.id).status, QUEUED)
+
+
+if __name__ == "__main__":
+    unittest.main()
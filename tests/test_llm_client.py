@@ -0,0 +1,189 @@
+"""
+Tests for the shared rate-limited LLM client
+"""
+import asyncio
+import threading
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import anthropic
+import httpx
+
+from utils.llm_client import LLMClient, RateLimiter, TokenBucket
+
+
+def api_error(status, headers=None):
+    response = httpx.Response(status, headers=headers or {}, request=httpx.Request("POST", "https://api.test/v1/messages"))
+    if status == 429:
+        return anthropic.RateLimitError("rate limited", response=response, body=None)
+    return anthropic.APIStatusError("failed", response=response, body=None)
+
+
+class FakeMessage:
+    class usage:
+        input_tokens = 100
+        output_tokens = 20
+        cache_creation_input_tokens = 0
+
+
+class FlakyStream:
+    def __init__(self, outcome, is_async):
+        self.outcome = outcome
+        self.is_async = is_async
+
+    def __enter__(self):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        if self.is_async:
+            return self._async_texts()
+        return iter(["hello"])
+
+    async def _async_texts(self):
+        yield "hello"
+
+    def get_final_message(self):
+        if self.is_async:
+            return self._async_message()
+        return FakeMessage()
+
+    async def _async_message(self):
+        return FakeMessage()
+
+
+class FlakyClient:
+    """Fails with each queued error in turn, then succeeds"""
+
+    def __init__(self, *errors, is_async=False):
+        self.errors = list(errors)
+        self.is_async = is_async
+        self.calls = 0
+        self.messages = self
+
+    def stream(self, **kwargs):
+        self.calls += 1
+        return FlakyStream(self.errors.pop(0) if self.errors else None, self.is_async)
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test token bucket refill"""
+
+    def test_wait_time_after_draining(self):
+        """Test an empty bucket reports how long until it refills"""
+        bucket = TokenBucket(60)  # one per second
+        now = bucket.updated
+        bucket.take(60)
+        self.assertAlmostEqual(bucket.wait_time(1, now), 1.0, places=2)
+        self.assertEqual(bucket.wait_time(1, now + 1.0), 0.0)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test request pacing and queue order"""
+
+    def test_unlimited_does_not_wait(self):
+        """Test a limiter without budgets admits immediately"""
+        limiter = RateLimiter()
+        self.assertLess(limiter.acquire(), 0.05)
+
+    def test_waits_for_request_budget(self):
+        """Test requests beyond the budget wait for a refill"""
+        limiter = RateLimiter(requests_per_minute=600)  # 10 per second, burst of 600
+        limiter.requests.level = 1
+        limiter.acquire()
+        waited = limiter.acquire()
+        self.assertGreater(waited, 0.05)
+
+    def test_token_debt_blocks_next_request(self):
+        """Test charged tokens beyond the budget hold back the next request"""
+        limiter = RateLimiter(tokens_per_minute=6000)  # 100 per second
+        limiter.charge(6010)
+        self.assertGreater(limiter.acquire(), 0.05)
+
+    def test_first_come_first_served(self):
+        """Test waiting requests are admitted in arrival order"""
+        limiter = RateLimiter(requests_per_minute=1200)  # 20 per second
+        limiter.requests.level = 0
+        order = []
+
+        def worker(index):
+            limiter.acquire()
+            order.append(index)
+
+        threads = []
+        for index in range(4):
+            thread = threading.Thread(target=worker, args=(index,))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.01)
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(order, [0, 1, 2, 3])
+        self.assertEqual(limiter.queue_depth, 0)
+
+
+class TestLLMClient(unittest.TestCase):
+    """Test retries around a streamed request"""
+
+    def make_client(self, **kwargs):
+        return LLMClient(requests_per_minute=0, tokens_per_minute=0, base_delay=0.001, **kwargs)
+
+    def test_retries_rate_limit_then_succeeds(self):
+        """Test a 429 and a 529 are retried and the response still arrives"""
+        client = FlakyClient(api_error(429, {"retry-after": "0"}), api_error(529))
+        events = list(self.make_client().stream(client))
+
+        self.assertEqual(client.calls, 3)
+        self.assertEqual([kind for kind, _ in events].count("start"), 3)
+        self.assertEqual(events[-1][0], "message")
+
+    def test_honors_retry_after(self):
+        """Test the retry-after header sets the backoff"""
+        llm = self.make_client()
+        self.assertEqual(llm._retry_delay(api_error(429, {"retry-after": "7"}), 0, False), 7.0)
+
+    def test_gives_up_after_max_retries(self):
+        """Test the last error is raised once retries run out"""
+        client = FlakyClient(*[api_error(529) for _ in range(3)])
+        with self.assertRaises(anthropic.APIStatusError):
+            list(self.make_client(max_retries=2).stream(client))
+        self.assertEqual(client.calls, 3)
+
+    def test_client_errors_are_not_retried(self):
+        """Test a bad request fails immediately"""
+        client = FlakyClient(api_error(400))
+        with self.assertRaises(anthropic.APIStatusError):
+            list(self.make_client().stream(client))
+        self.assertEqual(client.calls, 1)
+
+    def test_async_retries(self):
+        """Test the async stream retries the same way"""
+        client = FlakyClient(api_error(503), is_async=True)
+
+        async def collect():
+            return [event async for event in self.make_client().stream_async(client)]
+
+        events = asyncio.run(collect())
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(events[-1][0], "message")
+
+
+if __name__ == "__main__":
+    unittest.main()
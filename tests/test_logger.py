@@ -0,0 +1,103 @@
+"""
+Tests for the queued JSON-lines logger
+"""
+import json
+import logging
+import logging.handlers
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.logger import setup_logger, stop_logger, truncate
+
+
+class TestLogger(unittest.TestCase):
+    """Test setup, JSON output and rotation"""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.log_file = self.test_dir / "logs" / "agent.log"
+
+    def tearDown(self):
+        stop_logger("axonyx_test")
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_repeated_setup_does_not_duplicate(self):
+        """Test calling setup_logger twice leaves one handler and one line per record"""
+        setup_logger("axonyx_test", str(self.log_file), console=False)
+        logger = setup_logger("axonyx_test", str(self.log_file), console=False)
+        queue_handlers = [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]
+        logger.info("once")
+        stop_logger("axonyx_test")
+
+        self.assertEqual(len(queue_handlers), 1)
+        lines = self.log_file.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 1)
+
+    def test_json_lines_with_extra_fields(self):
+        """Test records are written as JSON with their extra fields"""
+        logger = setup_logger("axonyx_test", str(self.log_file), level="DEBUG", console=False)
+        logger.info("Tool finished", extra={"tool": "read_file", "seconds": 0.25})
+        stop_logger("axonyx_test")
+
+        entry = json.loads(self.log_file.read_text(encoding="utf-8"))
+        self.assertEqual(entry["message"], "Tool finished")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["tool"], "read_file")
+        self.assertEqual(entry["seconds"], 0.25)
+
+    def test_exception_is_a_separate_field(self):
+        """Test logger.exception keeps the traceback out of the message"""
+        logger = setup_logger("axonyx_test", str(self.log_file), console=False)
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            logger.exception("Tool raised", extra={"tool": "read_file"})
+        stop_logger("axonyx_test")
+
+        entry = json.loads(self.log_file.read_text(encoding="utf-8"))
+        self.assertEqual(entry["message"], "Tool raised")
+        self.assertIn("ValueError: bad input", entry["exception"])
+        self.assertEqual(entry["tool"], "read_file")
+
+    def test_rotates_by_size(self):
+        """Test the file is rotated once it reaches max_bytes"""
+        logger = setup_logger("axonyx_test", str(self.log_file), console=False, max_bytes=500, backup_count=2)
+        for index in range(50):
+            logger.info("line %d", index, extra={"padding": "x" * 50})
+        stop_logger("axonyx_test")
+
+        self.assertTrue(Path(f"{self.log_file}.1").exists())
+        self.assertFalse(Path(f"{self.log_file}.3").exists())
+
+    def test_level_filters_before_queueing(self):
+        """Test debug records are dropped at INFO without reaching the file"""
+        logger = setup_logger("axonyx_test", str(self.log_file), level="INFO", console=False)
+        self.assertFalse(logger.isEnabledFor(logging.DEBUG))
+        logger.debug("hidden")
+        stop_logger("axonyx_test")
+        self.assertEqual(self.log_file.read_text(encoding="utf-8"), "")
+
+
+class TestTruncate(unittest.TestCase):
+    """Test values are bounded before serialization"""
+
+    def test_bounds_strings_lists_and_depth(self):
+        """Test long strings, long lists and deep nesting are cut"""
+        value = {"text": "x" * 1000, "items": list(range(100)), "deep": {"a": {"b": {"c": {"d": 1}}}}}
+        bounded = truncate(value, max_chars=10, max_items=5, depth=3)
+
+        self.assertTrue(bounded["text"].startswith("x" * 10 + "..."))
+        self.assertEqual(len(bounded["items"]), 6)
+        self.assertEqual(bounded["deep"]["a"]["b"], "<dict>")
+        self.assertLess(len(json.dumps(bounded)), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Unit tests for the Prometheus metrics registry
+"""
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.metrics import MetricsRegistry
+
+
+class TestMetrics(unittest.TestCase):
+    """Test metric bookkeeping and text exposition"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_by_label(self):
+        """Test counters keep one series per label set"""
+        errors = self.registry.counter("tool_errors_total", "Errors", ["tool"])
+        errors.inc(tool="take_screenshot")
+        errors.inc(tool="take_screenshot")
+        errors.inc(tool="get_page_text")
+
+        output = self.registry.render()
+
+        self.assertIn("# TYPE tool_errors_total counter", output)
+        self.assertIn('tool_errors_total{tool="take_screenshot"} 2', output)
+        self.assertIn('tool_errors_total{tool="get_page_text"} 1', output)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count"""
+        duration = self.registry.histogram("tool_seconds", "Duration", ["tool"], buckets=(0.1, 1))
+        duration.observe(0.05, tool="ocr")
+        duration.observe(0.5, tool="ocr")
+        duration.observe(5, tool="ocr")
+
+        output = self.registry.render()
+
+        self.assertIn('tool_seconds_bucket{tool="ocr",le="0.1"} 1', output)
+        self.assertIn('tool_seconds_bucket{tool="ocr",le="1"} 2', output)
+        self.assertIn('tool_seconds_bucket{tool="ocr",le="+Inf"} 3', output)
+        self.assertIn('tool_seconds_sum{tool="ocr"} 5.55', output)
+        self.assertIn('tool_seconds_count{tool="ocr"} 3', output)
+
+    def test_gauge_callback(self):
+        """Test gauges can be read at render time"""
+        depth = self.registry.gauge("queue_depth", "Queued tasks")
+        depth.set_function(lambda: 7)
+
+        self.assertIn("queue_depth 7", self.registry.render())
+
+    def test_label_escaping(self):
+        """Test quotes in label values are escaped"""
+        errors = self.registry.counter("errors_total", "Errors", ["tool"])
+        errors.inc(tool='say "hi"')
+
+        self.assertIn('errors_total{tool="say \\"hi\\""} 1', self.registry.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Tests for tiered model routing
+"""
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tests.fakes import make_agent, make_message
+from utils.model_router import ModelRouter
+from utils.pricing import estimate_cost
+
+HAIKU = "claude-3-5-haiku-20241022"
+SONNET = "claude-sonnet-4-20250514"
+
+
+def call(name, tool_input):
+    return {"id": "t", "name": name, "input": tool_input}
+
+
+class TestModelRouter(unittest.TestCase):
+    """Test the escalation signals"""
+
+    def setUp(self):
+        self.router = ModelRouter(SONNET, max_tool_errors=2, max_repeats=3, complexity_threshold=4)
+
+    def test_simple_task_stays(self):
+        """Test a short task with clean results is not escalated"""
+        history = [[(call("get_system_info", {}), {"success": True})]]
+        self.assertIsNone(self.router.escalation_reason(HAIKU, "what OS is this?", history))
+
+    def test_tool_errors(self):
+        """Test repeated tool failures escalate"""
+        history = [
+            [(call("read_file", {"path": "a"}), {"error": "missing"})],
+            [(call("read_file", {"path": "b"}), {"success": False})]
+        ]
+        self.assertEqual(self.router.escalation_reason(HAIKU, "read my notes", history), "tool_errors")
+
+    def test_repeated_calls(self):
+        """Test the same call made over and over escalates"""
+        turn = [(call("take_screenshot", {"region": [0, 0]}), {"success": True})]
+        self.assertEqual(self.router.escalation_reason(HAIKU, "look at the screen", [turn] * 3), "repeated_calls")
+
+    def test_complex_task(self):
+        """Test a multi-step task starts on the strong model"""
+        task = "Download VLC, then install it, then open it and finally pin it to the taskbar"
+        self.assertEqual(self.router.escalation_reason(HAIKU, task, []), "complex_task")
+
+    def test_never_downgrades(self):
+        """Test a task on a pricier model is left alone"""
+        history = [[(call("read_file", {"path": "a"}), {"error": "missing"})]] * 3
+        self.assertIsNone(self.router.escalation_reason("claude-3-opus-20240229", "read", history))
+
+    def test_cost_estimate(self):
+        """Test cost uses the model's prices, including cache reads and writes"""
+        usage = {"input_tokens": 1_000_000, "output_tokens": 1_000_000,
+                 "cache_read_input_tokens": 1_000_000, "cache_creation_input_tokens": 0}
+        self.assertAlmostEqual(estimate_cost(HAIKU, usage), 0.80 + 4.00 + 0.08)
+
+
+class TestAgentEscalation(unittest.TestCase):
+    """Test the agent switches model mid-task and keeps the conversation"""
+
+    def test_escalates_after_tool_errors(self):
+        """Test requests after two failed tools go to the strong model with the same history"""
+        failing = {"type": "tool_use", "id": "t1", "name": "read_file", "input": {"path": "/nonexistent/a.txt"}}
+        script = [
+            make_message([failing], "tool_use"),
+            make_message([{**failing, "id": "t2", "input": {"path": "/nonexistent/b.txt"}}], "tool_use"),
+            make_message([{"type": "text", "text": "Neither file exists."}], "end_turn")
+        ]
+
+        agent = make_agent(script, model=HAIKU, router=ModelRouter(SONNET, max_tool_errors=2))
+
+        result = agent.execute_task("read my notes")
+
+        self.assertEqual([request["model"] for request in agent.client.requests], [HAIKU, HAIKU, SONNET])
+        self.assertEqual(len(agent.client.requests[2]["messages"]), 5)
+        self.assertEqual(result["escalated"], "tool_errors")
+        self.assertEqual(result["model"], SONNET)
+        self.assertEqual(result["models"][HAIKU]["requests"], 2)
+        self.assertEqual(result["models"][SONNET]["requests"], 1)
+        self.assertGreater(result["models"][SONNET]["cost_usd"], result["models"][HAIKU]["cost_usd"] / 2)
+        self.assertEqual([turn["model"] for turn in result["turns"]], [HAIKU, HAIKU, SONNET])
+        self.assertAlmostEqual(result["cost_usd"], sum(turn["cost_usd"] for turn in result["turns"]))
+        self.assertLessEqual(result["timing"]["llm_seconds"] + result["timing"]["tool_seconds"],
+                             result["timing"]["total_seconds"] + 0.002)
+
+
+if __name__ == "__main__":
+    unittest.main()
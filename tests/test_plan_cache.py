@@ -0,0 +1,143 @@
+"""
+Unit tests for the learned plan cache
+"""
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tests.fakes import make_agent, make_message
+from utils.plan_cache import PlanCache, task_template
+
+
+class TestPlanCache(unittest.TestCase):
+    """Test task templating, replay thresholds and persistence"""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.path = self.test_dir / "plans.json"
+
+    def tearDown(self):
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_task_template(self):
+        """Test literal values become slots and filler words are dropped"""
+        self.assertEqual(
+            task_template("Please open Chrome to github.com"),
+            ("open chrome to {0}", ["github.com"])
+        )
+        self.assertEqual(task_template("take a screenshot")[0], "take screenshot")
+
+    def test_replay_after_min_successes(self):
+        """Test a plan is only replayed once it succeeded often enough"""
+        cache = PlanCache(str(self.path), min_successes=2)
+        turns = [[{"name": "open_chrome_with_profile", "input": {"url": "https://github.com"}}]]
+
+        cache.learn("open chrome to github.com", turns)
+        self.assertIsNone(cache.lookup("open chrome to github.com"))
+
+        cache.learn("open chrome to github.com", turns)
+        plan = cache.lookup("open chrome to python.org")
+
+        self.assertEqual(plan[0][0]["input"], {"url": "https://python.org"})
+
+    def test_numeric_slots_keep_their_type(self):
+        """Test numbers from the task are substituted as numbers"""
+        cache = PlanCache(str(self.path), min_successes=1)
+        cache.learn("set volume to 30", [[{"name": "set_volume", "input": {"level": 30}}]])
+
+        self.assertEqual(cache.lookup("set volume to 75")[0][0]["input"], {"level": 75})
+
+    def test_slot_of_another_type_is_a_miss(self):
+        """Test a plan that took an int is not replayed for a decimal or a file name"""
+        cache = PlanCache(str(self.path), min_successes=1)
+        cache.learn("set screen timeout to 10 minutes", [[{"name": "set_screen_timeout", "input": {"minutes": 10}}]])
+
+        self.assertIsNone(cache.lookup("set screen timeout to 2.5 minutes"))
+        self.assertIsNone(cache.lookup("set screen timeout to notes.txt minutes"))
+        self.assertEqual(cache.stats()["hits"], 0)
+        self.assertEqual(cache.lookup("set screen timeout to 5 minutes")[0][0]["input"], {"minutes": 5})
+
+    def test_numbers_inside_strings_are_kept(self):
+        """Test a number slot only replaces an input that is exactly that number"""
+        cache = PlanCache(str(self.path), min_successes=1)
+        cache.learn("download 5 pictures of cats", [[{
+            "name": "search_and_download_images",
+            "input": {"query": "cats", "count": "5", "download_folder": "C:\\Pictures\\2025\\cats"}
+        }]])
+
+        plan = cache.lookup("download 10 pictures of cats")
+
+        self.assertEqual(plan[0][0]["input"], {
+            "query": "cats", "count": "10", "download_folder": "C:\\Pictures\\2025\\cats"
+        })
+
+    def test_slots_match_whole_tokens(self):
+        """Test a file name slot is not substituted inside a longer name"""
+        cache = PlanCache(str(self.path), min_successes=1)
+        cache.learn("delete notes.txt", [[{
+            "name": "delete_file", "input": {"path": "C:\\docs\\notes.txt", "backup": "C:\\docs\\old_notes.txt"}
+        }]])
+
+        plan = cache.lookup("delete todo.md")
+
+        self.assertEqual(plan[0][0]["input"], {"path": "C:\\docs\\todo.md", "backup": "C:\\docs\\old_notes.txt"})
+
+    def test_persistence_and_lru(self):
+        """Test plans survive a reload and the oldest is evicted"""
+        cache = PlanCache(str(self.path), max_entries=2, min_successes=1)
+        for task in ("take screenshot", "list processes", "check battery"):
+            cache.learn(task, [[{"name": task.replace(" ", "_"), "input": {}}]])
+
+        reloaded = PlanCache(str(self.path), max_entries=2, min_successes=1)
+
+        self.assertIsNone(reloaded.lookup("take screenshot"))
+        self.assertIsNotNone(reloaded.lookup("check battery"))
+        self.assertEqual(reloaded.stats()["plans"], 2)
+
+    def test_forget(self):
+        """Test a failed plan is dropped"""
+        cache = PlanCache(str(self.path), min_successes=1)
+        cache.learn("take screenshot", [[{"name": "take_screenshot", "input": {}}]])
+        cache.forget("take screenshot")
+
+        self.assertIsNone(cache.lookup("take screenshot"))
+        self.assertEqual(cache.stats()["failed_replays"], 1)
+
+
+
+class TestAgentPlanFallback(unittest.TestCase):
+    """Test a replayed plan that fails hands Claude what already ran"""
+
+    def test_failed_step_reports_executed_calls(self):
+        """Test Claude is told the calls already made, and the partial run is not learned"""
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        cache = PlanCache(str(Path(temp.name) / "plans.json"), min_successes=1)
+        cache.learn("install vlc", [
+            [{"name": "get_system_info", "input": {}}],
+            [{"name": "read_file", "input": {"path": "/nonexistent/vlc.msi"}}]
+        ])
+        calls = []
+
+        agent = make_agent([make_message([{"type": "text", "text": "VLC is installed."}], "end_turn")], plan_cache=cache)
+        agent.registry.set_function("get_system_info", lambda: calls.append(1) or {"success": True, "os": "Windows 11"})
+        result = agent.execute_task("install vlc")
+
+        task_message = agent.client.requests[0]["messages"][0]["content"]
+        self.assertTrue(result["success"])
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(task_message.startswith("install vlc"))
+        self.assertIn("do not repeat", task_message)
+        self.assertIn('get_system_info({}): {"success": true, "os": "Windows 11"}', task_message)
+        self.assertIn("read_file", task_message)
+        self.assertIsNone(cache.lookup("install vlc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
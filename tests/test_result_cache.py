@@ -0,0 +1,87 @@
+"""
+Unit tests for the tool result cache
+"""
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from agent import WindowsAgent
+from tests.fakes import make_agent
+from utils.result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    """Test TTL, LRU and invalidation behaviour"""
+
+    def test_hit_ignores_argument_order(self):
+        """Test inputs are keyed canonically"""
+        cache = ResultCache()
+        cache.put("list_directory", {"path": "C:/", "hidden": False}, {"success": True}, ttl=60)
+
+        self.assertEqual(cache.get("list_directory", {"hidden": False, "path": "C:/"}), {"success": True})
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_expired_entry_is_a_miss(self):
+        """Test entries expire after their TTL"""
+        cache = ResultCache()
+        cache.put("get_cpu_info", {}, {"success": True}, ttl=0.01)
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get("get_cpu_info", {}))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        cache = ResultCache(max_entries=2)
+        cache.put("a", {}, 1, ttl=60)
+        cache.put("b", {}, 2, ttl=60)
+        cache.get("a", {})
+        cache.put("c", {}, 3, ttl=60)
+
+        self.assertEqual(cache.get("a", {}), 1)
+        self.assertIsNone(cache.get("b", {}))
+
+    def test_invalidate_by_tool(self):
+        """Test mutating tools drop every entry of the tools they affect"""
+        cache = ResultCache()
+        cache.put("list_directory", {"path": "a"}, 1, ttl=60)
+        cache.put("list_directory", {"path": "b"}, 2, ttl=60)
+        cache.put("get_disk_info", {}, 3, ttl=60)
+
+        self.assertEqual(cache.invalidate(["list_directory"]), 2)
+        self.assertIsNone(cache.get("list_directory", {"path": "a"}))
+        self.assertEqual(cache.get("get_disk_info", {}), 3)
+
+
+
+class TestSharedResultCache(unittest.TestCase):
+    """Test agents in one process see each other's invalidations"""
+
+    def test_installer_on_one_agent_invalidates_another(self):
+        """Test starting an installer through one agent drops every agent's installed-apps results"""
+        self.assertIs(WindowsAgent(api_key="test").result_cache, WindowsAgent(api_key="test").result_cache)
+
+        checks = []
+        cache = ResultCache()
+        reader, installer = make_agent(result_cache=cache), make_agent(result_cache=cache)
+        reader.registry.set_function(
+            "check_application_installed", lambda app_name: checks.append(app_name) or {"installed": len(checks) > 1}
+        )
+        installer.registry.set_function("start_process", lambda command, args=None: {"success": True})
+
+        reader._execute_tool("check_application_installed", {"app_name": "VLC"})
+        reader._execute_tool("check_application_installed", {"app_name": "VLC"})
+        installer._execute_tool("start_process", {"command": "vlc-setup.exe"})
+        result = reader._execute_tool("check_application_installed", {"app_name": "VLC"})
+
+        self.assertEqual(len(checks), 2)
+        self.assertEqual(result, {"installed": True})
+        self.assertEqual(reader.cache_counts, {"hits": 1, "misses": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
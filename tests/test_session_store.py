@@ -0,0 +1,94 @@
+"""
+Tests for conversation sessions
+"""
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tests.fakes import make_agent, make_message
+from utils.session_store import Session, SessionStore
+
+
+class TestSessionStore(unittest.TestCase):
+    """Test sessions round-trip through SQLite"""
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.store = SessionStore(Path(self.temp.name) / "sessions.db", ttl_days=1)
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def test_round_trip(self):
+        """Test messages, stored results and the tool set are saved and loaded"""
+        session = Session("s1")
+        session.messages = [
+            {"role": "user", "content": "list installed apps"},
+            {"role": "assistant", "content": [{"type": "text", "text": "Chrome, VLC"}]}
+        ]
+        session.results = {"r1": {"apps": ["Chrome", "VLC"]}}
+        session.active_tools = ["list_installed_apps"]
+        session.tasks = 1
+        self.store.save(session)
+
+        loaded = self.store.load("s1")
+        self.assertEqual(loaded.messages, session.messages)
+        self.assertEqual(loaded.results, session.results)
+        self.assertEqual(loaded.active_tools, ["list_installed_apps"])
+        self.assertEqual(loaded.summary()["tasks"], 1)
+        self.assertIsNone(self.store.load("missing"))
+
+    def test_delete_and_expiry(self):
+        """Test sessions can be deleted and idle ones are pruned"""
+        old = Session("old")
+        self.store.save(old)
+        self.assertTrue(self.store.delete("old"))
+        self.assertFalse(self.store.delete("old"))
+
+        self.store.save(Session("stale"))
+        self.store.ttl_seconds = 0.2
+        time.sleep(0.3)
+        self.store.save(Session("fresh"))
+        self.assertIsNone(self.store.load("stale"))
+        self.assertIsNotNone(self.store.load("fresh"))
+
+
+class TestAgentSession(unittest.TestCase):
+    """Test a follow-up task continues the conversation"""
+
+    def test_follow_up_reuses_history(self):
+        """Test the second task is sent after the first's history, with the history cached"""
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        failing = {"type": "tool_use", "id": "t1", "name": "read_file", "input": {"path": "/nonexistent/a.txt"}}
+        script = [
+            make_message([failing], "tool_use"),
+            make_message([{"type": "text", "text": "It does not exist."}], "end_turn"),
+            make_message([{"type": "text", "text": "That one is missing too."}], "end_turn")
+        ]
+
+        agent = make_agent(script, session_store=SessionStore(Path(temp.name) / "sessions.db"))
+
+        first = agent.execute_task("read a.txt", session_id="chat")
+        second = agent.execute_task("now do the same for b.txt", session_id="chat")
+
+        self.assertEqual(first["session_id"], "chat")
+        self.assertTrue(second["success"])
+        messages = agent.client.requests[2]["messages"]
+        self.assertEqual([message["role"] for message in messages], ["user", "assistant", "user", "assistant", "user"])
+        self.assertEqual(messages[0]["content"], "read a.txt")
+        self.assertEqual(messages[-1]["content"], "now do the same for b.txt")
+        self.assertEqual(messages[3]["content"][-1]["cache_control"], {"type": "ephemeral"})
+        # Same tools as the first task, so the cached prefix still matches
+        self.assertEqual(agent.client.requests[2]["tools"], agent.client.requests[0]["tools"])
+        self.assertEqual(agent.session_store.load("chat").tasks, 2)
+        self.assertEqual(len(agent.session_store.load("chat").messages), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
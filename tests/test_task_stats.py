@@ -0,0 +1,58 @@
+"""
+Tests for the rolling task summary
+"""
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.task_stats import TaskStats
+
+
+def result(success, total, llm, tool, cost, model="claude-3-5-haiku-20241022"):
+    return {
+        "success": success,
+        "model": model,
+        "usage": {"input_tokens": 1000, "output_tokens": 100},
+        "timing": {"total_seconds": total, "llm_seconds": llm, "tool_seconds": tool},
+        "cost_usd": cost
+    }
+
+
+class TestTaskStats(unittest.TestCase):
+    """Test aggregation over the window"""
+
+    def test_summary(self):
+        """Test rates, time split, tokens and cost are aggregated"""
+        stats = TaskStats(window=10)
+        stats.record(result(True, 4.0, 3.0, 1.0, 0.01))
+        stats.record(result(False, 6.0, 1.0, 5.0, 0.02, model="claude-sonnet-4-20250514"))
+
+        summary = stats.summary()
+        self.assertEqual(summary["tasks"], 2)
+        self.assertEqual(summary["success_rate"], 0.5)
+        self.assertEqual(summary["llm_seconds"], 4.0)
+        self.assertEqual(summary["tool_seconds"], 6.0)
+        self.assertEqual(summary["llm_share"], 0.4)
+        self.assertEqual(summary["usage"]["input_tokens"], 2000)
+        self.assertAlmostEqual(summary["cost_usd"], 0.03)
+        self.assertEqual(summary["models"]["claude-sonnet-4-20250514"]["tasks"], 1)
+
+    def test_window_drops_oldest(self):
+        """Test only the most recent tasks are kept"""
+        stats = TaskStats(window=2)
+        for total in (100.0, 1.0, 2.0):
+            stats.record(result(True, total, 0.0, 0.0, 0.0))
+        self.assertEqual(stats.summary()["seconds"]["p95"], 2.0)
+
+    def test_empty(self):
+        """Test an empty window summarizes to zeros"""
+        summary = TaskStats(window=5).summary()
+        self.assertEqual(summary["tasks"], 0)
+        self.assertEqual(summary["success_rate"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Unit tests for the concurrent tool executor
+"""
+import unittest
+import threading
+import time
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.tool_executor import ToolExecutor
+
+
+class TestToolExecutor(unittest.TestCase):
+    """Test concurrent tool dispatch"""
+
+    def setUp(self):
+        """Record which tools are running at the same time"""
+        self.lock = threading.Lock()
+        self.running = set()
+        self.overlaps = []
+        self.order = []
+
+    def _execute(self, name, tool_input):
+        with self.lock:
+            if self.running:
+                self.overlaps.append((name, set(self.running)))
+            self.running.add(name)
+            self.order.append(name)
+        time.sleep(tool_input.get("sleep", 0.05))
+        with self.lock:
+            self.running.discard(name)
+        return {"success": True, "tool": name}
+
+    def test_results_keep_call_order(self):
+        """Test results are aligned with the original tool_use order"""
+        executor = ToolExecutor(self._execute, max_workers=4)
+        calls = [
+            {"id": "a", "name": "slow", "input": {"sleep": 0.1}},
+            {"id": "b", "name": "fast", "input": {"sleep": 0.0}},
+            {"id": "c", "name": "medium", "input": {"sleep": 0.05}},
+        ]
+
+        results = executor.run(calls)
+
+        self.assertEqual([r["tool"] for r in results], ["slow", "fast", "medium"])
+        executor.shutdown()
+
+    def test_independent_tools_run_concurrently(self):
+        """Test free tools overlap instead of running back to back"""
+        executor = ToolExecutor(self._execute, max_workers=4)
+        calls = [{"id": str(i), "name": f"tool{i}", "input": {"sleep": 0.2}} for i in range(4)]
+
+        start = time.perf_counter()
+        executor.run(calls)
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.6)
+        executor.shutdown()
+
+    def test_shared_resource_is_serialized_in_order(self):
+        """Test tools on the same resource never overlap and keep their order"""
+        resources = {"click": "desktop", "type": "desktop"}
+        executor = ToolExecutor(self._execute, resources=resources, max_workers=4)
+        calls = [
+            {"id": "1", "name": "click", "input": {}},
+            {"id": "2", "name": "type", "input": {}},
+        ]
+
+        executor.run(calls)
+
+        self.assertEqual(self.order, ["click", "type"])
+        self.assertEqual(self.overlaps, [])
+        executor.shutdown()
+
+    def test_tool_on_several_resources_holds_every_lock(self):
+        """Test a browser-and-desktop tool never overlaps tools on either resource"""
+        resources = {"navigate": "browser", "download_images": ("browser", "desktop"), "click": "desktop"}
+        executor = ToolExecutor(self._execute, resources=resources, max_workers=4)
+        calls = [
+            {"id": "1", "name": "navigate", "input": {}},
+            {"id": "2", "name": "click", "input": {}},
+            {"id": "3", "name": "download_images", "input": {}},
+        ]
+
+        executor.run(calls)
+        # Another turn on the same resources, started while this one runs
+        other = ToolExecutor(self._execute, resources=resources, max_workers=4)
+        threads = [
+            threading.Thread(target=executor.run, args=([{"id": "4", "name": "download_images", "input": {}}],)),
+            threading.Thread(target=other.run, args=([{"id": "5", "name": "navigate", "input": {}}],)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.order[:3], ["navigate", "click", "download_images"])
+        self.assertEqual(self.overlaps, [])
+        executor.shutdown()
+        other.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
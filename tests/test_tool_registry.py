@@ -0,0 +1,58 @@
+"""
+Unit tests for the lazy tool registry
+"""
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tools.registry import ToolRegistry
+
+
+class TestToolRegistry(unittest.TestCase):
+    """Test schema loading and on-demand imports"""
+
+    def setUp(self):
+        self.registry = ToolRegistry()
+
+    def test_schemas_load_without_imports(self):
+        """Test all schemas are available before any tool module is imported"""
+        names = [tool["name"] for tool in self.registry.schemas]
+
+        self.assertEqual(len(names), len(set(names)))
+        self.assertIn("list_directory", names)
+        self.assertIn("get_page_text", names)
+        self.assertEqual(self.registry.loaded_modules, [])
+
+    def test_get_function_imports_only_owner(self):
+        """Test calling a tool imports just the module that owns it"""
+        func = self.registry.get_function("list_directory")
+
+        self.assertTrue(callable(func))
+        self.assertEqual(self.registry.loaded_modules, ["file_ops"])
+
+    def test_unknown_tool(self):
+        """Test unknown tools are reported as missing"""
+        self.assertIsNone(self.registry.get_function("not_a_tool"))
+        self.assertNotIn("not_a_tool", self.registry)
+
+    def test_shared_resources(self):
+        """Test desktop and browser tools are marked for serialization"""
+        self.assertEqual(self.registry.resources.get("click_mouse"), "desktop")
+        self.assertEqual(self.registry.resources.get("navigate_to_url"), "browser")
+        self.assertEqual(self.registry.resources.get("search_and_download_images"), ("browser", "desktop"))
+        self.assertNotIn("get_cpu_info", self.registry.resources)
+
+    def test_cache_declarations(self):
+        """Test CACHE_TTLS and CACHE_INVALIDATES are read without imports"""
+        self.assertIn("get_system_info", self.registry.cache_ttls)
+        self.assertIn("list_installed_applications", self.registry.cache_invalidates["uninstall_application"])
+        for writer in ("download_image_from_url", "search_and_download_images", "take_screenshot", "take_browser_screenshot"):
+            self.assertIn("list_directory", self.registry.cache_invalidates[writer])
+        self.assertEqual(self.registry.loaded_modules, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
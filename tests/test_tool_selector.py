@@ -0,0 +1,45 @@
+"""
+Unit tests for relevance-based tool selection
+"""
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tools.registry import ToolRegistry
+from tools.selector import CORE_TOOLS, ToolSelector, tokenize
+
+
+class TestToolSelector(unittest.TestCase):
+    """Test the BM25 tool index"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.selector = ToolSelector.from_registry(ToolRegistry(), top_k=8)
+
+    def test_tokenize(self):
+        """Test snake_case splitting, stopwords and plurals"""
+        self.assertEqual(tokenize("get_disk_info for my Disks"), ["get", "disk", "info", "disk"])
+
+    def test_search_ranks_matching_tool_first(self):
+        """Test the obvious tool wins for everyday phrasing"""
+        self.assertEqual(self.selector.search("what is my battery level")[0], "get_battery_info")
+        self.assertEqual(self.selector.search("uninstall an application")[0], "uninstall_application")
+        self.assertIn("search_and_download_images", self.selector.search("download pictures of cats")[:2])
+
+    def test_select_includes_core(self):
+        """Test every selection carries the always-on core"""
+        selected = self.selector.select("what is my battery level")
+
+        self.assertTrue(set(CORE_TOOLS) <= selected)
+        self.assertLessEqual(len(selected), len(CORE_TOOLS) + 8)
+
+    def test_no_match(self):
+        """Test unrelated text scores nothing"""
+        self.assertEqual(self.selector.search("zzzz qqqq"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
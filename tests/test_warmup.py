@@ -0,0 +1,53 @@
+"""
+Tests for the server warm-up
+"""
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.warmup import WarmUp
+
+
+def fail():
+    raise OSError("tesseract is not installed")
+
+
+class TestWarmUp(unittest.TestCase):
+    """Test steps are timed, failures reported and readiness tracked"""
+
+    def test_run_reports_each_step(self):
+        """Test every step gets an outcome and timing, and a failing step does not stop the rest"""
+        warmup = WarmUp(
+            steps=["modules", "tesseract", "uia", "missing"],
+            functions={"modules": lambda: {"imported": 3}, "tesseract": fail, "uia": lambda: None}
+        )
+        self.assertFalse(warmup.report()["ready"])
+        self.assertEqual(warmup.report()["pending"], ["modules", "tesseract", "uia", "missing"])
+
+        report = warmup.run()
+
+        self.assertTrue(report["ready"])
+        self.assertEqual(report["pending"], [])
+        self.assertEqual(report["steps"]["modules"]["imported"], 3)
+        self.assertFalse(report["steps"]["tesseract"]["ok"])
+        self.assertIn("not installed", report["steps"]["tesseract"]["error"])
+        self.assertTrue(report["steps"]["uia"]["ok"])
+        self.assertFalse(report["steps"]["missing"]["ok"])
+        self.assertTrue(all("seconds" in outcome for outcome in report["steps"].values()))
+
+    def test_steps_from_environment(self):
+        """Test WARMUP_STEPS=none skips warm-up entirely"""
+        import os
+        from unittest import mock
+
+        with mock.patch.dict(os.environ, {"WARMUP_STEPS": "none"}):
+            self.assertEqual(WarmUp().steps, [])
+        with mock.patch.dict(os.environ, {"WARMUP_STEPS": "tool_modules, browser"}):
+            self.assertEqual(WarmUp().steps, ["tool_modules", "browser"])
+
+
+if __name__ == "__main__":
+    unittest.main()